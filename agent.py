@@ -13,7 +13,8 @@ class DodaAgent:
     Phase 2: Full tool integration for autonomous behavior.
     """
 
-    def __init__(self, api_key: str, robot=None, camera=None, preferences=None, game_state=None):
+    def __init__(self, api_key: str, robot=None, camera=None, preferences=None, game_state=None,
+                 client: Anthropic = None, photo_dir: str = "game/gift_photos"):
         """
         Initialize the Doda Agent.
 
@@ -23,8 +24,10 @@ class DodaAgent:
             camera: Camera manager instance
             preferences: Preferences system instance
             game_state: Game state manager instance
+            client: Anthropic client to share (a new one is created if omitted)
+            photo_dir: Where gift photos and their descriptions are saved
         """
-        self.client = Anthropic(api_key=api_key)
+        self.client = client if client is not None else Anthropic(api_key=api_key)
         self.robot = robot
         self.camera = camera
         self.preferences = preferences
@@ -38,7 +41,8 @@ class DodaAgent:
         self.tool_definitions, self.tool_handlers = create_robot_tools(
             robot_controller=robot,
             camera_manager=camera,
-            preferences_system=preferences
+            preferences_system=preferences,
+            photo_dir=photo_dir
         )
 
         # System prompt for Doda (Phase 2 - full game)
@@ -184,7 +188,13 @@ Current gratification level will be provided with each interaction."""
                                     affinity_score = tool_result.get("affinity_score")
 
                                     if gift_analysis and self.game_state:
-                                        self.game_state.add_gift(gift_analysis, affinity_score)
+                                        self.game_state.add_gift(
+                                            gift_analysis,
+                                            affinity_score,
+                                            affinity_reason=tool_result.get("affinity_reason"),
+                                            matched_preferences=tool_result.get("matched_preferences"),
+                                            photo_path=tool_result.get("photo_path")
+                                        )
 
                                 # Format tool result as JSON string for better readability
                                 import json
@@ -0,0 +1,117 @@
+"""
+Capture -> analyze pipeline benchmark for Doda Terminal
+Replays recorded frames through CameraManager so latency and throughput can be
+measured repeatably without a camera (or a robot).
+
+Examples:
+    python benchmark_pipeline.py --source images:game/gift_photos --fps 0 --frames 100
+    python benchmark_pipeline.py --source video:clip.mp4 --threaded
+    python benchmark_pipeline.py --source images:game/gift_photos --frames 5 --analyze
+"""
+
+import argparse
+import statistics
+import time
+from dataclasses import replace
+
+from dotenv import load_dotenv
+
+from robot.camera import CameraManager, STILL_PROFILE
+from robot.camera_backends import open_backend
+
+
+def _summary(samples: list) -> str:
+    """Format latency samples (seconds) as milliseconds"""
+    if not samples:
+        return "n/a"
+
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return (f"mean {statistics.mean(ordered) * 1000:7.2f} ms | "
+            f"p50 {statistics.median(ordered) * 1000:7.2f} ms | "
+            f"p95 {p95 * 1000:7.2f} ms | max {ordered[-1] * 1000:7.2f} ms")
+
+
+def run_benchmark(source: str, frames: int, fps: float, threaded: bool, analyze: bool) -> dict:
+    """
+    Push frames from a replay source through the gift pipeline
+
+    Args:
+        source: Backend source string (see robot.camera_backends.open_backend)
+        frames: Number of frames to process
+        fps: Replay rate (0 for as fast as possible)
+        threaded: Use the background frame grabber
+        analyze: Also call the Vision API and preference evaluation (needs API key)
+
+    Returns:
+        dict of latency samples per stage plus total wall time
+    """
+    from tools.vision_helper import analyze_image, prepare_image
+
+    # The replay rate comes from --fps, so only take size/format from the profile
+    camera = CameraManager(backend=open_backend(source, fps=fps), threaded=threaded,
+                           profile=replace(STILL_PROFILE, fps=None))
+    if not camera.is_connected():
+        raise SystemExit(f"Could not open source: {source}")
+
+    stages = {"capture": [], "prepare": [], "analyze": []}
+    frame_timeout = max(1.0, 2.0 / fps) if fps else 1.0
+    last_timestamp = 0.0
+    start = time.perf_counter()
+
+    for _ in range(frames):
+        t0 = time.perf_counter()
+        if camera.grabber is not None and camera.grabber.is_running():
+            # The grabber hands out its latest frame again until a new one
+            # arrives; only count frames we haven't processed yet
+            result = camera.grabber.wait_for_frame(newer_than=last_timestamp, timeout=frame_timeout)
+            frame = None
+            if result is not None:
+                frame, last_timestamp = result
+        else:
+            frame = camera.capture_still()
+        t1 = time.perf_counter()
+        if frame is None:
+            break
+        stages["capture"].append(t1 - t0)
+
+        prepare_image(frame)
+        t2 = time.perf_counter()
+        stages["prepare"].append(t2 - t1)
+
+        if analyze:
+            analyze_image(frame)
+            stages["analyze"].append(time.perf_counter() - t2)
+
+    elapsed = time.perf_counter() - start
+    info = camera.get_info()
+    camera.disconnect()
+
+    return {"stages": stages, "elapsed": elapsed, "camera": info}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the capture -> analyze pipeline")
+    parser.add_argument("--source", default="images:game/gift_photos",
+                        help="device:N, video:PATH or images:DIR")
+    parser.add_argument("--frames", type=int, default=50, help="Frames to process")
+    parser.add_argument("--fps", type=float, default=0.0,
+                        help="Replay rate (0 = unpaced)")
+    parser.add_argument("--threaded", action="store_true", help="Use the background grabber")
+    parser.add_argument("--analyze", action="store_true", help="Include Vision API calls")
+    args = parser.parse_args()
+
+    load_dotenv()
+    result = run_benchmark(args.source, args.frames, args.fps, args.threaded, args.analyze)
+
+    processed = len(result["stages"]["capture"])
+    print(f"\nSource: {result['camera'].get('source')}")
+    print(f"Frames: {processed} in {result['elapsed']:.2f}s "
+          f"({processed / result['elapsed']:.1f} frames/s)")
+    for stage, samples in result["stages"].items():
+        if samples:
+            print(f"  {stage:<8} {_summary(samples)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Blend hand-over check for Doda behaviors
+Plays a chain of behaviors as blended keyframe trajectories on the simulator
+and measures how far each joint's setpoint jumps where one behavior hands
+over to the next. No robot needed.
+
+Usage:
+    python check_blend.py [behavior ...]     (default: greeting pleased)
+
+Exits non-zero if any hand-over jumps by more than --max-jump.
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+from typing import Dict, List
+
+from robot.controller import RobotController
+
+
+class SetpointTap:
+    """Controller wrapper that records every set_positions() with the behavior that sent it"""
+
+    def __init__(self, controller, handles: list, commands: list):
+        """
+        Wrap a controller
+
+        Args:
+            controller: Controller to forward to
+            handles: Behavior handles in queue order (filled in by the caller)
+            commands: Receives (behavior index, {joint: setpoint}) per command
+        """
+        self._controller = controller
+        self._handles = handles
+        self._commands = commands
+
+    def set_positions(self, positions, *args, **kwargs):
+        running = next((i for i, handle in enumerate(self._handles) if handle.running()), -1)
+        self._commands.append((running, dict(positions)))
+        return self._controller.set_positions(positions, *args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._controller, name)
+
+
+def check_blend_handover(behaviors: List[str], max_jump: float = 5.0) -> List[dict]:
+    """
+    Play a chain of behaviors as blended trajectories in the simulator and
+    measure each hand-over
+
+    Args:
+        behaviors: Behavior names, queued back to back
+        max_jump: Largest allowed change of a joint's setpoint across a hand-over
+
+    Returns:
+        One dict per hand-over: behaviors, largest setpoint jump, joint, ok
+    """
+    robot = RobotController(simulated=True, use_trajectories=True, telemetry_hz=0)
+    if not robot.connect():
+        raise RuntimeError(f"Simulator did not connect: {robot.connection_error()}")
+
+    handles: list = []
+    commands: list = []   # (behavior index, {joint: setpoint})
+
+    robot.controller = SetpointTap(robot.controller, handles, commands)
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            handles.extend(robot.submit_behavior(name) for name in behaviors)
+            for handle in handles:
+                handle.result()
+    finally:
+        robot.disconnect()
+
+    # Jump of each joint from its last setpoint in the previous behavior
+    # to its first setpoint in the next one
+    report = []
+    last: Dict[str, float] = {}
+    for i in range(len(behaviors)):
+        if i > 0:
+            first: Dict[str, float] = {}
+            for index, positions in commands:
+                if index == i:
+                    for joint, value in positions.items():
+                        first.setdefault(joint, value)
+            jumps = {joint: abs(value - last[joint]) for joint, value in first.items() if joint in last}
+            joint = max(jumps, key=jumps.get) if jumps else None
+            jump = jumps[joint] if joint else 0.0
+            report.append({
+                "from": behaviors[i - 1],
+                "to": behaviors[i],
+                "joint": joint,
+                "jump": round(jump, 3),
+                "ok": jump <= max_jump
+            })
+        for index, positions in commands:
+            if index == i:
+                last.update(positions)
+
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check blended behavior hand-overs in the simulator")
+    parser.add_argument("behaviors", nargs="*", default=["greeting", "pleased"],
+                        help="Behaviors to chain")
+    parser.add_argument("--max-jump", type=float, default=5.0,
+                        help="Largest allowed setpoint jump (normalized units)")
+    args = parser.parse_args()
+
+    failed = False
+    for handover in check_blend_handover(args.behaviors, args.max_jump):
+        status = "ok" if handover["ok"] else "JUMP"
+        print(f"{handover['from']} -> {handover['to']}: {handover['jump']:.2f} ({handover['joint']}) {status}")
+        failed = failed or not handover["ok"]
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
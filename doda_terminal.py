@@ -207,6 +207,25 @@ Just type normally to chat with Doda. Doda will use tools autonomously to:
     console.print(panel)
 
 
+def play_end_sequence(robot, won: bool):
+    """Win (woo) or lose (dies, then limp) sequence with its screen."""
+    if won:
+        # Win sequence
+        print_system_message("Executing dodo_woo behavior...", "success")
+        robot.execute_behavior("woo", preempt=True)
+        print_win_screen()
+    else:
+        # Lose sequence
+        print_system_message("PLEASE NO MOREEEE...", "warning")
+        # Dies sequence on the open connection, then go limp where she fell
+        result = robot.execute_behavior("dies", preempt=True)
+        if not result["success"]:
+            print_system_message(f"Dies sequence failed: {result['error']}", "error")
+        robot.disable_all_torques()
+        print_system_message("Doda is no more.", "warning")
+        print_lose_screen()
+
+
 def handle_view_gift(agent, game_state):
     """Handle manual gift viewing command."""
     print_system_message("Capturing and analyzing gift...", "info")
@@ -250,8 +269,10 @@ def main():
     try:
         from agent import DodaAgent
         from robot.controller import RobotController
-        from robot.camera import CameraManager
+        from robot.camera import CameraManager, STILL_PROFILE
+        from robot.camera_backends import open_backend
         from game import GameState
+        from game.store import GiftStore
         from game.preferences import PreferencesSystem
     except ImportError as e:
         print_system_message(f"Error importing components: {e}", "error")
@@ -262,17 +283,36 @@ def main():
     print_system_message("Initializing Doda Terminal...", "info")
 
     # Robot controller (LeKiwi with calibration)
-    robot = RobotController(port="COM8")  # COM8 for LeKiwi
-
-    # Camera (index 1)
-    camera = CameraManager(preferred_index=1)
+    # DODA_SPEED_FACTOR speeds up (or slows down) every behavior, e.g. 1.5 for competition runs
+    # DODA_TELEMETRY_LOG records commanded vs. measured joint positions to a ring buffer file
+    speed_setting = os.getenv("DODA_SPEED_FACTOR", "1.0")
+    try:
+        speed_factor = float(speed_setting)
+    except ValueError:
+        print_system_message(f"Warning: invalid DODA_SPEED_FACTOR '{speed_setting}', using 1.0", "warning")
+        speed_factor = 1.0
+
+    robot = RobotController(port="COM8",  # COM8 for LeKiwi
+                            speed_factor=speed_factor,
+                            telemetry_log=os.getenv("DODA_TELEMETRY_LOG") or None)
+    robot.connect_in_background()  # Supervisor connects (and reconnects) off the hot path
+
+    # Camera (index 1) - background grabber keeps frames fresh for gift capture
+    # DODA_CAMERA_SOURCE replays recordings instead, e.g. images:game/gift_photos
+    camera_source = os.getenv("DODA_CAMERA_SOURCE")
+    if camera_source:
+        print_system_message(f"Using camera source: {camera_source}", "info")
+        camera = CameraManager(backend=open_backend(camera_source), threaded=True,
+                               profile=STILL_PROFILE)
+    else:
+        camera = CameraManager(preferred_index=1, threaded=True, profile=STILL_PROFILE)
 
     if not camera.is_connected():
         print_system_message("Warning: Camera not detected. Gift viewing will not work.", "warning")
         print_system_message("Connect camera and restart, or see /help for camera detection.", "info")
 
-    # Game state
-    game_state = GameState()
+    # Game state (gifts and sessions are also kept in the SQLite gift store)
+    game_state = GameState(store=GiftStore())
 
     # Preferences
     preferences = PreferencesSystem()
@@ -303,28 +343,7 @@ def main():
             if status["game_over"]:
                 console.print()
 
-                if status["won"]:
-                    # Win sequence
-                    print_system_message("Executing dodo_woo behavior...", "success")
-                    robot.execute_behavior("woo")
-                    print_win_screen()
-                else:
-                    # Lose sequence
-                    print_system_message("PLEASE NO MOREEEE...", "warning")
-                    # Disconnect current robot connection to free COM8
-                    robot.disconnect()
-                    # Run SO101 preset directly
-                    import subprocess
-                    subprocess.run([
-                        "python",
-                        r"C:\Users\hussa\Desktop\zetta-projects\so101\so101_control.py",
-                        "--port", "COM8",
-                        "--calibration", "lekiwi-calibrated.json",
-                        "--preset", "creative-movements/dodo_dies"
-                    ])
-                    print_system_message("Doda is no more.", "warning")
-                    # Note: torques are already disabled by the preset disconnecting
-                    print_lose_screen()
+                play_end_sequence(robot, status["won"])
 
                 console.print()
                 print_system_message("Game over! Type /reset to play again or /exit to quit.", "info")
@@ -335,6 +354,7 @@ def main():
                         cmd = console.input("[bold cyan]>[/bold cyan] ").strip().lower()
                         if cmd == "/reset":
                             game_state.reset()
+                            robot.enable_all_torques()  # Back on her feet after the lose sequence
                             print_system_message("Game reset! Starting fresh...", "success")
                             print_gratification_status(game_state)
                             console.print()
@@ -395,20 +415,14 @@ def main():
                     print_system_message("[DEBUG] Triggering win condition...", "warning")
                     console.print()
                     # Set game state - the main loop will handle the behavior and screen
-                    game_state.gratification = 30
-                    game_state.game_over = True
-                    game_state.won = True
-                    game_state.save()
+                    game_state.override(gratification=30, game_over=True, won=True)
 
                 elif cmd == "/test-lose":
                     # Debug command to test lose condition
                     print_system_message("[DEBUG] Triggering lose condition...", "warning")
                     console.print()
                     # Set game state - the main loop will handle the behavior and screen
-                    game_state.gratification = -30
-                    game_state.game_over = True
-                    game_state.won = False
-                    game_state.save()
+                    game_state.override(gratification=-30, game_over=True, won=False)
 
                 else:
                     print_system_message(f"Unknown command: {user_input}", "error")
@@ -439,7 +453,12 @@ def main():
         print_system_message("Goodbye!", "success")
 
     finally:
-        # Cleanup
+        # Cleanup - make sure queued gift photos and descriptions hit the disk
+        from robot.photo_writer import get_photo_writer
+        get_photo_writer().close()
+        game_state.close()
+        game_state.store.close()
+        game_state.persistence.close()  # Preference changes still waiting to be written
         robot.disconnect()
         if camera:
             camera.disconnect()
@@ -0,0 +1,30 @@
+"""
+File helpers shared by the robot and game layers
+Kept free of OpenCV/NumPy so the game state, journal and preferences can be
+used without the camera stack installed.
+"""
+
+import os
+from pathlib import Path
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = False):
+    """
+    Write a file so readers never see it half-written
+
+    Args:
+        path: Destination file
+        data: File contents
+        fsync: Flush to disk before the rename (survives power loss)
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if fsync:
+            f.flush()
+            os.fsync(f.fileno())
+
+    os.replace(tmp_path, path)
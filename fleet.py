@@ -0,0 +1,475 @@
+"""
+Doda Fleet - several dodo stations in one process
+Hosts N stations from a JSON config. Each station has its own robot, camera,
+game state file, gift photo folder and agent session; all stations share the
+API client (one HTTP connection pool), the preset registry, the behavior
+analyzers (one per calibration file), the preferences, the background photo
+writer and the SQLite gift store (each station's games are recorded as
+sessions under its name).
+
+Turns run on a worker pool shared by the fleet, one at a time per station,
+so a slow vision call at one station doesn't hold up the others.
+
+Usage:
+    python fleet.py [fleet.json]
+
+Console:
+    @north hello there      Talk to station "north"
+    @north /view-gift       Capture and analyze the gift at "north"
+    @north /reset           Reset the game at "north"
+    /metrics                Per-station metrics
+    /exit                   Quit
+"""
+
+import json
+import os
+import sys
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+from dotenv import load_dotenv
+from rich import box
+from rich.panel import Panel
+from rich.table import Table
+
+from doda_terminal import console, play_end_sequence, print_system_message
+from game.persistence import get_persistence
+
+DEFAULT_CONFIG_PATH = "fleet.json"
+VIEW_GIFT_PROMPT = "The human wants me to view the gift in front of me. I should use capture_and_analyze_gift."
+
+
+@dataclass
+class StationConfig:
+    """One station's devices and files"""
+    name: str
+    port: str = "COM8"
+    camera: Union[int, str, None] = None    # Camera index, DODA_CAMERA_SOURCE-style source, or none
+    camera_cache: Optional[str] = None      # Defaults to game/stations/<name>/camera_cache.json
+    state_file: Optional[str] = None        # Defaults to game/stations/<name>/save_state.json
+    photo_dir: Optional[str] = None         # Defaults to game/stations/<name>/gift_photos
+    calibration_file: Optional[str] = None
+    telemetry_log: Optional[str] = None
+    speed_factor: float = 1.0
+    simulated: bool = False
+
+    def __post_init__(self):
+        station_dir = Path("game") / "stations" / self.name
+        if self.state_file is None:
+            self.state_file = str(station_dir / "save_state.json")
+        if self.photo_dir is None:
+            self.photo_dir = str(station_dir / "gift_photos")
+        if self.camera_cache is None:
+            self.camera_cache = str(station_dir / "camera_cache.json")
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "StationConfig":
+        return cls(**data)
+
+
+def load_fleet_config(path) -> List[StationConfig]:
+    """
+    Load station configs from a JSON file
+
+    Args:
+        path: File with {"stations": [{"name": ..., "port": ..., ...}, ...]}
+
+    Returns:
+        List of StationConfig (names are unique)
+    """
+    with open(Path(path), 'r') as f:
+        data = json.load(f)
+
+    stations = [StationConfig.from_dict(entry) for entry in data.get("stations", [])]
+    names = [station.name for station in stations]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        raise ValueError(f"Duplicate station names: {', '.join(duplicates)}")
+
+    # Two stations on one device would fight over it
+    ports = [station.port for station in stations if not station.simulated]
+    if len(ports) != len(set(ports)):
+        raise ValueError("Each real station needs its own serial port")
+    return stations
+
+
+@dataclass
+class SharedResources:
+    """Everything the stations share"""
+    api_key: str
+    client: object
+    presets: object
+    analyzers: Dict[str, object]    # Resolved calibration path -> BehaviorAnalyzer
+    preferences: object
+    photo_writer: object
+    store: object
+    pool: ThreadPoolExecutor        # Runs station turns (see Station.submit)
+
+    def analyzer_for(self, calibration_file: Optional[str]):
+        """Behavior analyzer for a calibration file, shared by the stations that use it"""
+        from robot.behavior_analyzer import DEFAULT_CALIBRATION_PATH, BehaviorAnalyzer
+
+        key = str(Path(calibration_file or DEFAULT_CALIBRATION_PATH).resolve())
+        if key not in self.analyzers:
+            self.analyzers[key] = BehaviorAnalyzer(self.presets, calibration_file)
+        return self.analyzers[key]
+
+
+@dataclass
+class StationMetrics:
+    """Per-station counters"""
+    turns: int = 0
+    errors: int = 0
+    gifts: int = 0
+    wins: int = 0
+    losses: int = 0
+    total_turn_time: float = 0.0
+    max_turn_time: float = 0.0
+    last_turn_at: Optional[float] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record_turn(self, duration: float, ok: bool, gifts: int = 0):
+        with self._lock:
+            self.turns += 1
+            if not ok:
+                self.errors += 1
+            self.gifts += gifts
+            self.total_turn_time += duration
+            self.max_turn_time = max(self.max_turn_time, duration)
+            self.last_turn_at = time.time()
+
+    def record_error(self):
+        """An exception escaped a turn"""
+        with self._lock:
+            self.errors += 1
+
+    def record_game(self, won: bool):
+        with self._lock:
+            if won:
+                self.wins += 1
+            else:
+                self.losses += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            return {
+                "turns": self.turns,
+                "errors": self.errors,
+                "gifts": self.gifts,
+                "wins": self.wins,
+                "losses": self.losses,
+                "mean_turn_time": round(self.total_turn_time / self.turns, 3) if self.turns else None,
+                "max_turn_time": round(self.max_turn_time, 3),
+                "last_turn_at": self.last_turn_at
+            }
+
+
+class Station:
+    """One dodo station: robot, camera, game state and agent session"""
+
+    def __init__(self, config: StationConfig, shared: SharedResources):
+        """
+        Initialize station
+
+        Args:
+            config: Station devices and files
+            shared: Resources shared across the fleet
+        """
+        from agent import DodaAgent
+        from game import GameState
+        from robot.camera import CameraManager, STILL_PROFILE
+        from robot.camera_backends import open_backend
+        from robot.controller import RobotController
+
+        self.config = config
+        self.name = config.name
+        self.metrics = StationMetrics()
+
+        self.robot = RobotController(
+            port=config.port,
+            calibration_file=config.calibration_file,
+            presets=shared.presets,
+            speed_factor=config.speed_factor,
+            simulated=config.simulated,
+            telemetry_log=config.telemetry_log,
+            analyzer=shared.analyzer_for(config.calibration_file)
+        )
+
+        self.camera = None
+        if isinstance(config.camera, str):
+            self.camera = CameraManager(backend=open_backend(config.camera), threaded=True,
+                                        profile=STILL_PROFILE)
+        elif config.camera is not None:
+            # Own cache and no auto-detect, so a station never picks up another station's camera
+            self.camera = CameraManager(preferred_index=config.camera, threaded=True, profile=STILL_PROFILE,
+                                        cache_path=Path(config.camera_cache), fallback=False)
+
+        self.game_state = GameState(save_path=config.state_file, store=shared.store, station=self.name)
+        self.agent = DodaAgent(
+            api_key=shared.api_key,
+            robot=self.robot,
+            camera=self.camera,
+            preferences=shared.preferences,
+            game_state=self.game_state,
+            client=shared.client,
+            photo_dir=config.photo_dir
+        )
+
+        # Turns at a station run in order on the shared pool, stations in parallel
+        self._pool = shared.pool
+        self._queue: deque = deque()    # (text, future) waiting for this station
+        self._queue_cond = threading.Condition()
+        self._draining = False          # A pool worker is running this station's turns
+
+    def start(self):
+        """Connect the robot in the background"""
+        self.robot.connect_in_background()
+        if self.camera is not None and not self.camera.is_connected():
+            self._say("Camera not detected, gift viewing will not work", "warning")
+
+    def submit(self, text: str) -> Future:
+        """Queue a message or station command; returns a future for the response text"""
+        future = Future()
+        future.add_done_callback(self._turn_done)
+        with self._queue_cond:
+            self._queue.append((text, future))
+            if self._draining:
+                return future
+            self._draining = True
+        self._pool.submit(self._drain)
+        return future
+
+    def _drain(self):
+        """Run this station's queued turns one after another on a pool worker"""
+        while True:
+            with self._queue_cond:
+                if not self._queue:
+                    self._draining = False
+                    self._queue_cond.notify_all()
+                    return
+                text, future = self._queue.popleft()
+
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(self._turn(text))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _turn_done(self, future: Future):
+        """Report exceptions that escaped a turn (nobody waits on the future)"""
+        if future.cancelled() or future.exception() is None:
+            return
+        self.metrics.record_error()
+        self._say(f"Turn failed: {future.exception()}", "error")
+
+    def _say(self, message: str, msg_type: str = "info"):
+        print_system_message(f"{self.name}: {message}", msg_type)
+
+    def _turn(self, text: str) -> Optional[str]:
+        """Handle one input on the station worker"""
+        command = text.lower()
+        if command == "/reset":
+            self.game_state.reset()
+            self.robot.enable_all_torques()
+            self._say("Game reset! Starting fresh...", "success")
+            return None
+
+        if command == "/status":
+            status = self.game_state.get_status()
+            self._say(f"Gratification {status['gratification']:+d}, {status['gift_count']} gifts")
+            return None
+
+        if self.game_state.game_over:
+            self._say("Game is over. Send /reset to play again", "info")
+            return None
+
+        message = VIEW_GIFT_PROMPT if command == "/view-gift" else text
+        gifts_before = len(self.game_state.gift_history)
+
+        start = time.monotonic()
+        try:
+            response = self.agent.send_message(message)
+            ok = True
+        except Exception as e:
+            response, ok = None, False
+            self._say(f"Error communicating with agent: {e}", "error")
+        self.metrics.record_turn(time.monotonic() - start, ok,
+                                 gifts=len(self.game_state.gift_history) - gifts_before)
+
+        if response:
+            console.print(Panel(response, title=f"🦤 Doda @ {self.name}", title_align="left",
+                                border_style="white", box=box.ROUNDED))
+
+        status = self.game_state.get_status()
+        if status["game_over"]:
+            play_end_sequence(self.robot, status["won"])
+            self.metrics.record_game(status["won"])
+            self._say("Game over! Send /reset to play again.", "info")
+        return response
+
+    def get_metrics(self) -> dict:
+        status = self.game_state.get_status()
+        metrics = self.metrics.to_dict()
+        metrics.update({
+            "robot": self.robot.get_connection_status()["state"],
+            "camera": self.camera.is_connected() if self.camera is not None else False,
+            "gratification": status["gratification"],
+            "game_over": status["game_over"]
+        })
+        return metrics
+
+    def close(self):
+        """Finish queued turns, then release the devices"""
+        with self._queue_cond:
+            while self._draining:
+                self._queue_cond.wait()
+        self.game_state.close()
+        self.robot.disconnect()
+        if self.camera is not None:
+            self.camera.disconnect()
+
+
+class StationManager:
+    """Hosts every station of the fleet and the resources they share"""
+
+    def __init__(self, configs: List[StationConfig], api_key: str):
+        """
+        Initialize station manager
+
+        Args:
+            configs: Station configs (see load_fleet_config)
+            api_key: Anthropic API key
+        """
+        from game.preferences import PreferencesSystem
+        from game.store import GiftStore
+        from robot.photo_writer import get_photo_writer
+        from robot.preset_registry import PresetRegistry
+        from tools.vision_helper import get_client
+
+        os.environ.setdefault("ANTHROPIC_API_KEY", api_key)
+        presets = PresetRegistry()
+        self.shared = SharedResources(
+            api_key=api_key,
+            client=get_client(),
+            presets=presets,
+            analyzers={},
+            preferences=PreferencesSystem(),
+            photo_writer=get_photo_writer(),
+            store=GiftStore(),
+            # A worker per station, so a busy station never waits for a free one
+            pool=ThreadPoolExecutor(max_workers=max(1, len(configs)), thread_name_prefix="Station")
+        )
+        self.stations: Dict[str, Station] = {config.name: Station(config, self.shared) for config in configs}
+
+    def start(self):
+        """Connect every station and warm the behavior analysis caches"""
+        for station in self.stations.values():
+            station.start()
+        for analyzer in self.shared.analyzers.values():
+            analyzer.analyze_all()
+
+    def dispatch(self, station_name: str, text: str) -> Future:
+        """
+        Send input to one station
+
+        Raises:
+            KeyError: Unknown station
+        """
+        return self.stations[station_name].submit(text)
+
+    def get_metrics(self) -> Dict[str, dict]:
+        return {name: station.get_metrics() for name, station in self.stations.items()}
+
+    def close(self):
+        for station in self.stations.values():
+            station.close()
+        self.shared.pool.shutdown(wait=True)
+        self.shared.photo_writer.close()
+        self.shared.store.close()
+        get_persistence().close()
+
+
+def print_metrics(metrics: Dict[str, dict]):
+    """Per-station metrics table"""
+    table = Table(box=box.ROUNDED, border_style="blue")
+    for column in ("Station", "Robot", "Camera", "Gratification", "Turns", "Errors", "Gifts",
+                   "W/L", "Mean turn", "Max turn"):
+        table.add_column(column)
+
+    for name, m in metrics.items():
+        mean = f"{m['mean_turn_time']:.1f}s" if m["mean_turn_time"] is not None else "-"
+        table.add_row(
+            name, m["robot"], "yes" if m["camera"] else "no",
+            f"{m['gratification']:+d}" + (" (over)" if m["game_over"] else ""),
+            str(m["turns"]), str(m["errors"]), str(m["gifts"]),
+            f"{m['wins']}/{m['losses']}", mean, f"{m['max_turn_time']:.1f}s"
+        )
+    console.print(table)
+
+
+def main():
+    """Fleet console entry point."""
+    load_dotenv()
+
+    api_key = os.getenv("ANTHROPIC_API_KEY")
+    if not api_key:
+        print_system_message("Error: ANTHROPIC_API_KEY not found in environment variables.", "error")
+        sys.exit(1)
+
+    config_path = sys.argv[1] if len(sys.argv) > 1 else os.getenv("DODA_FLEET_CONFIG", DEFAULT_CONFIG_PATH)
+    try:
+        configs = load_fleet_config(config_path)
+    except (OSError, ValueError) as e:
+        print_system_message(f"Error loading fleet config {config_path}: {e}", "error")
+        sys.exit(1)
+
+    print_system_message(f"Starting {len(configs)} stations...", "info")
+    manager = StationManager(configs, api_key)
+    manager.start()
+    print_system_message(f"Stations: {', '.join(manager.stations)}", "success")
+    print_system_message("Type @station message, /metrics or /exit", "info")
+
+    try:
+        while True:
+            try:
+                user_input = console.input("[bold cyan]fleet>[/bold cyan] ").strip()
+            except EOFError:
+                break
+
+            if not user_input:
+                continue
+
+            if user_input.lower() in ("/exit", "/quit"):
+                break
+
+            if user_input.lower() == "/metrics":
+                print_metrics(manager.get_metrics())
+                continue
+
+            if not user_input.startswith("@") or " " not in user_input:
+                print_system_message("Address a station: @name message", "error")
+                continue
+
+            station_name, text = user_input[1:].split(" ", 1)
+            try:
+                manager.dispatch(station_name, text.strip())
+            except KeyError:
+                print_system_message(f"Unknown station: {station_name}", "error")
+
+    except KeyboardInterrupt:
+        console.print()
+
+    finally:
+        print_system_message("Shutting down stations...", "info")
+        manager.close()
+        print_system_message("Goodbye!", "success")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,4 +1,5 @@
 """Game state management"""
 from .state import GameState, GiftRecord
+from .store import GiftStore
 
-__all__ = ['GameState', 'GiftRecord']
+__all__ = ['GameState', 'GiftRecord', 'GiftStore']
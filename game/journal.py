@@ -0,0 +1,185 @@
+"""
+Append-only journal for Doda Terminal game state
+Every state change is one compact JSON line appended to a journal file next to
+the snapshot (save_state.json -> save_state.journal). Every so often the full
+state is written as a new snapshot and the journal is truncated. Loading reads
+the snapshot and replays the journal lines after it, so both writing and
+loading cost the same per event no matter how long the gift history is.
+
+A crash can at worst leave a half-written last line, which load discards.
+
+Snapshots may be written from another thread (see game/persistence.py) while
+events keep being appended; the journal is only truncated if nothing was
+appended after the state the snapshot holds.
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from fileio import atomic_write
+
+# fsync policies
+FSYNC_ALWAYS = "always"       # fsync after every event (survives power loss)
+FSYNC_INTERVAL = "interval"   # fsync at most every fsync_interval seconds
+FSYNC_NEVER = "never"         # flush to the OS only (survives a crash of the process)
+FSYNC_POLICIES = (FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER)
+
+
+class GameJournal:
+    """Snapshot file plus an append-only JSON-lines journal"""
+
+    def __init__(self, snapshot_path, fsync: str = FSYNC_INTERVAL, fsync_interval: float = 1.0,
+                 snapshot_every: int = 100):
+        """
+        Initialize journal
+
+        Args:
+            snapshot_path: Full-state snapshot file (the journal sits next to it)
+            fsync: One of FSYNC_ALWAYS, FSYNC_INTERVAL, FSYNC_NEVER
+            fsync_interval: Seconds between fsyncs with FSYNC_INTERVAL
+            snapshot_every: Events appended before a snapshot is due
+        """
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync} (use one of {', '.join(FSYNC_POLICIES)})")
+
+        self.snapshot_path = Path(snapshot_path)
+        self.journal_path = self.snapshot_path.with_suffix(".journal")
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.snapshot_every = snapshot_every
+
+        self.seq = 0                 # Sequence number of the last event written
+        self.pending = 0             # Events in the journal since the last snapshot
+        self._file = None
+        self._last_fsync = 0.0
+        self._snapshot_seq = 0       # Seq of the newest snapshot on disk
+        self._lock = threading.Lock()            # Journal file and counters
+        self._snapshot_lock = threading.Lock()   # Snapshot file
+
+    def load(self) -> Tuple[Optional[dict], List[dict]]:
+        """
+        Read the snapshot and the events written after it
+
+        Returns:
+            (snapshot dict or None, events in order)
+        """
+        snapshot = None
+        if self.snapshot_path.exists():
+            with open(self.snapshot_path, 'r') as f:
+                snapshot = json.load(f)
+        snapshot_seq = snapshot.get("seq", 0) if snapshot else 0
+
+        events = []
+        if self.journal_path.exists():
+            with open(self.journal_path, 'rb') as f:
+                data = f.read()
+
+            offset = 0
+            good_end = 0
+            for line in data.splitlines(keepends=True):
+                offset += len(line)
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError("unterminated line")
+                    event = json.loads(line)
+                except ValueError:
+                    print(f"Warning: skipping damaged journal line in {self.journal_path}")
+                    continue
+                good_end = offset
+                # Events already in the snapshot (crash between snapshot and truncate)
+                if event.get("seq", 0) > snapshot_seq:
+                    events.append(event)
+
+            # Cut off a torn last write so new events start on a clean line
+            if good_end < len(data):
+                with open(self.journal_path, 'r+b') as f:
+                    f.truncate(good_end)
+
+        with self._lock:
+            self.seq = max([snapshot_seq] + [event["seq"] for event in events])
+            self.pending = len(events)
+            self._snapshot_seq = snapshot_seq
+        return snapshot, events
+
+    def append(self, event: dict) -> dict:
+        """
+        Write one event as a journal line
+
+        Args:
+            event: JSON-serializable event (gets a "seq" number)
+
+        Returns:
+            The event as written
+        """
+        with self._lock:
+            self.seq += 1
+            event = dict(event, seq=self.seq)
+
+            if self._file is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.journal_path, 'a', encoding="utf-8")
+
+            self._file.write(json.dumps(event, separators=(",", ":")) + "\n")
+            self._file.flush()
+
+            now = time.monotonic()
+            if self.fsync == FSYNC_ALWAYS or \
+                    (self.fsync == FSYNC_INTERVAL and now - self._last_fsync >= self.fsync_interval):
+                os.fsync(self._file.fileno())
+                self._last_fsync = now
+
+            self.pending += 1
+            return event
+
+    @property
+    def snapshot_due(self) -> bool:
+        return self.pending >= self.snapshot_every
+
+    def write_snapshot(self, state: dict, seq: Optional[int] = None):
+        """
+        Write the full state as the new snapshot and compact the journal
+
+        Args:
+            state: Full state
+            seq: Seq of the last event the state includes (default: the last
+                event written; pass it when the snapshot is written later)
+        """
+        if seq is None:
+            seq = self.seq
+
+        with self._snapshot_lock:
+            # A newer snapshot already made it to disk
+            if seq < self._snapshot_seq:
+                return
+            data = dict(state, seq=seq)
+            atomic_write(self.snapshot_path, json.dumps(data, indent=2).encode("utf-8"),
+                         fsync=self.fsync != FSYNC_NEVER)
+            self._snapshot_seq = seq
+
+        with self._lock:
+            # Events appended since the state was captured stay in the journal
+            if seq != self.seq:
+                return
+
+            # The snapshot now holds everything in the journal
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if self.journal_path.exists():
+                open(self.journal_path, 'w').close()
+            self.pending = 0
+
+    def close(self):
+        """Flush (and fsync unless FSYNC_NEVER) and close the journal file"""
+        with self._lock:
+            if self._file is None:
+                return
+            self._file.flush()
+            if self.fsync != FSYNC_NEVER:
+                os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
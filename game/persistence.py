@@ -0,0 +1,221 @@
+"""
+Debounced background persistence for Doda Terminal
+Files that get rewritten on every change (preferences, game state snapshots)
+are scheduled here instead of written inline. A worker thread writes each one
+once its debounce window has passed; a burst of changes to the same file
+within the window becomes a single write of the latest contents.
+
+Writes are atomic (temp file + rename, see fileio.atomic_write).
+Everything still pending is written on close(), at interpreter exit and on
+SIGTERM, so the last change before shutdown is never lost.
+"""
+
+import atexit
+import json
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from fileio import atomic_write
+
+DEFAULT_DELAY = 0.5       # Seconds of quiet before a file is written
+DEFAULT_MAX_DELAY = 2.0   # A file is written at most this long after its first pending change
+
+
+class _Pending:
+    """Latest write scheduled for one key"""
+    __slots__ = ("write", "first", "deadline")
+
+    def __init__(self, write: Callable[[], None], first: float, deadline: float):
+        self.write = write
+        self.first = first
+        self.deadline = deadline
+
+
+class PersistenceService:
+    """Coalesces rapid rewrites of the same file and performs them on a worker thread"""
+
+    def __init__(self, delay: float = DEFAULT_DELAY, max_delay: float = DEFAULT_MAX_DELAY):
+        """
+        Initialize persistence service
+
+        Args:
+            delay: Debounce window - a key is written once it has been quiet this long
+            max_delay: Upper bound on how long a key under constant change waits
+        """
+        self.delay = delay
+        self.max_delay = max(max_delay, delay)
+
+        self._pending: Dict[str, _Pending] = {}
+        self._cond = threading.Condition()
+        self._writing = 0          # Writes taken off _pending but not finished yet
+        self._closed = False
+
+        # Statistics
+        self.scheduled = 0
+        self.coalesced = 0
+        self.writes = 0
+        self.failures = 0
+
+        self._thread = threading.Thread(target=self._run, name="Persistence", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def schedule(self, key, write: Callable[[], None]):
+        """
+        Schedule a write; replaces any write still pending for the same key
+
+        Args:
+            key: What is being written (usually the file path)
+            write: Called on the worker thread; should only use data captured
+                when it was scheduled
+        """
+        key = str(key)
+        now = time.monotonic()
+        with self._cond:
+            if self._closed:
+                # Nothing left to run it - write inline rather than lose it
+                self._perform(key, write)
+                return
+
+            self.scheduled += 1
+            pending = self._pending.get(key)
+            if pending is None:
+                self._pending[key] = _Pending(write, now, now + self.delay)
+            else:
+                self.coalesced += 1
+                pending.write = write
+                pending.deadline = min(now + self.delay, pending.first + self.max_delay)
+            self._cond.notify()
+
+    def schedule_json(self, path, data, indent: Optional[int] = 2, fsync: bool = False):
+        """
+        Schedule an atomic JSON file write
+
+        Args:
+            path: Destination file
+            data: JSON-serializable data (serialized on the worker thread, so
+                pass a copy if the caller keeps mutating it)
+            indent: JSON indent
+            fsync: fsync before the rename
+        """
+        path = Path(path)
+        self.schedule(path, lambda: atomic_write(path, json.dumps(data, indent=indent).encode("utf-8"),
+                                                  fsync=fsync))
+
+    def flush(self, key=None):
+        """
+        Write pending changes now and wait until they are on disk
+
+        Args:
+            key: Only flush this key (default: everything)
+        """
+        with self._cond:
+            for pending_key, pending in self._pending.items():
+                if key is None or pending_key == str(key):
+                    pending.deadline = 0.0
+            self._cond.notify_all()
+
+            if not self._thread.is_alive():
+                self._drain_inline(key)
+                return
+
+            while self._writing or any(key is None or pending_key == str(key) for pending_key in self._pending):
+                self._cond.wait()
+
+    def close(self):
+        """Write everything pending and stop the worker"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            for pending in self._pending.values():
+                pending.deadline = 0.0
+            self._cond.notify_all()
+
+        if self._thread.is_alive() and self._thread is not threading.current_thread():
+            self._thread.join()
+
+        with self._cond:
+            self._drain_inline(None)
+
+    def _drain_inline(self, key):
+        """Run pending writes on the calling thread (worker gone); caller holds _cond"""
+        for pending_key in [k for k in self._pending if key is None or k == str(key)]:
+            self._perform(pending_key, self._pending.pop(pending_key).write)
+
+    def _perform(self, key: str, write: Callable[[], None]):
+        try:
+            write()
+            self.writes += 1
+        except Exception as e:
+            self.failures += 1
+            print(f"Error: Failed to write {key}: {e}")
+
+    def _run(self):
+        """Worker loop - write each key once its deadline has passed"""
+        while True:
+            with self._cond:
+                while True:
+                    now = time.monotonic()
+                    due = [key for key, pending in self._pending.items() if pending.deadline <= now]
+                    if due:
+                        break
+                    if self._closed and not self._pending:
+                        return
+                    timeout = min((p.deadline for p in self._pending.values()), default=now + 60.0) - now
+                    self._cond.wait(timeout)
+
+                writes = [(key, self._pending.pop(key).write) for key in due]
+                self._writing += 1
+
+            try:
+                for key, write in writes:
+                    self._perform(key, write)
+            finally:
+                with self._cond:
+                    self._writing -= 1
+                    self._cond.notify_all()
+
+    def get_stats(self) -> dict:
+        """Get service statistics"""
+        with self._cond:
+            pending = len(self._pending)
+        return {
+            "pending": pending,
+            "scheduled": self.scheduled,
+            "coalesced": self.coalesced,
+            "writes": self.writes,
+            "failures": self.failures
+        }
+
+
+_default_service: Optional[PersistenceService] = None
+_default_service_lock = threading.Lock()
+
+
+def _exit_on_signal(signum, frame):
+    # Turn the signal into a normal exit so finally blocks and atexit (close) run
+    raise SystemExit(128 + signum)
+
+
+def _install_signal_handlers():
+    """Flush on SIGTERM/SIGHUP too, unless the application handles them already"""
+    if threading.current_thread() is not threading.main_thread():
+        return
+    for name in ("SIGTERM", "SIGHUP"):
+        signum = getattr(signal, name, None)
+        if signum is not None and signal.getsignal(signum) == signal.SIG_DFL:
+            signal.signal(signum, _exit_on_signal)
+
+
+def get_persistence() -> PersistenceService:
+    """Get the process-wide persistence service (created on first use)"""
+    global _default_service
+    with _default_service_lock:
+        if _default_service is None or _default_service._closed:
+            _default_service = PersistenceService()
+            _install_signal_handlers()
+        return _default_service
@@ -6,6 +6,9 @@ from typing import Dict, List, Optional
 import json
 from pathlib import Path
 
+from fileio import atomic_write
+from .persistence import PersistenceService, get_persistence
+
 
 class PreferencesSystem:
     """Manages Doda's preferences and calculates affinity scores"""
@@ -42,8 +45,17 @@ class PreferencesSystem:
         ]
     }
 
-    def __init__(self, preferences_path: str = "game/doda_preferences.json"):
+    def __init__(self, preferences_path: str = "game/doda_preferences.json",
+                 persistence: Optional[PersistenceService] = None):
+        """
+        Initialize preferences
+
+        Args:
+            preferences_path: Preferences JSON file
+            persistence: Service that writes changes (default: the process-wide one)
+        """
         self.preferences_path = Path(preferences_path)
+        self.persistence = persistence or get_persistence()
         self.preferences = self.DEFAULT_PREFERENCES.copy()
 
         # Load custom preferences if available
@@ -146,14 +158,16 @@ class PreferencesSystem:
             "reason": reason
         })
 
-        self.save()
+        self.save_later()
 
     def save(self):
         """Save preferences to JSON file"""
-        self.preferences_path.parent.mkdir(parents=True, exist_ok=True)
+        atomic_write(self.preferences_path, json.dumps(self.preferences, indent=2).encode("utf-8"))
 
-        with open(self.preferences_path, 'w') as f:
-            json.dump(self.preferences, f, indent=2)
+    def save_later(self):
+        """Schedule a save on the persistence service (rapid changes coalesce into one write)"""
+        snapshot = {category: [dict(pref) for pref in prefs] for category, prefs in self.preferences.items()}
+        self.persistence.schedule_json(self.preferences_path, snapshot)
 
     def load(self):
         """Load preferences from JSON file"""
@@ -1,14 +1,23 @@
 """
 Game state management for Doda Terminal - Phase 2
 Tracks gratification, gift history, and win/lose conditions
+
+Changes are journaled (see game/journal.py): each gift, reset or debug
+override appends one line, and the full state is only rewritten as a
+periodic snapshot, which the persistence service (game/persistence.py) writes
+in the background. With a GiftStore attached, gifts and sessions also go
+to the SQLite store for analysis across games.
 """
 
-from dataclasses import dataclass, field
+from dataclasses import asdict, dataclass, field
 from typing import List, Dict, Optional
 from datetime import datetime
-import json
 from pathlib import Path
 
+from .journal import FSYNC_INTERVAL, GameJournal
+from .persistence import PersistenceService, get_persistence
+from .store import GiftStore
+
 
 @dataclass
 class GiftRecord:
@@ -30,23 +39,46 @@ class GameState:
     WIN_THRESHOLD = 15  # Win at +15 gratification
     LOSE_THRESHOLD = -10  # Lose at -10 gratification
 
-    def __init__(self, save_path: str = "game/save_state.json"):
+    def __init__(self, save_path: str = "game/save_state.json", fsync: str = FSYNC_INTERVAL,
+                 snapshot_every: int = 100, store: Optional[GiftStore] = None,
+                 station: Optional[str] = None, persistence: Optional[PersistenceService] = None):
+        """
+        Initialize game state
+
+        Args:
+            save_path: Snapshot file (the journal is written next to it)
+            fsync: Journal fsync policy ("always", "interval" or "never")
+            snapshot_every: Journaled events between full snapshots
+            store: Gift/session store to record every game in (optional)
+            station: Station name recorded with the sessions
+            persistence: Service that writes snapshots (default: the process-wide one)
+        """
         self.gratification = 0
         self.gift_history: List[GiftRecord] = []
         self.save_path = Path(save_path)
         self.game_over = False
         self.won = False
+        self.store = store
+        self.station = station
+        self.session_id: Optional[int] = None  # Open store session, if any
+        self.persistence = persistence or get_persistence()
+        self.journal = GameJournal(self.save_path, fsync=fsync, snapshot_every=snapshot_every)
 
         # Load existing state if available
         self.load()
 
-    def add_gift(self, gift_analysis: dict, affinity_score: int) -> GiftRecord:
+    def add_gift(self, gift_analysis: dict, affinity_score: int, affinity_reason: Optional[str] = None,
+                 matched_preferences: Optional[List[str]] = None,
+                 photo_path: Optional[str] = None) -> GiftRecord:
         """
         Add a gift to history and update gratification
 
         Args:
             gift_analysis: Vision analysis dict with object_type, description, special_features
             affinity_score: Score from preferences (-10 to +10)
+            affinity_reason: Doda's explanation (stored in the gift store)
+            matched_preferences: Matched preference keywords (stored in the gift store)
+            photo_path: Saved gift photo (stored in the gift store)
 
         Returns:
             GiftRecord with updated state
@@ -79,8 +111,12 @@ class GameState:
         # Check win/lose conditions
         self._check_game_over()
 
-        # Auto-save
-        self.save()
+        self._store_gift(record, gift_analysis, affinity_reason, matched_preferences, photo_path)
+        session_id = self.session_id
+        # Close the session first so a snapshot taken by _record doesn't keep it open
+        if self.game_over:
+            self._end_session("won" if self.won else "lost")
+        self._record({"type": "gift", "gift": asdict(record), "session": session_id})
 
         return record
 
@@ -106,55 +142,147 @@ class GameState:
 
     def reset(self):
         """Reset game state"""
-        self.gratification = 0
-        self.gift_history = []
-        self.game_over = False
-        self.won = False
-        self.save()
+        self._end_session("reset")
+        self._apply({"type": "reset"})
+        # The state is tiny now - a good moment to compact the journal
+        self._record({"type": "reset"}, snapshot=True)
 
-    def save(self):
-        """Save state to JSON file"""
-        self.save_path.parent.mkdir(parents=True, exist_ok=True)
+    def override(self, gratification: int, game_over: bool, won: bool):
+        """
+        Set the game status directly (debug commands)
+
+        Args:
+            gratification: New gratification level
+            game_over: Whether the game is over
+            won: Whether it was won
+        """
+        event = {"type": "override", "gratification": gratification, "game_over": game_over, "won": won}
+        # _apply forgets the session once the game is over, so close it first
+        if game_over:
+            self._end_session("won" if won else "lost", gratification)
+        self._apply(event)
+        self._record(event, snapshot=True)
+
+    def _store_gift(self, record: GiftRecord, gift_analysis: dict, affinity_reason: Optional[str],
+                    matched_preferences: Optional[List[str]], photo_path: Optional[str]):
+        """Record a gift in the store, opening a session for the first gift of a game"""
+        if self.store is None:
+            return
+        try:
+            if self.session_id is None:
+                self.session_id = self.store.start_session(self.station)
+            self.store.add_gift(
+                gift_analysis=gift_analysis,
+                affinity_score=record.affinity_score,
+                affinity_reason=affinity_reason,
+                matched_preferences=matched_preferences,
+                photo_path=photo_path,
+                timestamp=record.timestamp,
+                total_gratification=record.total_gratification,
+                session_id=self.session_id
+            )
+        except Exception as e:
+            print(f"Warning: Could not store gift: {e}")
 
-        data = {
+    def _end_session(self, outcome: str, final_gratification: Optional[int] = None):
+        """Close the open store session (final gratification defaults to the current one)"""
+        if self.store is None or self.session_id is None:
+            self.session_id = None
+            return
+        if final_gratification is None:
+            final_gratification = self.gratification
+        try:
+            self.store.end_session(self.session_id, outcome, final_gratification)
+        except Exception as e:
+            print(f"Warning: Could not close session: {e}")
+        self.session_id = None
+
+    def _apply(self, event: dict):
+        """Apply one journal event to the in-memory state"""
+        kind = event["type"]
+        if kind == "gift":
+            record = GiftRecord(**event["gift"])
+            self.gift_history.append(record)
+            self.gratification = record.total_gratification
+            self._check_game_over()
+            self.session_id = None if self.game_over else event.get("session")
+        elif kind == "reset":
+            self.gratification = 0
+            self.gift_history = []
+            self.game_over = False
+            self.won = False
+            self.session_id = None
+        elif kind == "override":
+            self.gratification = event["gratification"]
+            self.game_over = event["game_over"]
+            self.won = event["won"]
+            if self.game_over:
+                self.session_id = None
+        else:
+            print(f"Warning: unknown game state event: {kind}")
+
+    def _record(self, event: dict, snapshot: bool = False):
+        """
+        Journal an event that has already been applied
+
+        Args:
+            event: The event
+            snapshot: Schedule a snapshot even if one isn't due yet
+        """
+        try:
+            self.journal.append(event)
+        except OSError as e:
+            print(f"Warning: Could not journal game state: {e}")
+            return
+
+        if snapshot or self.journal.snapshot_due:
+            self.save_later()
+
+    def to_dict(self) -> dict:
+        """Full state, as written to the snapshot"""
+        return {
             "gratification": self.gratification,
             "game_over": self.game_over,
             "won": self.won,
-            "gift_history": [
-                {
-                    "timestamp": g.timestamp,
-                    "object_type": g.object_type,
-                    "description": g.description,
-                    "affinity_score": g.affinity_score,
-                    "gratification_change": g.gratification_change,
-                    "total_gratification": g.total_gratification,
-                    "is_dodo_bird": g.is_dodo_bird,
-                    "beak_size": g.beak_size,
-                    "beak_color": g.beak_color
-                }
-                for g in self.gift_history
-            ]
+            "session_id": self.session_id,
+            "gift_history": [asdict(g) for g in self.gift_history]
         }
 
-        with open(self.save_path, 'w') as f:
-            json.dump(data, f, indent=2)
+    def save(self):
+        """Write a full snapshot and compact the journal"""
+        self.journal.write_snapshot(self.to_dict())
+
+    def save_later(self):
+        """Schedule a snapshot on the persistence service (rapid calls coalesce)"""
+        state, seq = self.to_dict(), self.journal.seq
+        self.persistence.schedule(self.save_path, lambda: self.journal.write_snapshot(state, seq))
 
     def load(self):
-        """Load state from JSON file"""
-        if not self.save_path.exists():
+        """Load the snapshot and replay the journal after it"""
+        try:
+            snapshot, events = self.journal.load()
+        except Exception as e:
+            print(f"Warning: Could not load game state: {e}")
             return
 
         try:
-            with open(self.save_path, 'r') as f:
-                data = json.load(f)
+            if snapshot:
+                self.gratification = snapshot.get("gratification", 0)
+                self.game_over = snapshot.get("game_over", False)
+                self.won = snapshot.get("won", False)
+                self.session_id = snapshot.get("session_id")
 
-            self.gratification = data.get("gratification", 0)
-            self.game_over = data.get("game_over", False)
-            self.won = data.get("won", False)
+                # Reconstruct gift history
+                self.gift_history = [
+                    GiftRecord(**gift) for gift in snapshot.get("gift_history", [])
+                ]
 
-            # Reconstruct gift history
-            self.gift_history = [
-                GiftRecord(**gift) for gift in data.get("gift_history", [])
-            ]
+            for event in events:
+                self._apply(event)
         except Exception as e:
             print(f"Warning: Could not load game state: {e}")
+
+    def close(self):
+        """Write any pending snapshot and flush the journal (call on shutdown)"""
+        self.persistence.flush(self.save_path)
+        self.journal.close()
@@ -0,0 +1,355 @@
+"""
+SQLite gift and session store for Doda Terminal
+Keeps every session and gift - with its analysis and matched preferences -
+in game/doda.db, indexed on timestamp, object type and score, so questions
+like "average affinity for dodo birds this week" are a single query instead
+of a scan over save files and JSON sidecars.
+
+The schema is versioned with PRAGMA user_version. Version 2 imports the
+existing game/gift_photos/image_descriptions/*.json files.
+
+Usage:
+    python -m game.store [doda.db]     # migrate and print a summary
+"""
+
+import json
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+DEFAULT_DB_PATH = Path(__file__).parent / "doda.db"
+DESCRIPTIONS_DIR = Path(__file__).parent / "gift_photos" / "image_descriptions"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    id INTEGER PRIMARY KEY,
+    station TEXT,
+    started_at TEXT NOT NULL,
+    ended_at TEXT,
+    outcome TEXT,                   -- won, lost, reset (NULL while running)
+    final_gratification INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_started ON sessions(started_at);
+CREATE INDEX IF NOT EXISTS idx_sessions_outcome ON sessions(outcome);
+
+CREATE TABLE IF NOT EXISTS gifts (
+    id INTEGER PRIMARY KEY,
+    session_id INTEGER REFERENCES sessions(id),
+    timestamp TEXT NOT NULL,        -- ISO 8601
+    object_type TEXT NOT NULL,
+    description TEXT,
+    is_dodo_bird INTEGER NOT NULL DEFAULT 0,
+    beak_size TEXT,
+    beak_color TEXT,
+    affinity_score INTEGER NOT NULL,
+    affinity_reason TEXT,
+    total_gratification INTEGER,
+    photo_path TEXT UNIQUE
+);
+CREATE INDEX IF NOT EXISTS idx_gifts_timestamp ON gifts(timestamp);
+CREATE INDEX IF NOT EXISTS idx_gifts_object_type ON gifts(object_type, timestamp);
+CREATE INDEX IF NOT EXISTS idx_gifts_score ON gifts(affinity_score);
+CREATE INDEX IF NOT EXISTS idx_gifts_session ON gifts(session_id);
+
+CREATE TABLE IF NOT EXISTS analyses (
+    gift_id INTEGER PRIMARY KEY REFERENCES gifts(id) ON DELETE CASCADE,
+    analysis TEXT NOT NULL          -- Vision API analysis as JSON
+);
+
+CREATE TABLE IF NOT EXISTS matched_preferences (
+    gift_id INTEGER NOT NULL REFERENCES gifts(id) ON DELETE CASCADE,
+    keyword TEXT NOT NULL,
+    PRIMARY KEY (gift_id, keyword)
+);
+CREATE INDEX IF NOT EXISTS idx_matched_keyword ON matched_preferences(keyword);
+"""
+
+_INSERT_GIFT = """
+INSERT OR IGNORE INTO gifts (session_id, timestamp, object_type, description, is_dodo_bird, beak_size,
+                             beak_color, affinity_score, affinity_reason, total_gratification, photo_path)
+VALUES (:session_id, :timestamp, :object_type, :description, :is_dodo_bird, :beak_size,
+        :beak_color, :affinity_score, :affinity_reason, :total_gratification, :photo_path)
+"""
+_INSERT_ANALYSIS = "INSERT OR REPLACE INTO analyses (gift_id, analysis) VALUES (?, ?)"
+_INSERT_MATCH = "INSERT OR IGNORE INTO matched_preferences (gift_id, keyword) VALUES (?, ?)"
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _iso_timestamp(value: str) -> str:
+    """Accept ISO timestamps and the 20251103_172756 form used in photo names"""
+    try:
+        return datetime.strptime(value, "%Y%m%d_%H%M%S").isoformat()
+    except ValueError:
+        return datetime.fromisoformat(value).isoformat()
+
+
+def gift_row(gift_analysis: dict, affinity_score: int, affinity_reason: Optional[str] = None,
+             matched_preferences: Optional[List[str]] = None, photo_path: Optional[str] = None,
+             timestamp: Optional[str] = None, total_gratification: Optional[int] = None,
+             session_id: Optional[int] = None) -> dict:
+    """
+    Build a gift row for add_gifts()
+
+    Args:
+        gift_analysis: Vision analysis (object_type, description, special_features)
+        affinity_score: Score from the preference evaluation
+        affinity_reason: Doda's explanation
+        matched_preferences: Preference keywords that matched
+        photo_path: Saved photo (unique per gift)
+        timestamp: ISO or YYYYmmdd_HHMMSS (defaults to now)
+        total_gratification: Gratification after this gift
+        session_id: Session the gift belongs to
+
+    Returns:
+        Row dict
+    """
+    special = gift_analysis.get("special_features") or {}
+    is_dodo = bool(special.get("is_dodo_bird", False))
+    return {
+        "session_id": session_id,
+        "timestamp": _iso_timestamp(timestamp) if timestamp else _now(),
+        "object_type": gift_analysis.get("object_type", "unknown"),
+        "description": gift_analysis.get("description"),
+        "is_dodo_bird": int(is_dodo),
+        "beak_size": special.get("beak_size") if is_dodo else None,
+        "beak_color": special.get("beak_color") if is_dodo else None,
+        "affinity_score": int(affinity_score),
+        "affinity_reason": affinity_reason,
+        "total_gratification": total_gratification,
+        "photo_path": photo_path.replace("\\", "/") if photo_path else None,
+        "analysis": json.dumps(gift_analysis),
+        "matched_preferences": list(matched_preferences or [])
+    }
+
+
+class GiftStore:
+    """Sessions, gifts, analyses and matched preferences in SQLite"""
+
+    SCHEMA_VERSION = 2
+
+    def __init__(self, path=None, descriptions_dir=None):
+        """
+        Open (and migrate) the store
+
+        Args:
+            path: Database file (defaults to game/doda.db; ":memory:" works too)
+            descriptions_dir: Gift description JSON files to import on first open
+        """
+        self.path = str(path) if path else str(DEFAULT_DB_PATH)
+        self.descriptions_dir = Path(descriptions_dir) if descriptions_dir else DESCRIPTIONS_DIR
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+
+        # Shared by the agent threads of every station; the lock serializes use
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.execute("PRAGMA journal_mode = WAL")
+        self._lock = threading.Lock()
+
+        self.migrate()
+
+    # Schema
+
+    def migrate(self):
+        """Bring the schema up to SCHEMA_VERSION"""
+        with self._lock:
+            version = self._conn.execute("PRAGMA user_version").fetchone()[0]
+
+        if version < 1:
+            with self._lock, self._conn:
+                self._conn.executescript(_SCHEMA)
+                self._conn.execute("PRAGMA user_version = 1")
+
+        if version < 2:
+            imported = self.import_descriptions(self.descriptions_dir)
+            if imported:
+                print(f"Imported {imported} gift descriptions into {self.path}")
+            with self._lock, self._conn:
+                self._conn.execute("PRAGMA user_version = 2")
+
+    def import_descriptions(self, directory) -> int:
+        """
+        Import gift description JSON files (gift_*.json)
+
+        Gifts already in the store (same photo) are skipped.
+
+        Returns:
+            Number of gifts imported
+        """
+        rows = []
+        for path in sorted(Path(directory).glob("*.json")):
+            try:
+                with open(path, 'r') as f:
+                    data = json.load(f)
+                rows.append(gift_row(
+                    data["gift_analysis"],
+                    data.get("affinity_score", 0),
+                    affinity_reason=data.get("affinity_reason"),
+                    matched_preferences=data.get("matched_preferences"),
+                    photo_path=data.get("photo_path"),
+                    timestamp=data.get("timestamp")
+                ))
+            except (OSError, ValueError, KeyError) as e:
+                print(f"Warning: could not import {path.name}: {e}")
+        return len(self.add_gifts(rows))
+
+    # Writes
+
+    def start_session(self, station: Optional[str] = None) -> int:
+        """Open a session; returns its ID"""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("INSERT INTO sessions (station, started_at) VALUES (?, ?)",
+                                        (station, _now()))
+            return cursor.lastrowid
+
+    def end_session(self, session_id: int, outcome: str, final_gratification: int):
+        """
+        Close a session
+
+        Args:
+            session_id: Session to close
+            outcome: "won", "lost" or "reset"
+            final_gratification: Gratification when it ended
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sessions SET ended_at = ?, outcome = ?, final_gratification = ? "
+                "WHERE id = ? AND ended_at IS NULL",
+                (_now(), outcome, final_gratification, session_id)
+            )
+
+    def add_gift(self, **kwargs) -> Optional[int]:
+        """Insert one gift (arguments as for gift_row); returns its ID or None if it was already stored"""
+        ids = self.add_gifts([gift_row(**kwargs)])
+        return ids[0] if ids else None
+
+    def add_gifts(self, rows: Iterable[dict]) -> List[int]:
+        """
+        Bulk insert gift rows (see gift_row) in one transaction
+
+        Returns:
+            IDs of the gifts inserted (duplicates by photo are skipped)
+        """
+        inserted = []
+        with self._lock, self._conn:
+            for row in rows:
+                cursor = self._conn.execute(_INSERT_GIFT, row)
+                if cursor.rowcount:
+                    inserted.append((cursor.lastrowid, row))
+
+            self._conn.executemany(_INSERT_ANALYSIS, [(gift_id, row["analysis"]) for gift_id, row in inserted])
+            self._conn.executemany(_INSERT_MATCH, [(gift_id, keyword) for gift_id, row in inserted
+                                                   for keyword in row["matched_preferences"]])
+        return [gift_id for gift_id, _ in inserted]
+
+    # Queries
+
+    def _query(self, sql: str, params=()) -> List[dict]:
+        with self._lock:
+            return [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+
+    @staticmethod
+    def _gift_filters(object_type=None, since=None, until=None, dodo_only=False):
+        clauses, params = [], []
+        if object_type is not None:
+            clauses.append("object_type = ?")
+            params.append(object_type)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(_iso_timestamp(since))
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(_iso_timestamp(until))
+        if dodo_only:
+            clauses.append("is_dodo_bird = 1")
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def gifts(self, object_type: Optional[str] = None, since: Optional[str] = None,
+              until: Optional[str] = None, min_score: Optional[int] = None, limit: int = 100) -> List[dict]:
+        """
+        Gifts, newest first
+
+        Args:
+            object_type: Only this object type (e.g. "dodo_bird")
+            since: ISO timestamp, inclusive
+            until: ISO timestamp, exclusive
+            min_score: Only gifts scoring at least this much
+            limit: Maximum rows
+        """
+        where, params = self._gift_filters(object_type, since, until)
+        if min_score is not None:
+            where += (" AND" if where else " WHERE") + " affinity_score >= ?"
+            params.append(min_score)
+        return self._query(f"SELECT * FROM gifts{where} ORDER BY timestamp DESC LIMIT ?", params + [limit])
+
+    def average_affinity(self, object_type: Optional[str] = None, since: Optional[str] = None,
+                         until: Optional[str] = None, dodo_only: bool = False) -> Optional[float]:
+        """Average affinity score of the matching gifts (None if there are none)"""
+        where, params = self._gift_filters(object_type, since, until, dodo_only)
+        rows = self._query(f"SELECT AVG(affinity_score) AS average FROM gifts{where}", params)
+        return rows[0]["average"]
+
+    def score_by_object_type(self, since: Optional[str] = None) -> List[dict]:
+        """Gift count and average score per object type"""
+        where, params = self._gift_filters(since=since)
+        return self._query(
+            f"SELECT object_type, COUNT(*) AS gifts, AVG(affinity_score) AS average_score "
+            f"FROM gifts{where} GROUP BY object_type ORDER BY gifts DESC", params
+        )
+
+    def sessions(self, outcome: Optional[str] = None, since: Optional[str] = None,
+                 limit: int = 100) -> List[dict]:
+        """
+        Sessions with their gift count, newest first
+
+        Args:
+            outcome: "won", "lost" or "reset" (None for all, including running ones)
+            since: ISO timestamp, inclusive
+            limit: Maximum rows
+        """
+        clauses, params = [], []
+        if outcome is not None:
+            clauses.append("s.outcome = ?")
+            params.append(outcome)
+        if since is not None:
+            clauses.append("s.started_at >= ?")
+            params.append(_iso_timestamp(since))
+        where = (" WHERE " + " AND ".join(clauses)) if clauses else ""
+        return self._query(
+            f"SELECT s.*, COUNT(g.id) AS gift_count FROM sessions s LEFT JOIN gifts g ON g.session_id = s.id"
+            f"{where} GROUP BY s.id ORDER BY s.started_at DESC LIMIT ?", params + [limit]
+        )
+
+    def top_preferences(self, limit: int = 10) -> List[dict]:
+        """Most often matched preference keywords with their average score"""
+        return self._query(
+            "SELECT m.keyword, COUNT(*) AS matches, AVG(g.affinity_score) AS average_score "
+            "FROM matched_preferences m JOIN gifts g ON g.id = m.gift_id "
+            "GROUP BY m.keyword ORDER BY matches DESC LIMIT ?", (limit,)
+        )
+
+    def analysis(self, gift_id: int) -> Optional[dict]:
+        """Stored Vision API analysis of a gift"""
+        rows = self._query("SELECT analysis FROM analyses WHERE gift_id = ?", (gift_id,))
+        return json.loads(rows[0]["analysis"]) if rows else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+if __name__ == "__main__":
+    store = GiftStore(sys.argv[1] if len(sys.argv) > 1 else None)
+    print(f"{len(store.gifts(limit=1_000_000))} gifts, {len(store.sessions(limit=1_000_000))} sessions")
+    for entry in store.score_by_object_type():
+        print(f"  {entry['object_type']:16s} {entry['gifts']:4d} gifts, average score {entry['average_score']:+.1f}")
+    for entry in store.top_preferences(5):
+        print(f"  matched '{entry['keyword']}' {entry['matches']} times")
+    store.close()
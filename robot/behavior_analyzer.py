@@ -0,0 +1,295 @@
+"""
+Static behavior analyzer for Doda Terminal
+Dry-runs presets against a recording controller on a virtual clock - no robot,
+no waiting - and reports how long each behavior takes, how long each step
+takes, and the range every joint is commanded through, checked against the
+calibrated range_min/range_max.
+
+Reports are cached in robot/behavior_analysis.json and invalidated when the
+preset or calibration file changes, so expected durations can be queried at
+runtime without executing anything.
+
+Usage:
+    python -m robot.behavior_analyzer [calibration.json]
+"""
+
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+from fileio import atomic_write
+
+from .calibration import CalibrationTable, load_calibration, velocity_limits
+from .clock import quiet_presets
+from .joints import ARM_JOINTS
+from .motion import CancellableClock
+from .preset_registry import PresetRegistry
+from .trajectory import RecordingClock, record_events
+
+ANALYSIS_CACHE_PATH = Path(__file__).parent / "behavior_analysis.json"
+DEFAULT_CALIBRATION_PATH = Path(__file__).parent.parent / "calibration-files" / "lekiwi-calibrated.json"
+
+# Rest pose the analysis assumes when no start pose is given (calibrated center)
+REST_POSE = {joint: 0.0 for joint in ARM_JOINTS}
+
+# Bumped when the report format changes, so older cached reports are redone
+REPORT_VERSION = 2
+
+
+def _normalized_limits(joint: str):
+    return (0.0, 100.0) if joint == "gripper" else (-100.0, 100.0)
+
+
+def analyze_events(events: list, start_pose: Dict[str, float],
+                   table: Optional[CalibrationTable] = None,
+                   limits: Optional[Dict[str, float]] = None) -> dict:
+    """
+    Build a report from recorded preset events
+
+    Args:
+        events: ("command", {joint: value}) / ("sleep", seconds) in call order
+        start_pose: Pose the preset read at the start
+        table: Calibration for the limit check
+        limits: Joint -> velocity limit (normalized units per second)
+
+    Returns:
+        Report dict: total_duration, steps, joints, violations, commands, and
+        timeline - [sleep, move time needed at the velocity limits] per sleep
+    """
+    steps = []
+    timeline = []
+    envelope = {joint: [value, value] for joint, value in start_pose.items()}
+    commanded = dict(start_pose)
+    needed = 0.0
+    elapsed = 0.0
+    commands = 0
+    current = None
+
+    for kind, payload in events:
+        if kind == "command":
+            commands += 1
+            # Same move time MotionProxy asks the clock for before the next sleep
+            needed = max([needed] + [abs(value - commanded[joint]) / limits[joint]
+                                     for joint, value in payload.items()
+                                     if limits and joint in limits and joint in commanded])
+            commanded.update(payload)
+            if current is None or current["duration"] > 0:
+                current = {"step": len(steps) + 1, "start": round(elapsed, 3), "duration": 0.0, "joints": []}
+                steps.append(current)
+            for joint, value in payload.items():
+                if joint not in current["joints"]:
+                    current["joints"].append(joint)
+                low_high = envelope.setdefault(joint, [value, value])
+                low_high[0] = min(low_high[0], value)
+                low_high[1] = max(low_high[1], value)
+        elif kind == "sleep":
+            elapsed += payload
+            timeline.append([round(payload, 4), round(needed, 4)])
+            needed = 0.0
+            if current is not None:
+                current["duration"] = round(current["duration"] + payload, 3)
+
+    joints = {}
+    violations = []
+    for joint, (low, high) in envelope.items():
+        limit_low, limit_high = _normalized_limits(joint)
+        info = {
+            "min": round(low, 3),
+            "max": round(high, 3),
+            "within_limits": limit_low <= low and high <= limit_high
+        }
+
+        if table is not None and joint in table.index:
+            row = table.index[joint]
+            raw = sorted(int(tick) for tick in table.denormalize([low, high], [row, row], clamp=False))
+            info.update({
+                "raw_min": raw[0],
+                "raw_max": raw[1],
+                "range_min": int(table.range_min[row]),
+                "range_max": int(table.range_max[row])
+            })
+
+        if not info["within_limits"]:
+            violations.append(
+                f"{joint} commanded {low:.1f}..{high:.1f}, calibrated range is {limit_low:.0f}..{limit_high:.0f}"
+            )
+        joints[joint] = info
+
+    return {
+        "total_duration": round(elapsed, 3),
+        "steps": steps,
+        "joints": joints,
+        "violations": violations,
+        "commands": commands,
+        "timeline": timeline
+    }
+
+
+class BehaviorAnalyzer:
+    """Dry-runs presets and caches their reports"""
+
+    def __init__(self, presets: Optional[PresetRegistry] = None, calibration_file=None,
+                 cache_path: Optional[Path] = None):
+        """
+        Initialize behavior analyzer
+
+        Args:
+            presets: Preset registry (defaults to one over robot/presets)
+            calibration_file: Calibration JSON for the limit checks
+            cache_path: Report cache (defaults to robot/behavior_analysis.json, or
+                robot/behavior_analysis.<calibration>.json for another calibration)
+        """
+        self.presets = presets if presets is not None else PresetRegistry()
+        self.calibration_file = Path(calibration_file) if calibration_file else DEFAULT_CALIBRATION_PATH
+        if cache_path is None:
+            cache_path = ANALYSIS_CACHE_PATH
+            if self.calibration_file.resolve() != DEFAULT_CALIBRATION_PATH.resolve():
+                # Reports depend on the calibration; keep each one's cache apart
+                cache_path = ANALYSIS_CACHE_PATH.with_name(f"behavior_analysis.{self.calibration_file.stem}.json")
+        self.cache_path = Path(cache_path)
+        self._lock = threading.Lock()
+        self._cache = self._load_cache()
+        self._table: Optional[CalibrationTable] = None
+        self._limits: Optional[Dict[str, float]] = None
+        self._calibration_mtime = None
+
+    def _load_cache(self) -> dict:
+        try:
+            with open(self.cache_path, 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        try:
+            atomic_write(self.cache_path, json.dumps(self._cache, indent=2).encode("utf-8"))
+        except OSError as e:
+            print(f"Warning: could not save behavior analysis cache: {e}")
+
+    def _load_calibration(self):
+        """Calibration table and velocity limits, reparsed only when the file changes"""
+        try:
+            mtime = os.stat(self.calibration_file).st_mtime
+        except OSError:
+            self._table = self._limits = self._calibration_mtime = None
+            return
+        if mtime != self._calibration_mtime:
+            calibration = load_calibration(self.calibration_file)
+            self._table = CalibrationTable(calibration)
+            self._limits = velocity_limits(calibration)
+            self._calibration_mtime = mtime
+
+    def analyze(self, behavior_name: str, start_pose: Optional[Dict[str, float]] = None,
+                **kwargs) -> dict:
+        """
+        Report for one behavior (from the cache when nothing changed)
+
+        Args:
+            behavior_name: Behavior name or preset module name
+            start_pose: Pose to assume at the start (defaults to the rest pose)
+            **kwargs: Behavior parameters
+
+        Returns:
+            Report dict (see analyze_events) plus preset, kwargs and cached flag
+        """
+        entry = self.presets.get(behavior_name)
+        self.presets.bind(entry, None, kwargs)
+        start_pose = dict(start_pose or REST_POSE)
+
+        with self._lock:
+            self._load_calibration()
+            key = f"{entry.name}|{sorted(kwargs.items())!r}|{sorted(start_pose.items())!r}"
+            cached = self._cache.get(key)
+            if cached and cached.get("version") == REPORT_VERSION and \
+                    cached.get("preset_mtime") == entry.mtime and \
+                    cached.get("calibration_mtime") == self._calibration_mtime:
+                report = dict(cached["report"])
+                report["cached"] = True
+                return report
+
+            # Presets narrate as they go; keep the dry run quiet (this thread only)
+            with quiet_presets():
+                events, _ = record_events(entry.module.execute, start_pose=start_pose, **kwargs)
+
+            report = analyze_events(events, start_pose, self._table, self._limits)
+            report.update({"preset": entry.name, "kwargs": kwargs})
+
+            self._cache[key] = {
+                "version": REPORT_VERSION,
+                "preset_mtime": entry.mtime,
+                "calibration_mtime": self._calibration_mtime,
+                "report": report
+            }
+            self._save_cache()
+
+        report = dict(report)
+        report["cached"] = False
+        return report
+
+    def analyze_all(self) -> Dict[str, dict]:
+        """Reports for every loaded preset with default parameters"""
+        reports = {}
+        for name in self.presets.names():
+            try:
+                reports[name] = self.analyze(name)
+            except Exception as e:
+                reports[name] = {"error": str(e)}
+        return reports
+
+    def expected_duration(self, behavior_name: str, speed_factor: float = 1.0, **kwargs) -> Optional[float]:
+        """
+        How long a behavior should take, without running it
+
+        The preset's sleeps are replayed through the same CancellableClock the
+        behavior runs on, so a sleep compressed by the speed factor is kept
+        long enough for the joints to arrive at their velocity limits.
+
+        Args:
+            behavior_name: Behavior name or preset module name
+            speed_factor: Playback speed it will run at
+            **kwargs: Behavior parameters
+
+        Returns:
+            Seconds, or None if the preset can't be analyzed
+        """
+        try:
+            report = self.analyze(behavior_name, **kwargs)
+        except Exception:
+            return None
+
+        clock = CancellableClock(threading.Event(), time_scale=1.0 / speed_factor, base=RecordingClock([]))
+        for seconds, needed in report["timeline"]:
+            clock.require_until(clock.monotonic() + needed)
+            clock.sleep(seconds)
+        return round(clock.effective, 3)
+
+
+def print_report(name: str, report: dict):
+    """Human-readable report for one preset"""
+    if "error" in report:
+        print(f"{name}: ERROR {report['error']}")
+        return
+
+    print(f"{name}: {report['total_duration']:.2f}s, {len(report['steps'])} steps, {report['commands']} commands")
+    for step in report["steps"]:
+        print(f"  step {step['step']:2d} @ {step['start']:6.2f}s  {step['duration']:5.2f}s  {', '.join(step['joints'])}")
+    for joint in ARM_JOINTS:
+        info = report["joints"].get(joint)
+        if info is None:
+            continue
+        raw = f"  raw {info['raw_min']}..{info['raw_max']} of {info['range_min']}..{info['range_max']}" \
+            if "raw_min" in info else ""
+        flag = "" if info["within_limits"] else "  OUT OF RANGE"
+        print(f"    {joint:14s} {info['min']:7.1f} .. {info['max']:7.1f}{raw}{flag}")
+    for violation in report["violations"]:
+        print(f"  ! {violation}")
+    print()
+
+
+if __name__ == "__main__":
+    analyzer = BehaviorAnalyzer(calibration_file=sys.argv[1] if len(sys.argv) > 1 else None)
+    for preset_name, preset_report in analyzer.analyze_all().items():
+        print_report(preset_name, preset_report)
@@ -0,0 +1,331 @@
+"""
+Bulk Feetech bus access for Doda Terminal
+Writes to many motors in a single sync-write packet (one bus transaction, no
+skew between motors) using the port/packet handlers of the connected
+SO101Controller. If the controller doesn't expose them, every call falls back
+to the controller's per-motor methods.
+
+BulkPoseController puts whole-pose reads and writes for the presets on top
+of that: one sync packet per pose, converted with a vectorized
+CalibrationTable instead of per-motor conversions.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from .calibration import CalibrationTable
+
+try:
+    import scservo_sdk
+except ImportError:
+    scservo_sdk = None
+
+try:
+    from serial import SerialException
+except ImportError:
+    SerialException = OSError
+
+
+class LinkError(RuntimeError):
+    """The robot stopped answering (as opposed to a bug in the caller)"""
+
+
+# Exceptions that mean the serial link itself is in trouble
+LINK_ERRORS = (OSError, SerialException, LinkError)
+
+
+# STS3215 control table
+ADDR_TORQUE_ENABLE = 40
+ADDR_GOAL_POSITION = 42
+ADDR_GOAL_SPEED = 46
+ADDR_PRESENT_POSITION = 56
+ADDR_PRESENT_SPEED = 58
+ADDR_PRESENT_LOAD = 60
+ADDR_PRESENT_VOLTAGE = 62
+ADDR_PRESENT_TEMPERATURE = 63
+
+SIGN_BIT = 1 << 15
+
+# Goal speed is written in the register's own unit, encoder steps per second
+# (4096 steps per revolution). SO101Controller.set_goal_velocity takes the
+# same raw value, so the sync path and its per-motor fallback agree.
+MAX_GOAL_SPEED = SIGN_BIT - 1
+
+
+def encode_signed(value: int, length: int = 2) -> list:
+    """Sign-magnitude encoding used by the STS registers (bit 15 = negative)"""
+    value = int(round(value))
+    raw = min(abs(value), SIGN_BIT - 1)
+    if value < 0:
+        raw |= SIGN_BIT
+    return list(raw.to_bytes(length, "little"))
+
+
+def goal_speed(velocity: float) -> int:
+    """Wheel velocity as the integer steps/s written to ADDR_GOAL_SPEED"""
+    return max(-MAX_GOAL_SPEED, min(MAX_GOAL_SPEED, int(round(velocity))))
+
+
+def decode_signed(raw: int, sign_bit: int = 15) -> int:
+    """Inverse of encode_signed; load uses bit 10 as its sign"""
+    magnitude = raw & ((1 << sign_bit) - 1)
+    return -magnitude if raw & (1 << sign_bit) else magnitude
+
+
+def encode_unsigned(value: int, length: int = 2) -> list:
+    return list(int(value).to_bytes(length, "little"))
+
+
+class FeetechBus:
+    """Sync-write commands to several Feetech motors at once"""
+
+    # Where SO101Controller-style wrappers keep their scservo_sdk handlers:
+    # on the controller itself, or on a motor bus object it holds
+    PORT_HANDLER_NAMES = ("port_handler", "portHandler")
+    PACKET_HANDLER_NAMES = ("packet_handler", "packetHandler")
+    BUS_OWNER_NAMES = ("bus", "motors_bus", "motor_bus")
+
+    def __init__(self, controller):
+        """
+        Initialize bulk bus access
+
+        Args:
+            controller: Connected SO101Controller
+        """
+        self.controller = controller
+        self.port_handler = self._find_handler(self.PORT_HANDLER_NAMES)
+        self.packet_handler = self._find_handler(self.PACKET_HANDLER_NAMES)
+        self.sync_writes = 0
+        self.fallback_writes = 0
+        # Called with {motor_id: velocity} after every wheel velocity write
+        self.command_listener: Optional[Callable[[Dict[int, float]], None]] = None
+
+    def _find_handler(self, names: Tuple[str, ...]):
+        """Look up a handler on the controller or on the motor bus object it wraps"""
+        owners = [self.controller] + [getattr(self.controller, name, None) for name in self.BUS_OWNER_NAMES]
+        for owner in owners:
+            if owner is None:
+                continue
+            for name in names:
+                handler = getattr(owner, name, None)
+                if handler is not None:
+                    return handler
+        return None
+
+    @property
+    def has_sync(self) -> bool:
+        """True if sync-write packets can be sent"""
+        return scservo_sdk is not None and self.port_handler is not None \
+            and self.packet_handler is not None
+
+    def sync_unavailable_reason(self) -> Optional[str]:
+        """Why has_sync is False (None if sync packets work)"""
+        if scservo_sdk is None:
+            return "scservo_sdk is not installed"
+        missing = [kind for kind, handler in (("port", self.port_handler), ("packet", self.packet_handler))
+                   if handler is None]
+        if missing:
+            return (f"{type(self.controller).__name__} exposes no {' or '.join(missing)} handler "
+                    f"(looked for {', '.join(self.PORT_HANDLER_NAMES + self.PACKET_HANDLER_NAMES)})")
+        return None
+
+    def ping(self, motor_id: int) -> bool:
+        """Cheap link check: ping one motor (or read its position without sync support)"""
+        if self.has_sync:
+            _, result, _ = self.packet_handler.ping(self.port_handler, motor_id)
+            return result == scservo_sdk.COMM_SUCCESS
+
+        self.controller.get_normalized_position(motor_id)
+        return True
+
+    def sync_write(self, address: int, length: int, data: Dict[int, list]) -> bool:
+        """
+        Write one register on several motors in a single packet
+
+        Args:
+            address: Control table address
+            length: Register length in bytes
+            data: Motor ID -> register bytes (little endian)
+
+        Returns:
+            True if the packet was sent
+        """
+        if not self.has_sync or not data:
+            return False
+
+        group = scservo_sdk.GroupSyncWrite(self.port_handler, self.packet_handler, address, length)
+        for motor_id, payload in data.items():
+            if not group.addParam(motor_id, payload):
+                return False
+
+        result = group.txPacket()
+        group.clearParam()
+        if result != scservo_sdk.COMM_SUCCESS:
+            print(f"Warning: sync write to address {address} failed: "
+                  f"{self.packet_handler.getTxRxResult(result)}")
+            return False
+
+        self.sync_writes += 1
+        return True
+
+    def sync_read(self, address: int, length: int, motor_ids: Iterable[int],
+                  fields: List[Tuple[int, int]]) -> Optional[Dict[int, Optional[list]]]:
+        """
+        Read a register block from several motors in a single transaction
+
+        Args:
+            address: Start of the block
+            length: Block length in bytes
+            motor_ids: Motors to read
+            fields: (address, length) of each value to extract from the block
+
+        Returns:
+            Motor ID -> list of field values (None for a motor that didn't
+            answer), or None if sync reads aren't available or the read failed
+        """
+        if not self.has_sync:
+            return None
+
+        motor_ids = list(motor_ids)
+        group = scservo_sdk.GroupSyncRead(self.port_handler, self.packet_handler, address, length)
+        for motor_id in motor_ids:
+            group.addParam(motor_id)
+
+        result = group.txRxPacket()
+        if result != scservo_sdk.COMM_SUCCESS:
+            group.clearParam()
+            return None
+
+        values: Dict[int, Optional[list]] = {}
+        for motor_id in motor_ids:
+            if all(group.isAvailable(motor_id, addr, size) for addr, size in fields):
+                values[motor_id] = [group.getData(motor_id, addr, size) for addr, size in fields]
+            else:
+                values[motor_id] = None
+        group.clearParam()
+        return values
+
+    def set_goal_velocities(self, velocities: Dict[int, float]):
+        """
+        Set goal velocity on several wheel motors at once
+
+        Args:
+            velocities: Motor ID -> velocity in raw steps/s (see goal_speed);
+                the fallback hands SO101Controller.set_goal_velocity the
+                same rounded value
+        """
+        velocities = {motor_id: goal_speed(v) for motor_id, v in velocities.items()}
+        data = {motor_id: encode_signed(v) for motor_id, v in velocities.items()}
+        if not self.sync_write(ADDR_GOAL_SPEED, 2, data):
+            for motor_id, velocity in velocities.items():
+                self.controller.set_goal_velocity(motor_id, velocity)
+            self.fallback_writes += 1
+
+        if self.command_listener is not None:
+            self.command_listener(velocities)
+
+    def stop_wheels(self, motor_ids: Iterable[int]):
+        """Zero the goal velocity of the given wheel motors"""
+        self.set_goal_velocities({motor_id: 0 for motor_id in motor_ids})
+
+    def set_goal_positions(self, positions: Dict[int, int]) -> bool:
+        """
+        Set raw goal positions (encoder ticks) on several motors at once
+
+        There is no per-motor fallback for raw positions; use the
+        controller's set_positions() for normalized values.
+
+        Args:
+            positions: Motor ID -> goal position (0-4095)
+
+        Returns:
+            True if the packet was sent
+        """
+        data = {motor_id: encode_unsigned(max(0, min(4095, int(round(p)))))
+                for motor_id, p in positions.items()}
+        return self.sync_write(ADDR_GOAL_POSITION, 2, data)
+
+    def read_positions(self, motor_ids: Iterable[int]) -> Optional[Dict[int, Optional[int]]]:
+        """
+        Present position of several motors in one sync read
+
+        Returns:
+            Motor ID -> ticks (None for a motor that didn't answer), or None
+            if sync reads aren't available or the read failed
+        """
+        values = self.sync_read(ADDR_PRESENT_POSITION, 2, motor_ids, [(ADDR_PRESENT_POSITION, 2)])
+        if values is None:
+            return None
+        return {motor_id: fields[0] if fields else None for motor_id, fields in values.items()}
+
+    def set_torque(self, motor_ids: Iterable[int], enabled: bool):
+        """
+        Enable or disable torque on several motors at once
+
+        Args:
+            motor_ids: Motors to change
+            enabled: Torque on (True) or off (False)
+        """
+        motor_ids = list(motor_ids)
+        data = {motor_id: [1 if enabled else 0] for motor_id in motor_ids}
+        if self.sync_write(ADDR_TORQUE_ENABLE, 1, data):
+            return
+
+        method = "enable_torque" if enabled else "disable_torque"
+        for motor_id in motor_ids:
+            try:
+                getattr(self.controller, method)(motor_id)
+            except Exception as e:
+                print(f"Warning: Could not {method.replace('_', ' ')} on motor {motor_id}: {e}")
+        self.fallback_writes += 1
+
+    def get_stats(self) -> dict:
+        return {
+            "sync": self.has_sync,
+            "sync_writes": self.sync_writes,
+            "fallback_writes": self.fallback_writes
+        }
+
+
+class BulkPoseController:
+    """Controller wrapper that reads and writes whole arm poses with single sync packets"""
+
+    def __init__(self, controller, bus: FeetechBus, table: CalibrationTable):
+        """
+        Initialize bulk pose controller
+
+        Args:
+            controller: Connected SO101Controller (fallback and everything else)
+            bus: Bus with sync support
+            table: Arm calibration table
+        """
+        self._controller = controller
+        self._bus = bus
+        self._table = table
+
+    def get_positions(self) -> Dict[str, float]:
+        """Normalized arm pose from one sync read"""
+        raw = self._bus.read_positions(self._table.motor_ids)
+        if raw is None or any(value is None for value in raw.values()):
+            return self._controller.get_positions()
+        return self._table.normalize_pose({name: raw[motor_id] for name, motor_id
+                                           in zip(self._table.joints, self._table.motor_ids)})
+
+    def set_positions(self, positions: Dict[str, float]):
+        """Normalized targets -> ticks (clamped) -> one sync write"""
+        try:
+            ticks = self._table.denormalize_pose(positions)
+        except KeyError:
+            # Joint without calibration here; let the controller deal with it
+            return self._controller.set_positions(positions)
+
+        if not self._bus.set_goal_positions(ticks):
+            return self._controller.set_positions(positions)
+
+    def set_single_joint(self, joint: str, value: float):
+        self.set_positions({joint: value})
+
+    def set_gripper(self, value: float):
+        self.set_positions({"gripper": value})
+
+    def __getattr__(self, name):
+        return getattr(self._controller, name)
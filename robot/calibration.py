@@ -0,0 +1,203 @@
+"""
+Calibration for Doda's Feetech motors
+Parses calibration-files/*.json (keyed by motor ID or joint name) and converts
+between raw encoder ticks and the normalized positions the presets use:
+-100..100 for body joints, 0..100 for the beak.
+
+homing_offset is written into the servo itself during calibration, so the
+present-position register already includes it; only the range and drive
+mode take part in the conversion.
+
+CalibrationTable holds the same parameters as NumPy arrays so a whole pose
+converts (and clamps) in one vectorized operation; normalize()/denormalize()
+are the single-motor equivalents.
+"""
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from .joints import ARM_JOINTS, MOTOR_IDS
+
+
+@dataclass(frozen=True)
+class MotorCalibration:
+    """Calibration of one motor"""
+    id: int
+    homing_offset: int
+    range_min: int
+    range_max: int
+    drive_mode: int = 0
+
+
+def load_calibration(path) -> Dict[int, MotorCalibration]:
+    """
+    Load a calibration JSON file
+
+    Args:
+        path: Calibration file (entries keyed by motor ID or joint name)
+
+    Returns:
+        Motor ID -> MotorCalibration
+    """
+    with open(Path(path), 'r') as f:
+        data = json.load(f)
+
+    calibration = {}
+    for key, entry in data.items():
+        if "id" in entry:
+            motor_id = int(entry["id"])
+        else:
+            motor_id = MOTOR_IDS.get(key) or int(key)
+        calibration[motor_id] = MotorCalibration(
+            id=motor_id,
+            homing_offset=int(entry.get("homing_offset", 0)),
+            range_min=int(entry["range_min"]),
+            range_max=int(entry["range_max"]),
+            drive_mode=int(entry.get("drive_mode", 0))
+        )
+    return calibration
+
+
+def _is_gripper(motor_id: int) -> bool:
+    return motor_id == MOTOR_IDS["gripper"]
+
+
+def normalize(cal: MotorCalibration, raw: int) -> float:
+    """Raw ticks -> normalized position for an arm motor"""
+    span = max(1, cal.range_max - cal.range_min)
+    bounded = min(max(raw, cal.range_min), cal.range_max)
+    fraction = (bounded - cal.range_min) / span
+
+    if _is_gripper(cal.id):
+        value = fraction * 100.0
+        return 100.0 - value if cal.drive_mode else value
+
+    value = fraction * 200.0 - 100.0
+    return -value if cal.drive_mode else value
+
+
+def denormalize(cal: MotorCalibration, value: float) -> int:
+    """Normalized position -> raw ticks for an arm motor (clamped to the calibrated range)"""
+    if _is_gripper(cal.id):
+        if cal.drive_mode:
+            value = 100.0 - value
+        fraction = value / 100.0
+    else:
+        if cal.drive_mode:
+            value = -value
+        fraction = (value + 100.0) / 200.0
+
+    raw = cal.range_min + fraction * (cal.range_max - cal.range_min)
+    return int(round(min(max(raw, cal.range_min), cal.range_max)))
+
+
+class CalibrationTable:
+    """Calibration of several motors as arrays, for whole-pose conversions"""
+
+    def __init__(self, calibration: Dict[int, MotorCalibration], joints: Iterable[str] = ARM_JOINTS):
+        """
+        Initialize calibration table
+
+        Args:
+            calibration: Motor ID -> calibration
+            joints: Joints to include, in array order (uncalibrated ones are skipped)
+        """
+        self.joints = [name for name in joints if MOTOR_IDS[name] in calibration]
+        self.index = {name: i for i, name in enumerate(self.joints)}
+        self.motor_ids = [MOTOR_IDS[name] for name in self.joints]
+
+        cals = [calibration[motor_id] for motor_id in self.motor_ids]
+        gripper = np.array([_is_gripper(cal.id) for cal in cals], dtype=bool)
+        self.range_min = np.array([cal.range_min for cal in cals], dtype=np.float64)
+        self.range_max = np.array([cal.range_max for cal in cals], dtype=np.float64)
+        self.span = np.maximum(1.0, self.range_max - self.range_min)
+        self.inverted = np.array([bool(cal.drive_mode) for cal in cals], dtype=bool)
+        self.low = np.where(gripper, 0.0, -100.0)      # Normalized range per joint
+        self.high = np.full(len(cals), 100.0)
+
+    def normalize(self, raw, rows=slice(None)) -> np.ndarray:
+        """
+        Raw ticks -> normalized positions (NaN stays NaN)
+
+        Args:
+            raw: Ticks in table order (or in the order of rows)
+            rows: Index array selecting a subset of the table's joints
+        """
+        low, width = self.low[rows], self.high[rows] - self.low[rows]
+        bounded = np.clip(np.asarray(raw, dtype=np.float64), self.range_min[rows], self.range_max[rows])
+        fraction = (bounded - self.range_min[rows]) / self.span[rows]
+        fraction = np.where(self.inverted[rows], 1.0 - fraction, fraction)
+        return low + fraction * width
+
+    def denormalize(self, values, rows=slice(None), clamp: bool = True) -> np.ndarray:
+        """
+        Normalized positions -> raw ticks, clamped to the calibrated range
+
+        Args:
+            values: Normalized positions in table order (or in the order of rows)
+            rows: Index array selecting a subset of the table's joints
+            clamp: False extrapolates past the range instead (shows how far
+                out of range a command would go)
+        """
+        low, width = self.low[rows], self.high[rows] - self.low[rows]
+        values = self.clamp(values, rows) if clamp else np.asarray(values, dtype=np.float64)
+        fraction = (values - low) / width
+        fraction = np.where(self.inverted[rows], 1.0 - fraction, fraction)
+        raw = self.range_min[rows] + fraction * (self.range_max[rows] - self.range_min[rows])
+        return np.rint(raw).astype(np.int64)
+
+    def clamp(self, values, rows=slice(None)) -> np.ndarray:
+        """Clip normalized positions to each joint's normalized range"""
+        return np.clip(np.asarray(values, dtype=np.float64), self.low[rows], self.high[rows])
+
+    def rows(self, joints: Iterable[str]) -> np.ndarray:
+        """Table indices of the given joints (KeyError for joints not in the table)"""
+        return np.array([self.index[name] for name in joints], dtype=np.intp)
+
+    def normalize_pose(self, raw: Dict[str, Optional[int]]) -> Dict[str, Optional[float]]:
+        """Joint -> ticks to joint -> normalized position (None for missing readings)"""
+        ticks = np.array([np.nan if raw.get(name) is None else raw[name] for name in self.joints])
+        values = self.normalize(ticks)
+        return {name: None if np.isnan(value) else float(value) for name, value in zip(self.joints, values)}
+
+    def denormalize_pose(self, pose: Dict[str, float]) -> Dict[int, int]:
+        """Joint -> normalized position to motor ID -> ticks"""
+        rows = self.rows(pose)
+        ticks = self.denormalize(list(pose.values()), rows)
+        return {self.motor_ids[row]: int(tick) for row, tick in zip(rows, ticks)}
+
+
+def arm_calibration(calibration: Dict[int, MotorCalibration]) -> Dict[str, MotorCalibration]:
+    """Joint name -> calibration for the six arm joints"""
+    return {name: calibration[MOTOR_IDS[name]] for name in ARM_JOINTS if MOTOR_IDS[name] in calibration}
+
+
+# Sustained STS3215 speed we plan motions around (encoder ticks per second)
+MAX_TICKS_PER_SECOND = 2000.0
+
+
+def velocity_limits(calibration: Dict[int, MotorCalibration],
+                    max_ticks_per_second: float = MAX_TICKS_PER_SECOND) -> Dict[str, float]:
+    """
+    Per-joint velocity limits in normalized units per second
+
+    A joint with a narrow calibrated range covers more normalized units per
+    tick, so its normalized limit is higher.
+
+    Args:
+        calibration: Motor ID -> calibration
+        max_ticks_per_second: Motor speed limit in encoder ticks per second
+
+    Returns:
+        Joint name -> limit (normalized units per second)
+    """
+    limits = {}
+    for name, cal in arm_calibration(calibration).items():
+        span_ticks = max(1, cal.range_max - cal.range_min)
+        span_units = 100.0 if _is_gripper(cal.id) else 200.0
+        limits[name] = max_ticks_per_second * span_units / span_ticks
+    return limits
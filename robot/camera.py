@@ -4,52 +4,170 @@ Supports OpenCV camera auto-detection with manual fallback
 """
 
 import cv2
+from dataclasses import dataclass, asdict
 from typing import Optional, Tuple
 import numpy as np
 from pathlib import Path
+import json
+import os
+import threading
+import time
+
+from .camera_backends import CameraBackend, DeviceBackend
+from .frame_bus import FrameBusPublisher
+from .frame_grabber import FrameGrabber
+from .photo_writer import PhotoWriter, encode_jpeg
+
+# Last known good camera, so startup can skip probing
+CAMERA_CACHE_PATH = Path(__file__).parent / "camera_cache.json"
+
+# Opening a missing camera can hang for seconds; don't wait longer than this
+PROBE_TIMEOUT = 3.0
+
+
+@dataclass(frozen=True)
+class CaptureProfile:
+    """Requested camera mode (None leaves the driver default)"""
+    width: Optional[int] = None
+    height: Optional[int] = None
+    fps: Optional[float] = None
+    fourcc: Optional[str] = None  # "MJPG" (compressed on the wire) or "YUYV" (raw)
+
+
+# Low-res stream for previews and motion detection
+PREVIEW_PROFILE = CaptureProfile(width=640, height=480, fps=30, fourcc="MJPG")
+
+# Still capture sized for the vision API (stays under analyze_image's 1.15 MP cap)
+STILL_PROFILE = CaptureProfile(width=1280, height=720, fps=30, fourcc="MJPG")
 
 
 class CameraManager:
     """Manages camera connection with auto-detection"""
 
-    def __init__(self, preferred_index: Optional[int] = None):
+    # Frames older than this are considered stale when the grabber is running
+    MAX_FRAME_AGE = 0.5
+
+    # How long disconnect() waits for a grabber stuck in a read
+    DISCONNECT_TIMEOUT = 1.0
+
+    def __init__(self, preferred_index: Optional[int] = None, threaded: bool = False,
+                 buffer_size: int = 3, cache_path: Optional[Path] = None,
+                 profile: Optional[CaptureProfile] = None,
+                 still_profile: Optional[CaptureProfile] = None,
+                 backend: Optional[CameraBackend] = None, fallback: bool = True):
         """
         Initialize camera manager
 
         Args:
             preferred_index: Preferred camera index (None for auto-detect)
+            threaded: Keep decoding frames on a background thread so
+                capture_frame() returns the newest frame without blocking
+            buffer_size: Ring buffer size for the background grabber
+            cache_path: Where to persist the last known good camera
+            profile: Streaming mode to request on connect (None for driver default)
+            still_profile: Mode to switch to for capture_still() (None to reuse profile)
+            backend: Frame source to use instead of a camera device
+                (e.g. ImageDirectoryBackend for replaying gift photos)
+            fallback: Auto-detect another camera if the preferred index
+                fails (turn off when several managers share a machine, so
+                one can't take another's camera)
         """
         self.camera_index: Optional[int] = None
-        self.cap: Optional[cv2.VideoCapture] = None
+        self.cap: Optional[CameraBackend] = None
+        self.source: Optional[dict] = None
         self.preferred_index = preferred_index
-
-        # Auto-detect on init
-        if preferred_index is not None:
-            self.connect(preferred_index)
-        else:
+        self.threaded = threaded
+        self.buffer_size = buffer_size
+        self.grabber: Optional[FrameGrabber] = None
+        self.cache_path = Path(cache_path) if cache_path else CAMERA_CACHE_PATH
+        self.profile = profile
+        self.still_profile = still_profile
+        self.granted: Optional[dict] = None
+        self.frame_bus: Optional[FrameBusPublisher] = None
+        self.frame_bus_name: Optional[str] = None
+        self._frame_bus_lock = threading.Lock()  # Grabber thread publishes, others stop/restart
+
+        if backend is not None:
+            if not self.use_backend(backend):
+                print(f"Error: Camera source {backend.identity()} could not be opened")
+            return
+
+        # Auto-detect on init (also if the preferred index is gone, unless told not to)
+        if preferred_index is None:
             self.auto_detect()
+        elif not self._try_index(preferred_index):
+            if fallback:
+                self.auto_detect()
+            else:
+                print(f"Error: Camera index {preferred_index} could not be opened")
 
-    def auto_detect(self) -> bool:
+    def auto_detect(self, max_index: int = 3, timeout: float = PROBE_TIMEOUT) -> bool:
         """
-        Auto-detect camera by trying indices 0, 1, 2
+        Auto-detect camera, trying the cached device first
+
+        The last known good index is verified on its own; only if that fails
+        are indices 0..max_index-1 probed concurrently.
+
+        Args:
+            max_index: Number of indices to probe when the cache misses
+            timeout: Seconds to wait for probes before giving up on them
 
         Returns:
             True if camera found and connected
         """
         print("Auto-detecting camera...")
 
-        for idx in [0, 1, 2]:
-            print(f"  Trying camera index {idx}...")
-            if self.connect(idx):
-                print(f"  ✓ Camera found at index {idx}")
+        cached = load_camera_cache(self.cache_path)
+        if cached is not None:
+            idx = cached["index"]
+            print(f"  Trying cached camera index {idx}...")
+            if self._try_index(idx, timeout, expected=cached):
+                print(f"  ✓ Camera found at index {idx} (cached)")
                 return True
-            else:
-                print(f"  ✗ No camera at index {idx}")
+            print(f"  ✗ Cached camera index {idx} failed verification")
+
+        indices = list(range(max_index))
+        print(f"  Probing camera indices {indices}...")
+        probed = probe_cameras(indices, timeout=timeout, keep_open=True)
+
+        if probed:
+            idx = min(probed)
+            for other, (identity, cap) in probed.items():
+                if other != idx:
+                    cap.release()
+            self._attach(probed[idx][1], idx, probed[idx][0])
+            print(f"  ✓ Camera found at index {idx}")
+            return True
 
         print("\n⚠ Camera auto-detection failed!")
         self._show_manual_fallback_instructions()
         return False
 
+    def _try_index(self, index: int, timeout: float = PROBE_TIMEOUT,
+                   expected: Optional[dict] = None) -> bool:
+        """
+        Open a single camera index without blocking longer than timeout
+
+        Args:
+            index: Camera index to try
+            timeout: Seconds to wait for the device to deliver a frame
+            expected: Cached identity the device has to match
+
+        Returns:
+            True if connected
+        """
+        probed = probe_cameras([index], timeout=timeout, keep_open=True)
+        if index not in probed:
+            return False
+
+        identity, cap = probed[index]
+        if expected is not None and not _same_device(expected, identity):
+            cap.release()
+            return False
+
+        self._attach(cap, index, identity)
+        return True
+
     def _show_manual_fallback_instructions(self):
         """Show instructions for manual camera detection"""
         print("\nManual camera detection:")
@@ -78,27 +196,206 @@ class CameraManager:
             True if connection successful
         """
         # Close existing connection
+        self.stop_grabber()
         if self.cap is not None:
             self.cap.release()
             self.cap = None
 
-        # Try to open camera
-        cap = cv2.VideoCapture(index)
+        # Try to open camera and verify we can read a frame
+        cap = _open_verified(index)
+        if cap is None:
+            return False
 
-        if not cap.isOpened():
+        # Success
+        self._attach(cap, index, _device_identity(index, cap))
+        return True
+
+    def use_backend(self, backend: CameraBackend) -> bool:
+        """
+        Switch to a different frame source
+
+        Args:
+            backend: Opened backend (device, video file or image directory)
+
+        Returns:
+            True if the backend delivered a frame and is now in use
+        """
+        if not backend.isOpened():
             return False
 
-        # Verify we can read a frame
-        ret, frame = cap.read()
+        ret, frame = backend.read()
         if not ret or frame is None:
-            cap.release()
+            backend.release()
             return False
 
-        # Success
+        self._attach(backend, getattr(backend, "index", None), backend.identity(), cache=False)
+        return True
+
+    def _attach(self, cap: CameraBackend, index: Optional[int], identity: dict,
+                cache: bool = True):
+        """Adopt an opened capture and remember it as the last known good device"""
+        self.stop_grabber()
+        if self.cap is not None and self.cap is not cap:
+            self.cap.release()
+
         self.cap = cap
         self.camera_index = index
+        self.source = identity
+        if cache:
+            save_camera_cache(identity, self.cache_path)
+
+        self.granted = apply_profile(cap, self.profile) if self.profile else None
+
+        if self.threaded:
+            self.start_grabber()
+
+    def set_profile(self, profile: CaptureProfile) -> Optional[dict]:
+        """
+        Switch the streaming mode of the open camera
+
+        Args:
+            profile: Requested capture mode
+
+        Returns:
+            Mode actually granted by the driver, or None if not connected
+        """
+        self.profile = profile
+        if not self.is_connected():
+            return None
+
+        restart = self.grabber is not None
+        self.stop_grabber()
+        self.granted = apply_profile(self.cap, profile)
+        if restart:
+            self.start_grabber()
+
+        return self.granted
+
+    def capture_still(self) -> Optional[np.ndarray]:
+        """
+        Capture a frame using the still profile
+
+        Without a separate still profile this is just capture_frame().
+        Otherwise the camera is switched to the still mode for one frame and
+        then back to the streaming profile.
+
+        Returns:
+            Frame as numpy array, or None if failed
+        """
+        if self.still_profile is None or self.still_profile == self.profile:
+            return self.capture_frame()
+
+        if not self.is_connected():
+            print("Error: Camera not connected")
+            return None
+
+        stream_profile = self.profile
+        restart = self.grabber is not None
+        self.stop_grabber()
+
+        try:
+            apply_profile(self.cap, self.still_profile)
+
+            # The first frames after a mode switch can still be in the old mode
+            frame = None
+            for _ in range(3):
+                ret, frame = self.cap.read()
+                if ret and frame is not None and _frame_matches(frame, self.still_profile):
+                    break
+
+            if frame is None:
+                print("Error: Failed to capture still frame")
+            return frame
+
+        finally:
+            if stream_profile is not None:
+                self.granted = apply_profile(self.cap, stream_profile)
+            if restart:
+                self.start_grabber()
+
+    def start_grabber(self):
+        """Start background frame grabbing on the current connection"""
+        if self.cap is None:
+            return
+
+        if self.grabber is None:
+            self.grabber = FrameGrabber(self.cap, buffer_size=self.buffer_size)
+            if self.frame_bus_name is not None:
+                self.grabber.add_listener(self._publish_frame)
+        self.grabber.start()
+
+    def stop_grabber(self, release: bool = False) -> bool:
+        """
+        Stop background frame grabbing
+
+        Args:
+            release: Let the grabber thread release the capture once its
+                current read returns (for disconnect; don't use cap afterwards)
+
+        Returns:
+            True if the grabber took over releasing the capture
+        """
+        if self.grabber is None:
+            return False
+
+        grabber, self.grabber = self.grabber, None
+        if not release:
+            grabber.stop()
+            return False
+
+        if not grabber.stop(release=True, timeout=self.DISCONNECT_TIMEOUT):
+            print("Warning: Camera read still blocked; it will be released when the read returns")
         return True
 
+    def start_frame_bus(self, name: str = "doda_camera"):
+        """
+        Publish every grabbed frame to a shared-memory frame bus
+
+        Other consumers (in this process or others) attach with
+        FrameBusReader(name) instead of opening the camera. Starts the
+        background grabber if it isn't running.
+
+        Args:
+            name: Shared-memory segment name
+        """
+        with self._frame_bus_lock:
+            self.frame_bus_name = name
+        self.threaded = True
+
+        if self.grabber is not None:
+            self.grabber.add_listener(self._publish_frame)
+        else:
+            self.start_grabber()
+
+    def stop_frame_bus(self):
+        """Stop publishing and remove the shared-memory segment"""
+        if self.grabber is not None:
+            self.grabber.remove_listener(self._publish_frame)
+
+        # The grabber may be inside _publish_frame right now
+        with self._frame_bus_lock:
+            self.frame_bus_name = None
+            if self.frame_bus is not None:
+                self.frame_bus.close()
+                self.frame_bus = None
+
+    def _publish_frame(self, frame: np.ndarray, timestamp: float):
+        """Grabber listener - copy the frame into shared memory"""
+        with self._frame_bus_lock:
+            if self.frame_bus_name is None:
+                return  # Stopped while this frame was on its way
+
+            if self.frame_bus is not None and self.frame_bus.shape[:2] != frame.shape[:2]:
+                # Mode changed (e.g. new profile) - closing marks the old segment
+                # so readers re-attach to the new one
+                self.frame_bus.close()
+                self.frame_bus = None
+
+            if self.frame_bus is None:
+                self.frame_bus = FrameBusPublisher(self.frame_bus_name, frame.shape)
+
+            self.frame_bus.publish(frame, timestamp)
+
     def is_connected(self) -> bool:
         """Check if camera is connected"""
         return self.cap is not None and self.cap.isOpened()
@@ -110,31 +407,62 @@ class CameraManager:
         Returns:
             Frame as numpy array, or None if failed
         """
+        result = self.capture_frame_with_timestamp()
+        return result[0] if result is not None else None
+
+    def capture_frame_with_timestamp(self) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Capture a single frame along with the time it was taken
+
+        With the background grabber running this is a memory copy of the
+        newest frame; it only waits if that frame is older than MAX_FRAME_AGE.
+
+        Returns:
+            Tuple of (frame, timestamp), or None if failed
+        """
         if not self.is_connected():
             print("Error: Camera not connected")
             return None
 
+        if self.grabber is not None and self.grabber.is_running():
+            result = self.grabber.latest()
+            if result is None or time.time() - result[1] > self.MAX_FRAME_AGE:
+                result = self.grabber.wait_for_frame(newer_than=time.time() - self.MAX_FRAME_AGE)
+
+            if result is None:
+                print("Error: Failed to capture frame")
+            return result
+
         ret, frame = self.cap.read()
         if not ret or frame is None:
             print("Error: Failed to capture frame")
             return None
 
-        return frame
+        return frame, time.time()
 
-    def save_frame(self, filename: str) -> bool:
+    def save_frame(self, filename: str, frame: Optional[np.ndarray] = None,
+                   writer: Optional[PhotoWriter] = None) -> bool:
         """
         Capture and save frame to file
 
         Args:
             filename: Path to save image
+            frame: Frame to save (captures a new one if None)
+            writer: Queue the JPEG on this background writer instead of
+                writing it inline
 
         Returns:
-            True if successful
+            True if successful (queued, when using a writer)
         """
-        frame = self.capture_frame()
+        if frame is None:
+            frame = self.capture_frame()
         if frame is None:
             return False
 
+        if writer is not None and filename.lower().endswith(('.jpg', '.jpeg')):
+            writer.submit_bytes(filename, encode_jpeg(frame))
+            return True
+
         # Ensure directory exists
         Path(filename).parent.mkdir(parents=True, exist_ok=True)
 
@@ -155,23 +483,36 @@ class CameraManager:
                 "index": None,
                 "width": None,
                 "height": None,
-                "fps": None
+                "fps": None,
+                "fourcc": None
             }
 
+        granted = read_mode(self.cap)
         return {
             "connected": True,
             "index": self.camera_index,
-            "width": int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
-            "height": int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
-            "fps": int(self.cap.get(cv2.CAP_PROP_FPS))
+            "source": self.source,
+            "width": granted["width"],
+            "height": granted["height"],
+            "fps": int(granted["fps"]),
+            "fourcc": granted["fourcc"],
+            "requested_profile": asdict(self.profile) if self.profile else None,
+            "still_profile": asdict(self.still_profile) if self.still_profile else None,
+            "profile_granted": self.granted["matches"] if self.granted else None,
+            "grabber": self.grabber.get_stats() if self.grabber else None,
+            "frame_bus": self.frame_bus.get_stats() if self.frame_bus else None
         }
 
     def disconnect(self):
         """Disconnect camera"""
+        self.stop_frame_bus()
+        released = self.stop_grabber(release=True)
         if self.cap is not None:
-            self.cap.release()
+            if not released:
+                self.cap.release()
             self.cap = None
             self.camera_index = None
+            self.source = None
             print("Camera disconnected")
 
     def __del__(self):
@@ -179,27 +520,216 @@ class CameraManager:
         self.disconnect()
 
 
-def detect_cameras(max_index: int = 5) -> list:
+def _fourcc_to_str(code: float) -> Optional[str]:
+    """Decode CAP_PROP_FOURCC into its four-character code"""
+    code = int(code)
+    if code <= 0:
+        return None
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4))
+
+
+def read_mode(cap: CameraBackend) -> dict:
+    """Read the mode the driver is currently delivering"""
+    return {
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "fourcc": _fourcc_to_str(cap.get(cv2.CAP_PROP_FOURCC))
+    }
+
+
+def _frame_matches(frame: np.ndarray, profile: CaptureProfile) -> bool:
+    """Check a frame's size against a profile"""
+    height, width = frame.shape[:2]
+    return ((profile.width is None or width == profile.width) and
+            (profile.height is None or height == profile.height))
+
+
+def apply_profile(cap: CameraBackend, profile: CaptureProfile) -> dict:
+    """
+    Request a capture mode and verify what the driver granted
+
+    FOURCC is set first because V4L2 drivers only offer some resolutions
+    and frame rates for compressed formats.
+
+    Args:
+        cap: Opened capture
+        profile: Requested mode
+
+    Returns:
+        dict with the granted width, height, fps, fourcc and whether
+        every requested field was honoured (matches)
+    """
+    if profile.fourcc:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*profile.fourcc))
+    if profile.width:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, profile.width)
+    if profile.height:
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, profile.height)
+    if profile.fps:
+        cap.set(cv2.CAP_PROP_FPS, profile.fps)
+
+    granted = read_mode(cap)
+    granted["matches"] = (
+        (profile.fourcc is None or granted["fourcc"] == profile.fourcc) and
+        (profile.width is None or granted["width"] == profile.width) and
+        (profile.height is None or granted["height"] == profile.height) and
+        (profile.fps is None or abs(granted["fps"] - profile.fps) < 1.0)
+    )
+
+    if not granted["matches"]:
+        print(f"Warning: Camera granted {granted['width']}x{granted['height']} "
+              f"@ {granted['fps']:.0f}fps {granted['fourcc']} (requested {profile})")
+
+    return granted
+
+
+def _open_verified(index: int) -> Optional[DeviceBackend]:
+    """Open a camera and make sure it delivers a frame"""
+    cap = DeviceBackend(index)
+
+    if not cap.isOpened():
+        return None
+
+    ret, frame = cap.read()
+    if not ret or frame is None:
+        cap.release()
+        return None
+
+    return cap
+
+
+def _device_identity(index: int, cap: CameraBackend) -> dict:
+    """Describe an opened camera well enough to recognise it next time"""
+    name = None
+    sysfs_name = Path(f"/sys/class/video4linux/video{index}/name")
+    if sysfs_name.exists():
+        try:
+            name = sysfs_name.read_text().strip()
+        except OSError:
+            pass
+
+    return {
+        "index": index,
+        "name": name,
+        "backend": cap.getBackendName() if hasattr(cap, "getBackendName") else None,
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    }
+
+
+def _same_device(cached: dict, current: dict) -> bool:
+    """Check a probed camera against the cached identity"""
+    # Only compare fields both sides know about (device names are Linux-only)
+    for key in ("name", "backend"):
+        if cached.get(key) and current.get(key) and cached[key] != current[key]:
+            return False
+    return True
+
+
+def load_camera_cache(cache_path: Path = CAMERA_CACHE_PATH) -> Optional[dict]:
+    """Load the last known good camera, or None if there isn't one"""
+    try:
+        with open(cache_path, 'r') as f:
+            cached = json.load(f)
+        return cached if isinstance(cached.get("index"), int) else None
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def save_camera_cache(identity: dict, cache_path: Path = CAMERA_CACHE_PATH):
+    """Persist the last known good camera (best effort)"""
+    try:
+        cache_path = Path(cache_path)
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(".tmp")
+        with open(tmp_path, 'w') as f:
+            json.dump(identity, f)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        print(f"Warning: Could not save camera cache: {e}")
+
+
+def probe_cameras(indices: list, timeout: float = PROBE_TIMEOUT,
+                  keep_open: bool = False) -> dict:
+    """
+    Probe camera indices concurrently
+
+    Each index is opened on its own daemon thread, so one slow or hanging
+    device doesn't hold up the others - or interpreter exit. Probes still
+    running after the timeout are abandoned and release their device when
+    they eventually finish.
+
+    Args:
+        indices: Camera indices to try
+        timeout: Seconds to wait for the probes
+        keep_open: Return the opened captures instead of releasing them
+
+    Returns:
+        Dict of index -> (identity, capture) for cameras that delivered a frame
+        (capture is None unless keep_open)
+    """
+    if not indices:
+        return {}
+
+    results = {}
+    pending = len(indices)
+    abandoned = False
+    done = threading.Condition()
+
+    def probe(index):
+        nonlocal pending
+        try:
+            cap = _open_verified(index)
+            result = (_device_identity(index, cap), cap) if cap is not None else None
+        except Exception:
+            result = None
+
+        with done:
+            pending -= 1
+            if not abandoned:
+                if result is not None:
+                    results[index] = result
+                done.notify_all()
+                return
+
+        # Nobody is waiting for this one any more - don't keep the device open
+        if result is not None:
+            result[1].release()
+
+    for index in indices:
+        threading.Thread(target=probe, args=(index,), name=f"CameraProbe-{index}", daemon=True).start()
+
+    deadline = time.monotonic() + timeout
+    with done:
+        while pending:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            done.wait(remaining)
+        abandoned = True
+        found = dict(results)
+
+    if not keep_open:
+        for index, (identity, cap) in found.items():
+            cap.release()
+            found[index] = (identity, None)
+
+    return found
+
+
+def detect_cameras(max_index: int = 5, timeout: float = PROBE_TIMEOUT) -> list:
     """
     Utility function to detect all available cameras
 
     Args:
         max_index: Maximum index to check
+        timeout: Seconds to wait for the (concurrent) probes
 
     Returns:
         List of available camera indices
     """
-    available = []
-
-    for i in range(max_index):
-        cap = cv2.VideoCapture(i)
-        if cap.isOpened():
-            ret, _ = cap.read()
-            if ret:
-                available.append(i)
-        cap.release()
-
-    return available
+    return sorted(probe_cameras(list(range(max_index)), timeout=timeout))
 
 
 if __name__ == "__main__":
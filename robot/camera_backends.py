@@ -0,0 +1,303 @@
+"""
+Frame sources for CameraManager
+Every backend looks like a cv2.VideoCapture (isOpened/read/get/set/release),
+so the grabber, capture profiles and frame bus work the same on a live camera
+and on recorded footage. The replay backends make the gift path runnable on
+any machine, e.g. replaying game/gift_photos/ at a fixed rate.
+"""
+
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import cv2
+import numpy as np
+
+
+class CameraBackend(ABC):
+    """Base class for frame sources (cv2.VideoCapture-compatible surface)"""
+
+    name = "base"
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        """True while frames can be read"""
+
+    @abstractmethod
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        """(ok, frame) like cv2.VideoCapture.read"""
+
+    def get(self, prop: int) -> float:
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        return False
+
+    def release(self):
+        pass
+
+    def getBackendName(self) -> str:
+        return self.name
+
+    def identity(self) -> dict:
+        """Describe the source (reported by CameraManager.get_info)"""
+        return {"backend": self.name}
+
+
+class DeviceBackend(CameraBackend):
+    """Live camera through cv2.VideoCapture"""
+
+    name = "device"
+
+    def __init__(self, index: int):
+        """
+        Open a camera device
+
+        Args:
+            index: OpenCV camera index
+        """
+        self.index = index
+        self.cap = cv2.VideoCapture(index)
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        return self.cap.read()
+
+    def get(self, prop: int) -> float:
+        return self.cap.get(prop)
+
+    def set(self, prop: int, value: float) -> bool:
+        return self.cap.set(prop, value)
+
+    def release(self):
+        self.cap.release()
+
+    def getBackendName(self) -> str:
+        return self.cap.getBackendName()
+
+    def identity(self) -> dict:
+        return {"backend": self.name, "index": self.index}
+
+
+class _ReplayBackend(CameraBackend):
+    """Shared pacing, looping and resizing for recorded sources"""
+
+    def __init__(self, fps: Optional[float], loop: bool, fixed_fps: bool):
+        self.fps = fps
+        self.fixed_fps = fixed_fps
+        self.loop = loop
+        self.width: Optional[int] = None
+        self.height: Optional[int] = None
+        self.fourcc: Optional[float] = None
+        self.frames_served = 0
+        self._next_frame_time: Optional[float] = None
+        self._opened = True
+
+    def isOpened(self) -> bool:
+        return self._opened
+
+    def read(self) -> Tuple[bool, Optional[np.ndarray]]:
+        if not self._opened:
+            return False, None
+
+        self._pace()
+        frame = self._next_frame()
+        if frame is None:
+            return False, None
+
+        if self.width and self.height and frame.shape[:2] != (self.height, self.width):
+            frame = cv2.resize(frame, (self.width, self.height))
+
+        self.frames_served += 1
+        return True, frame
+
+    def _pace(self):
+        """Sleep so frames come out at self.fps (no pacing if fps is falsy)"""
+        if not self.fps:
+            return
+
+        now = time.perf_counter()
+        if self._next_frame_time is None or now - self._next_frame_time > 1.0:
+            # First frame, or the consumer stalled - don't burst to catch up
+            self._next_frame_time = now
+        elif self._next_frame_time > now:
+            time.sleep(self._next_frame_time - now)
+
+        self._next_frame_time += 1.0 / self.fps
+
+    @abstractmethod
+    def _next_frame(self) -> Optional[np.ndarray]:
+        """Next frame from the source, or None at the end"""
+
+    @abstractmethod
+    def _native_size(self) -> Tuple[int, int]:
+        """(width, height) of the recorded frames"""
+
+    def get(self, prop: int) -> float:
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            return float(self.width or self._native_size()[0])
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            return float(self.height or self._native_size()[1])
+        if prop == cv2.CAP_PROP_FPS:
+            return float(self.fps or 0.0)
+        if prop == cv2.CAP_PROP_FOURCC:
+            return float(self.fourcc or 0.0)
+        return 0.0
+
+    def set(self, prop: int, value: float) -> bool:
+        # Emulate a capture profile: frames are resized, FOURCC is just recorded
+        if prop == cv2.CAP_PROP_FRAME_WIDTH:
+            self.width = int(value)
+            return True
+        if prop == cv2.CAP_PROP_FRAME_HEIGHT:
+            self.height = int(value)
+            return True
+        if prop == cv2.CAP_PROP_FOURCC:
+            self.fourcc = value
+            return True
+        if prop == cv2.CAP_PROP_FPS and not self.fixed_fps:
+            # Only follow the profile's rate if no replay rate was chosen
+            self.fps = float(value)
+            return True
+        return False
+
+    def release(self):
+        self._opened = False
+
+
+class VideoFileBackend(_ReplayBackend):
+    """Replays a video file"""
+
+    name = "video"
+
+    def __init__(self, path: str, fps: Optional[float] = None, loop: bool = True):
+        """
+        Open a video file
+
+        Args:
+            path: Video file readable by OpenCV
+            fps: Playback rate (None for the file's own rate or the capture
+                profile's, 0 for as fast as possible)
+            loop: Start over at the end instead of reporting end of stream
+        """
+        self.path = Path(path)
+        self.cap = cv2.VideoCapture(str(self.path))
+        native_fps = self.cap.get(cv2.CAP_PROP_FPS) if self.cap.isOpened() else 0.0
+        super().__init__(native_fps if fps is None else fps, loop, fixed_fps=fps is not None)
+        self._opened = self.cap.isOpened()
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        ret, frame = self.cap.read()
+        if not ret and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ret, frame = self.cap.read()
+        return frame if ret else None
+
+    def _native_size(self) -> Tuple[int, int]:
+        return (int(self.cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+                int(self.cap.get(cv2.CAP_PROP_FRAME_HEIGHT)))
+
+    def release(self):
+        super().release()
+        self.cap.release()
+
+    def identity(self) -> dict:
+        return {"backend": self.name, "path": str(self.path), "fps": self.fps, "loop": self.loop}
+
+
+class ImageDirectoryBackend(_ReplayBackend):
+    """Replays a directory of still images in name order"""
+
+    name = "images"
+
+    IMAGE_SUFFIXES = (".jpg", ".jpeg", ".png", ".bmp")
+
+    def __init__(self, directory: str, fps: Optional[float] = None, loop: bool = True,
+                 preload: bool = True):
+        """
+        Open an image directory
+
+        Args:
+            directory: Directory of images (e.g. game/gift_photos)
+            fps: Playback rate (None to follow the capture profile, 0 for as
+                fast as possible)
+            loop: Start over at the end instead of reporting end of stream
+            preload: Decode every image up front so replay measures the
+                pipeline, not JPEG decoding from disk
+        """
+        super().__init__(fps, loop, fixed_fps=fps is not None)
+        self.directory = Path(directory)
+        self.paths: List[Path] = sorted(
+            p for p in self.directory.iterdir() if p.suffix.lower() in self.IMAGE_SUFFIXES
+        ) if self.directory.is_dir() else []
+        self.position = 0
+
+        self._frames: Optional[List[np.ndarray]] = None
+        if preload:
+            frames = [cv2.imread(str(p)) for p in self.paths]
+            self._frames = [f for f in frames if f is not None]
+
+        self._opened = bool(self._frames if preload else self.paths)
+
+    def _count(self) -> int:
+        return len(self._frames) if self._frames is not None else len(self.paths)
+
+    def _next_frame(self) -> Optional[np.ndarray]:
+        if self.position >= self._count():
+            if not self.loop:
+                return None
+            self.position = 0
+
+        if self._frames is not None:
+            frame = self._frames[self.position].copy()
+        else:
+            frame = cv2.imread(str(self.paths[self.position]))
+
+        self.position += 1
+        return frame
+
+    def _native_size(self) -> Tuple[int, int]:
+        if self._frames:
+            return self._frames[0].shape[1], self._frames[0].shape[0]
+        if self.paths:
+            first = cv2.imread(str(self.paths[0]))
+            if first is not None:
+                return first.shape[1], first.shape[0]
+        return 0, 0
+
+    def identity(self) -> dict:
+        return {"backend": self.name, "path": str(self.directory), "images": self._count(),
+                "fps": self.fps, "loop": self.loop}
+
+
+def open_backend(source: str, fps: Optional[float] = None, loop: bool = True) -> CameraBackend:
+    """
+    Open a backend from a source string
+
+    Accepts "device:1", "video:clip.mp4", "images:game/gift_photos", a bare
+    camera index, or a path (directories replay as stills, files as video).
+
+    Args:
+        source: Source description
+        fps: Replay rate for recorded sources (None to follow the capture profile)
+        loop: Loop recorded sources
+
+    Returns:
+        CameraBackend (check isOpened())
+    """
+    kind, _, target = source.partition(":")
+    if kind not in ("device", "video", "images"):
+        # No prefix (and don't mistake a Windows drive letter for one)
+        kind, target = "", source
+
+    if kind == "device" or (not kind and target.isdigit()):
+        return DeviceBackend(int(target))
+    if kind == "images" or (not kind and Path(target).is_dir()):
+        return ImageDirectoryBackend(target, fps=fps, loop=loop)
+    if kind in ("video", ""):
+        return VideoFileBackend(target, fps=fps, loop=loop)
+
+    raise ValueError(f"Unknown camera source: {source}")
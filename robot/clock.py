@@ -0,0 +1,91 @@
+"""
+Pluggable clock for preset timing
+Presets call time.sleep() between keyframes. The preset registry swaps the
+`time` module inside each preset for `preset_time`, which forwards sleep() and
+time() to the clock installed on the current thread. The motion executor
+installs a clock that wakes up on cancellation; other clocks can scale or
+virtualize time.
+
+The same goes for print(): presets get `preset_print`, which a thread can
+mute with quiet_presets() (e.g. for dry runs) without touching sys.stdout
+for the rest of the process.
+"""
+
+import builtins
+import threading
+import time as _time
+from contextlib import contextmanager
+
+
+class RealClock:
+    """Wall-clock time (the default)"""
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            _time.sleep(seconds)
+
+    def time(self) -> float:
+        return _time.time()
+
+    def monotonic(self) -> float:
+        return _time.monotonic()
+
+
+DEFAULT_CLOCK = RealClock()
+
+_local = threading.local()
+
+
+def current_clock():
+    """Clock installed on this thread (RealClock if none)"""
+    return getattr(_local, "clock", DEFAULT_CLOCK)
+
+
+@contextmanager
+def use_clock(clock):
+    """Install a clock on this thread for the duration of the block"""
+    previous = getattr(_local, "clock", None)
+    _local.clock = clock
+    try:
+        yield clock
+    finally:
+        if previous is None:
+            del _local.clock
+        else:
+            _local.clock = previous
+
+
+class _PresetTime:
+    """Stand-in for the time module inside preset modules"""
+
+    def __getattr__(self, name):
+        return getattr(_time, name)
+
+    def sleep(self, seconds: float):
+        current_clock().sleep(seconds)
+
+    def time(self) -> float:
+        return current_clock().time()
+
+    def monotonic(self) -> float:
+        return current_clock().monotonic()
+
+
+preset_time = _PresetTime()
+
+
+@contextmanager
+def quiet_presets():
+    """Silence preset print() calls made on this thread for the duration of the block"""
+    previous = getattr(_local, "quiet", False)
+    _local.quiet = True
+    try:
+        yield
+    finally:
+        _local.quiet = previous
+
+
+def preset_print(*args, **kwargs):
+    """Stand-in for print() inside preset modules"""
+    if not getattr(_local, "quiet", False):
+        builtins.print(*args, **kwargs)
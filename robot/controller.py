@@ -4,10 +4,27 @@ Wrapper around SO-101 controller for Doda Terminal.
 Handles lazy connection and behavior execution.
 """
 
+import math
 import sys
+import threading
 import time
-import importlib.util
 from pathlib import Path
+from typing import Optional, Union
+
+from .behavior_analyzer import BehaviorAnalyzer
+from .bus import LINK_ERRORS, BulkPoseController, FeetechBus, LinkError
+from .calibration import CalibrationTable, load_calibration, velocity_limits
+from .clock import DEFAULT_CLOCK, use_clock
+from .joints import ALL_MOTOR_IDS, ARM_JOINTS, WHEEL_JOINTS, WHEEL_MOTOR_IDS
+from .motion import (BehaviorCancelled, BehaviorHandle, BlendState, CancellableClock, MotionExecutor,
+                     MotionProxy)
+from .odometry import BaseOdometry, RotationProfile, rotation_seconds
+from .preset_registry import PresetRegistry
+from .recorder import CommandTap, PositionSampler, TelemetryRecorder
+from .sim import SimulatedSO101Controller, VirtualClock
+from .supervisor import ConnectionSupervisor
+from .telemetry import JointSnapshot, TelemetryLoop
+from .trajectory import TrajectoryEngine
 
 
 class RobotController:
@@ -16,41 +33,139 @@ class RobotController:
     Provides lazy connection and behavior execution for Doda.
     """
 
-    def __init__(self, port: str = "COM8", calibration_file: str = None):
+    # Time allowed for the arm to get back to its start pose after a cancel
+    RESTORE_SETTLE_TIME = 1.0
+
+    # Settle time of the return to rest at the end of a blended chain (as in the presets)
+    REST_SETTLE_TIME = 2.0
+
+    # Allowed playback speed factors
+    MIN_SPEED_FACTOR = 0.25
+    MAX_SPEED_FACTOR = 4.0
+
+    # Longest a caller waits for the initial connect; a lost link fails fast
+    FIRST_CONNECT_WAIT = 10.0
+
+    # Base rotation: cruise wheel speed and ramp (raw steps/s, steps/s per second), stop tolerance
+    ROTATION_SPEED = 400
+    ROTATION_ACCELERATION = 800
+    ROTATION_TOLERANCE_DEGREES = 1.0
+
+    def __init__(self, port: str = "COM8", calibration_file: str = None,
+                 presets: PresetRegistry = None, use_trajectories: bool = False,
+                 telemetry_hz: float = 30.0, speed_factor: float = 1.0,
+                 simulated: bool = False, telemetry_log: Optional[str] = None,
+                 analyzer: Optional[BehaviorAnalyzer] = None):
         """
         Initialize robot controller.
 
         Args:
             port: Serial port for robot (default COM8 for LeKiwi)
             calibration_file: Path to calibration JSON file (defaults to lekiwi-calibrated.json)
+            presets: Preset registry to use (defaults to one over robot/presets)
+            use_trajectories: Play presets as keyframe trajectories (interpolated,
+                finishing on arrival) instead of running their execute() directly
+            telemetry_hz: Rate of the background joint telemetry loop (0 disables it)
+            speed_factor: Global behavior playback speed (2.0 = twice as fast)
+            simulated: Drive a SimulatedSO101Controller on virtual time instead
+                of the robot (behaviors finish in milliseconds; for tests and benchmarks)
+            telemetry_log: Ring buffer file to record commanded vs. measured
+                joint positions into (None disables recording)
+            analyzer: Behavior analyzer to share (defaults to one over presets)
         """
         self.port = port
+        self.presets = presets if presets is not None else PresetRegistry()
+        self.use_trajectories = use_trajectories
+        self.speed_factor = 1.0
+        self.set_speed_factor(speed_factor)
 
         # Use LeKiwi calibration file if none specified
         if calibration_file is None:
             calibration_file = str(Path(__file__).parent.parent / "calibration-files" / "lekiwi-calibrated.json")
 
         self.calibration_file = calibration_file
-        self.controller = None
-        self.is_connected = False
+        self.calibration = None  # Parsed once, reused across reconnects
+        self._calibration_warned = False
+        # Dry-run durations and limits
+        self.analyzer = analyzer if analyzer is not None else BehaviorAnalyzer(self.presets, calibration_file)
+        self.simulated = simulated
+        self.clock = VirtualClock() if simulated else DEFAULT_CLOCK
+        self.controller = None  # What behaviors talk to: the link, wrapped for bulk poses/recording
+        self._link = None       # SO101Controller (or simulator) owning the serial port
+        self.bus = None  # FeetechBus for multi-motor writes, set on connect
+        self.telemetry_hz = telemetry_hz
+        self.telemetry = None  # TelemetryLoop publishing JointSnapshots, set on connect
+        self.recorder = TelemetryRecorder(telemetry_log, clock=self.clock) if telemetry_log else None
+        self.sampler = None    # Polls positions into the recorder when telemetry isn't running
         self.current_rotation_degrees = 0  # Track base rotation
 
+        # Behaviors run on a motion thread; the bus lock keeps it and direct
+        # calls (capture_joint_positions, rotate_base, ...) from interleaving
+        self._bus_lock = threading.RLock()
+        self.motion = MotionExecutor(self._run_behavior, self._return_to_rest)
+
+        # Link state, pings and background reconnects
+        self.supervisor = ConnectionSupervisor(self._open_link, self._ping, self._close_link)
+
         # Add so101 directory to path for imports
         so101_path = Path(__file__).parent.parent.parent / "so101"
         if str(so101_path) not in sys.path:
             sys.path.insert(0, str(so101_path))
 
+    @property
+    def is_connected(self) -> bool:
+        """True while the link is up (connected or degraded)"""
+        return self.supervisor.is_up
+
     def connect(self) -> bool:
         """
-        Connect to the robot (lazy initialization).
+        Make sure the robot link is up (lazy initialization).
+
+        The first call starts the connection supervisor and waits for its
+        first attempt. After that the supervisor reconnects in the
+        background, so this never retries inline: a lost link returns False
+        immediately and connection_error() says why.
 
         Returns:
-            True if connected successfully
+            True if connected
         """
-        if self.is_connected:
+        if self.supervisor.is_up:
             return True
 
+        self.supervisor.start()
+        return self.supervisor.wait_first_attempt(self.FIRST_CONNECT_WAIT)
+
+    def connect_in_background(self):
+        """Start connecting without waiting (e.g. at startup)"""
+        self.supervisor.start()
+
+    def connection_error(self) -> str:
+        """Why the robot isn't usable right now"""
+        return self.supervisor.describe()
+
+    def get_connection_status(self) -> dict:
+        """Supervisor state and counters"""
+        return self.supervisor.get_status()
+
+    def _open_link(self) -> bool:
+        """
+        Open the serial link (runs on the supervisor thread)
+
+        Errors propagate to the supervisor, which keeps them as last_error
+        and only reports changes of state (not every retry).
+        """
         try:
+            if self.calibration is None:
+                self.calibration = load_calibration(self.calibration_file)
+        except Exception as e:
+            if not self._calibration_warned:
+                print(f"Warning: could not parse calibration: {e}")
+                self._calibration_warned = True
+
+        if self._link is None and self.simulated:
+            self._link = SimulatedSO101Controller(self.clock, self.calibration)
+            load = False
+        elif self._link is None:
             # Import SO101 controller
             from so101_control import SO101Controller, SO101Config
 
@@ -62,105 +177,275 @@ class RobotController:
             )
 
             # Create and connect controller
-            self.controller = SO101Controller(config)
+            self._link = SO101Controller(config)
+            load = True
+        else:
+            # Reconnect: the controller keeps the calibration it loaded the first time
+            load = False
 
-            if not self.controller.connect(enable_torque=True, load_calibration=True):
-                return False
-
-            self.is_connected = True
-            return True
-
-        except Exception as e:
-            print(f"Robot connection error: {e}")
+        if not self._link.connect(enable_torque=True, load_calibration=load):
             return False
 
+        self.bus = FeetechBus(self._link)
+        self.controller = self._link
+        if not self.simulated and not self.bus.has_sync:
+            print(f"Warning: no sync bus access ({self.bus.sync_unavailable_reason()}). "
+                  "Falling back to per-motor commands; telemetry, closed-loop base rotation, "
+                  "bulk poses and full telemetry recording are off")
+
+        # Whole-pose reads/writes as single sync packets with vectorized conversion
+        table = CalibrationTable(self.calibration) if self.calibration else None
+        if self.bus.has_sync and table is not None and len(table.joints) == len(ARM_JOINTS):
+            self.controller = BulkPoseController(self.controller, self.bus, table)
+
+        if self.recorder is not None:
+            self.controller = CommandTap(self.controller, self.recorder)
+            self.bus.command_listener = self.recorder.note_velocities
+        self._start_telemetry()
+        return True
+
+    def _ping(self) -> bool:
+        """Link health check - free while telemetry is reading the bus anyway"""
+        if self.telemetry is not None and self.telemetry.is_running():
+            return self.telemetry.fresh_snapshot(max_age=max(1.0, 3.0 / self.telemetry.rate_hz)) is not None
+
+        with self._bus_lock:
+            return self.bus.ping(1)
+
+    def _close_link(self):
+        """Tear down a dead link (runs on the supervisor thread)"""
+        self.motion.cancel_all(restore=False)
+        self._stop_telemetry()
+        try:
+            with self._bus_lock:
+                self.controller.disconnect()
+        except Exception:
+            pass
+
+    def _start_telemetry(self):
+        """Start the background sync-read loop (skipped if the bus can't sync read)"""
+        if self.telemetry_hz > 0 and self.calibration is None:
+            print("Warning: telemetry disabled, no calibration loaded")
+        elif self.telemetry_hz > 0:
+            self.telemetry = TelemetryLoop(self.bus, self.calibration, self._bus_lock, rate_hz=self.telemetry_hz)
+            if self.recorder is not None:
+                self.telemetry.listeners.append(self.recorder.record)
+            if not self.telemetry.start():
+                self.telemetry = None
+
+        # No telemetry rows to record: poll the arm pose instead
+        if self.recorder is not None and self.telemetry is None:
+            rate_hz = self.telemetry_hz if self.telemetry_hz > 0 else 30.0
+            if self.simulated:
+                # The simulator is thread-safe and sampled on virtual time
+                read_positions = self._link.get_positions
+            else:
+                print(f"Warning: telemetry not running, recording polls arm positions at {rate_hz:g} Hz "
+                      "(no velocities or wheel positions)")
+                read_positions = self._read_positions_locked
+            self.sampler = PositionSampler(self.recorder, read_positions, rate_hz=rate_hz, clock=self.clock)
+            self.sampler.start()
+
+    def _read_positions_locked(self) -> dict:
+        with self._bus_lock:
+            return self.controller.get_positions()
+
+    def _stop_telemetry(self):
+        if self.telemetry is not None:
+            self.telemetry.stop()
+            self.telemetry = None
+        if self.sampler is not None:
+            self.sampler.stop()
+            self.sampler = None
+
+    def get_snapshot(self) -> Optional[JointSnapshot]:
+        """Latest joint telemetry snapshot, or None if telemetry isn't running or is stale"""
+        return self.telemetry.fresh_snapshot() if self.telemetry else None
+
     def disconnect(self):
         """Disconnect from robot."""
-        if self.is_connected and self.controller:
+        self.motion.stop()
+        was_connected = self.supervisor.is_up
+        self.supervisor.stop()
+        self._stop_telemetry()
+        if was_connected and self.controller:
             self.controller.disconnect()
-            self.is_connected = False
+        if self.recorder is not None:
+            self.recorder.flush()
+
+    def set_speed_factor(self, speed_factor: float):
+        """
+        Set the global behavior playback speed.
+
+        Args:
+            speed_factor: 1.0 = preset timing, 2.0 = twice as fast
+                (clamped to MIN_SPEED_FACTOR..MAX_SPEED_FACTOR)
+        """
+        self.speed_factor = min(max(float(speed_factor), self.MIN_SPEED_FACTOR), self.MAX_SPEED_FACTOR)
 
-    def execute_behavior(self, behavior_name: str, **kwargs) -> dict:
+    def expected_duration(self, behavior_name: str, speed_factor: Optional[float] = None,
+                          **kwargs) -> Optional[float]:
+        """
+        How long a behavior should take, from the cached dry-run analysis.
+
+        Works without a robot connection and never moves anything.
+
+        Args:
+            behavior_name: Name of the behavior (e.g., "greeting", "head_bob")
+            speed_factor: Playback speed it will run at (defaults to the global one)
+            **kwargs: Additional parameters for the behavior
+
+        Returns:
+            Seconds, or None if the preset can't be analyzed
+        """
+        if speed_factor is None:
+            speed_factor = self.speed_factor
+        speed_factor = min(max(float(speed_factor), self.MIN_SPEED_FACTOR), self.MAX_SPEED_FACTOR)
+        return self.analyzer.expected_duration(behavior_name, speed_factor, **kwargs)
+
+    def execute_behavior(self, behavior_name: str, wait: bool = True, preempt: bool = False,
+                         speed_factor: Optional[float] = None,
+                         **kwargs) -> Union[dict, BehaviorHandle]:
         """
         Execute a dodo behavior preset.
 
         Args:
             behavior_name: Name of the behavior (e.g., "greeting", "head_bob")
+            wait: Block until the behavior finishes (False returns a handle immediately)
+            preempt: Cancel whatever is running or queued and run this next
+            speed_factor: Playback speed for this call (defaults to the global one)
             **kwargs: Additional parameters for the behavior
 
         Returns:
-            dict with keys: success (bool), duration (float), error (str)
+            dict with keys: success (bool), duration (float), error (str),
+            speed_factor, nominal_duration and effective_duration (seconds of
+            preset timing before and after scaling), or a BehaviorHandle
+            resolving to that dict when wait=False
         """
-        # Ensure we're connected
-        if not self.connect():
-            return {
-                "success": False,
-                "duration": 0.0,
-                "error": "Failed to connect to robot"
-            }
+        handle = self.submit_behavior(behavior_name, preempt=preempt, speed_factor=speed_factor, **kwargs)
+        return handle.result() if wait else handle
 
-        try:
-            # Map behavior names to preset files
-            behavior_map = {
-                "greeting": "dodo_greeting",
-                "head_bob": "dodo_head_bob",
-                "curious": "dodo_head_bob",  # Alias
-                "pleased": "dodo_pleased",  # Legacy - not used in game
-                "woo": "dodo_woo",  # Win condition only
-                "dismay": "dodo_dismay",
-                "dies": "dodo_dies",  # Lose condition
-                "idle": "dodo_idle"
-            }
+    def submit_behavior(self, behavior_name: str, preempt: bool = False,
+                        speed_factor: Optional[float] = None, **kwargs) -> BehaviorHandle:
+        """
+        Queue a behavior on the motion thread and return immediately.
 
-            preset_name = behavior_map.get(behavior_name, behavior_name)
-
-            # Load preset from local presets directory
-            presets_dir = Path(__file__).parent / "presets"
-            preset_path = presets_dir / f"{preset_name}.py"
-
-            if not preset_path.exists():
-                return {
-                    "success": False,
-                    "duration": 0.0,
-                    "error": f"Preset '{preset_name}' not found in {presets_dir}"
-                }
-
-            # Load the preset module
-            spec = importlib.util.spec_from_file_location(f"preset_{preset_name}", preset_path)
-            if spec is None or spec.loader is None:
-                return {
-                    "success": False,
-                    "duration": 0.0,
-                    "error": f"Failed to load preset '{preset_name}'"
-                }
-
-            preset_module = importlib.util.module_from_spec(spec)
-            spec.loader.exec_module(preset_module)
-
-            if not hasattr(preset_module, 'execute'):
-                return {
-                    "success": False,
-                    "duration": 0.0,
-                    "error": f"Preset '{preset_name}' does not have an execute() function"
-                }
-
-            # Execute behavior and time it
-            start_time = time.time()
-            preset_module.execute(self.controller, **kwargs)
-            duration = time.time() - start_time
+        Args:
+            behavior_name: Name of the behavior (e.g., "greeting", "head_bob")
+            preempt: Cancel whatever is running or queued and run this next
+            speed_factor: Playback speed for this call (defaults to the global one)
+            **kwargs: Additional parameters for the behavior
 
-            return {
-                "success": True,
-                "duration": duration,
-                "error": None
-            }
+        Returns:
+            BehaviorHandle - result() waits for the result dict, cancel() stops it
+        """
+        # Ensure we're connected
+        if not self.connect():
+            return self._failed_behavior(behavior_name, kwargs, self.connection_error())
 
+        try:
+            # Cached preset module (reloaded only if the file changed)
+            preset = self.presets.get(behavior_name)
+            self.presets.bind(preset, self.controller, kwargs)
         except Exception as e:
-            return {
-                "success": False,
-                "duration": 0.0,
-                "error": str(e)
-            }
+            return self._failed_behavior(behavior_name, kwargs, str(e))
+
+        if speed_factor is None:
+            speed_factor = self.speed_factor
+        speed_factor = min(max(float(speed_factor), self.MIN_SPEED_FACTOR), self.MAX_SPEED_FACTOR)
+
+        return self.motion.submit(behavior_name, kwargs, preempt=preempt, speed_factor=speed_factor)
+
+    def _failed_behavior(self, behavior_name: str, kwargs: dict, error: str) -> BehaviorHandle:
+        """Already-finished handle for a behavior that couldn't be started"""
+        handle = BehaviorHandle(behavior_name, kwargs)
+        handle.set_result({
+            "success": False,
+            "duration": 0.0,
+            "error": error
+        })
+        return handle
+
+    def _run_behavior(self, handle: BehaviorHandle) -> dict:
+        """Run one behavior on the motion thread"""
+        preset = self.presets.get(handle.behavior_name)
+        time_scale = 1.0 / handle.speed_factor
+        limits = velocity_limits(self.calibration) if self.calibration else None
+
+        # Presets keyframes can't express (None) play imperatively even in trajectory mode
+        trajectory = self.presets.trajectory(preset, handle.kwargs) if self.use_trajectories else None
+
+        # Trajectories scale their own timing; imperative presets get a scaled clock
+        clock = CancellableClock(handle.cancel_event, time_scale=1.0 if trajectory is not None else time_scale,
+                                 base=self.clock if self.simulated else None)
+        proxy = MotionProxy(self.controller, handle, self._bus_lock, read_snapshot=self.get_snapshot,
+                            clock=clock, next_queued=self.motion.next_queued,
+                            detect_return=trajectory is None, velocity_limits=limits,
+                            on_step=self.recorder.mark_step if self.recorder and trajectory is None else None)
+
+        # Execute behavior and time it
+        start_time = self.clock.time()
+        if self.recorder is not None:
+            self.recorder.begin_behavior(handle.behavior_name)
+        try:
+            with use_clock(clock):
+                if trajectory is not None:
+                    engine = TrajectoryEngine(proxy, time_scale=time_scale, velocity_limits=limits,
+                                              on_segment=(lambda keyframe: self.recorder.mark_step())
+                                              if self.recorder else None)
+                    # Deltas are relative to the chain's rest pose, but a blended-in
+                    # behavior starts moving from where the last one left the arm
+                    start_pose = proxy.get_positions()
+                    playback = engine.run(trajectory, start_pose=start_pose, skip_return=proxy.try_blend,
+                                          commanded_pose=proxy.commanded)
+                else:
+                    preset.module.execute(proxy, **handle.kwargs)
+
+        except BehaviorCancelled:
+            if handle.restore and proxy.start_pose is not None:
+                with self._bus_lock:
+                    self.controller.set_positions(proxy.start_pose)
+                handle.end_commanded = dict(proxy.start_pose)
+                self.clock.sleep(self.RESTORE_SETTLE_TIME)
+
+            result = handle.cancelled_result()
+            result["duration"] = self.clock.time() - start_time
+            return result
+
+        except LINK_ERRORS as e:
+            # Let the supervisor check the link now rather than at the next ping
+            # (other exceptions are preset bugs and leave the link alone)
+            self.supervisor.report_failure(f"Behavior '{handle.behavior_name}' failed: {e}")
+            raise
+
+        finally:
+            if self.recorder is not None:
+                self.recorder.end_behavior()
+
+        duration = self.clock.time() - start_time
+        self.presets.record_execution(preset, duration)
+        handle.end_commanded = dict(proxy.commanded)
+
+        if trajectory is not None:
+            nominal = sum(segment["budget"] for segment in playback["segments"])
+            effective = playback["duration"]
+        else:
+            nominal, effective = clock.nominal, clock.effective
+
+        return {
+            "success": True,
+            "duration": duration,
+            "error": None,
+            "speed_factor": handle.speed_factor,
+            "nominal_duration": round(nominal, 3),
+            "effective_duration": round(effective, 3)
+        }
+
+    def _return_to_rest(self, blend: BlendState):
+        """Finish a chain of blended behaviors back at the pose it started from"""
+        with self._bus_lock:
+            self.controller.set_positions(blend.rest_pose)
+        self.clock.sleep(self.REST_SETTLE_TIME)
 
     def get_available_behaviors(self) -> list:
         """
@@ -179,86 +464,79 @@ class RobotController:
             "idle"
         ]
 
-    def rotate_base(self, degrees: float, direction: str = "auto") -> dict:
+    def rotate_base(self, degrees: float, direction: str = "auto",
+                    return_to_start: bool = True) -> dict:
         """
-        Rotate the LeKiwi base by specified degrees and return to start.
+        Rotate the LeKiwi base by specified degrees, optionally returning to start.
+
+        With telemetry running, the rotation is closed-loop on wheel encoder
+        odometry with an acceleration-limited speed profile, and stops at the
+        measured target angle. Without it, falls back to timed open-loop turns.
 
         Args:
             degrees: Number of degrees to rotate (positive values)
             direction: "left", "right", or "auto" (auto chooses shortest path)
+            return_to_start: Rotate back to the starting orientation afterwards
 
         Returns:
-            dict with keys: success (bool), actual_degrees (float), error (str)
+            dict with keys: success (bool), actual_degrees (float), error (str),
+            returned_to_start (bool), closed_loop (bool)
         """
         # Ensure we're connected
         if not self.connect():
             return {
                 "success": False,
                 "actual_degrees": 0.0,
-                "error": "Failed to connect to robot"
+                "error": self.connection_error()
             }
 
-        try:
-            # Calibration: approximately 1.5 seconds per 90 degrees at speed 400
-            SECONDS_PER_DEGREE = 1.5 / 90.0
-            ROTATION_SPEED = 400
+        # At most one full turn (360 means a full turn, not none)
+        degrees = min(abs(degrees), 360.0)
 
-            # Determine direction
-            if direction == "auto":
-                # For now, use left as default
+        # Determine direction
+        if direction == "auto":
+            # Shortest path: more than half a turn is quicker the other way
+            if 180 < degrees < 360:
+                direction = "right"
+                degrees = 360 - degrees
+            else:
                 direction = "left"
 
-            # Calculate duration
-            duration = abs(degrees) * SECONDS_PER_DEGREE
+        # Left (counter-clockwise) is a positive heading
+        target = math.radians(degrees) if direction == "left" else -math.radians(degrees)
+        closed_loop = self.telemetry is not None and self.telemetry.is_running()
 
-            # Set wheel velocities for rotation
-            # Left rotation: left wheel back, right wheel forward
-            # Right rotation: left wheel forward, right wheel back
-            if direction == "left":
-                # Counter-clockwise rotation
-                velocities = [-ROTATION_SPEED, -ROTATION_SPEED, -ROTATION_SPEED]
+        try:
+            if closed_loop:
+                turned = self._rotate_closed_loop(target)
+                returned = False
+                if return_to_start:
+                    self._rotate_closed_loop(-turned)
+                    returned = True
             else:
-                # Clockwise rotation
-                velocities = [ROTATION_SPEED, ROTATION_SPEED, ROTATION_SPEED]
-
-            # Wheel motor IDs are 7, 8, 9
-            wheel_ids = [7, 8, 9]
-
-            # Rotate
-            for motor_id, velocity in zip(wheel_ids, velocities):
-                self.controller.set_goal_velocity(motor_id, velocity)
-
-            time.sleep(duration)
-
-            # Stop wheels
-            for motor_id in wheel_ids:
-                self.controller.set_goal_velocity(motor_id, 0)
-
-            time.sleep(0.1)  # Brief pause
-
-            # Return to start position (rotate back)
-            return_velocities = [-v for v in velocities]
-
-            for motor_id, velocity in zip(wheel_ids, return_velocities):
-                self.controller.set_goal_velocity(motor_id, velocity)
-
-            time.sleep(duration)
-
-            # Stop wheels
-            for motor_id in wheel_ids:
-                self.controller.set_goal_velocity(motor_id, 0)
+                turned = self._rotate_open_loop(target)
+                returned = False
+                if return_to_start:
+                    self.clock.sleep(0.1)  # Brief pause
+                    self._rotate_open_loop(-turned)
+                    returned = True
 
             return {
                 "success": True,
-                "actual_degrees": degrees,
-                "error": None
+                "actual_degrees": round(abs(math.degrees(turned)), 1),
+                "error": None,
+                "returned_to_start": returned,
+                "closed_loop": closed_loop
             }
 
         except Exception as e:
+            if isinstance(e, LINK_ERRORS):
+                self.supervisor.report_failure(f"Base rotation failed: {e}")
+
             # Stop wheels on error
             try:
-                for motor_id in [7, 8, 9]:
-                    self.controller.set_goal_velocity(motor_id, 0)
+                with self._bus_lock:
+                    self.bus.stop_wheels(WHEEL_MOTOR_IDS)
             except:
                 pass
 
@@ -268,6 +546,77 @@ class RobotController:
                 "error": str(e)
             }
 
+    def _rotate_closed_loop(self, target: float) -> float:
+        """
+        Turn the base by target radians (left positive) using encoder odometry
+
+        Returns:
+            Measured rotation in radians
+        """
+        odometry = BaseOdometry()
+        profile = RotationProfile(max_speed=self.ROTATION_SPEED, acceleration=self.ROTATION_ACCELERATION)
+        tolerance = math.radians(self.ROTATION_TOLERANCE_DEGREES)
+
+        last = self.telemetry.wait_for_update(timeout=0.5)
+        if last is None:
+            raise LinkError("No telemetry for base odometry")
+        odometry.reset(last)
+
+        # Generous bound: twice the time of a constant-speed turn, plus ramps
+        nominal = rotation_seconds(target, self.ROTATION_SPEED)
+        deadline = time.monotonic() + 2.0 * nominal + 2.0
+
+        speed = 0.0
+        try:
+            while True:
+                snapshot = self.telemetry.wait_for_update(last.seq, timeout=0.5)
+                if snapshot is None:
+                    raise LinkError("Telemetry stopped during base rotation")
+
+                remaining = target - odometry.update(snapshot)
+                if abs(remaining) <= tolerance:
+                    break
+                if time.monotonic() > deadline:
+                    print(f"Warning: base rotation timed out {math.degrees(remaining):.1f} degrees short")
+                    break
+
+                speed = profile.next_speed(speed, remaining, snapshot.monotonic - last.monotonic)
+                last = snapshot
+
+                # Negative wheel speeds turn left
+                with self._bus_lock:
+                    self.bus.set_goal_velocities({motor_id: -speed for motor_id in WHEEL_MOTOR_IDS})
+        finally:
+            with self._bus_lock:
+                self.bus.stop_wheels(WHEEL_MOTOR_IDS)
+
+        # Include whatever the base coasted after the stop
+        settled = self.telemetry.wait_for_update(last.seq, timeout=0.5)
+        return odometry.update(settled) if settled is not None else odometry.heading
+
+    def _rotate_open_loop(self, target: float) -> float:
+        """
+        Turn the base by target radians (left positive) on timing alone
+
+        Returns:
+            The requested rotation (nothing is measured)
+        """
+        # Same rate model as odometry (about 1.5 s per 90 degrees at speed 400)
+        duration = rotation_seconds(target, self.ROTATION_SPEED)
+
+        # Left (counter-clockwise) rotation: all wheels negative
+        velocity = -self.ROTATION_SPEED if target > 0 else self.ROTATION_SPEED
+
+        try:
+            with self._bus_lock:
+                self.bus.set_goal_velocities({motor_id: velocity for motor_id in WHEEL_MOTOR_IDS})
+            self.clock.sleep(duration)
+        finally:
+            with self._bus_lock:
+                self.bus.stop_wheels(WHEEL_MOTOR_IDS)
+
+        return target
+
     def capture_joint_positions(self) -> dict:
         """
         Capture current positions of all joints.
@@ -281,41 +630,36 @@ class RobotController:
             return {
                 "success": False,
                 "positions": {},
-                "error": "Failed to connect to robot"
+                "error": self.connection_error()
+            }
+
+        # Served from the telemetry loop when it's running - no bus traffic.
+        # Snapshots use the preset scale (-100..100), this reports -1.0..1.0
+        snapshot = self.get_snapshot()
+        if snapshot is not None:
+            positions = {
+                name: round(snapshot.positions[name] / 100.0, 3) if snapshot.positions.get(name) is not None else None
+                for name in ARM_JOINTS
+            }
+            # Wheels report their measured velocity
+            positions.update({name: snapshot.velocities.get(name) for name in WHEEL_JOINTS})
+            return {
+                "success": True,
+                "positions": positions,
+                "error": None
             }
 
         try:
-            positions = {}
-
-            # Read all motor positions
-            # Arm motors: 1-6
-            arm_motor_names = [
-                "shoulder_pan",
-                "shoulder_lift",
-                "elbow_flex",
-                "wrist_flex",
-                "wrist_roll",
-                "gripper"
-            ]
-
-            for motor_id, name in enumerate(arm_motor_names, start=1):
-                try:
-                    # Get normalized position (-1.0 to 1.0)
-                    pos = self.controller.get_normalized_position(motor_id)
-                    positions[name] = round(pos, 3)
-                except Exception as e:
-                    positions[name] = None
-                    print(f"Warning: Could not read {name}: {e}")
-
-            # Wheel motors: 7-9 (velocities, not positions)
-            wheel_names = ["wheel_left", "wheel_back", "wheel_right"]
-            for motor_id, name in enumerate(wheel_names, start=7):
-                try:
-                    # For wheels, we can read current velocity or just set to 0 (stopped)
-                    positions[name] = 0  # Wheels should be stopped when capturing
-                except Exception as e:
-                    positions[name] = None
-                    print(f"Warning: Could not read {name}: {e}")
+            # Whole arm pose in one read (one sync packet when the bus supports it)
+            with self._bus_lock:
+                pose = self.controller.get_positions()
+            positions = {
+                name: round(pose[name] / 100.0, 3) if pose.get(name) is not None else None
+                for name in ARM_JOINTS
+            }
+
+            # Wheels should be stopped when capturing
+            positions.update({name: 0 for name in WHEEL_JOINTS})
 
             return {
                 "success": True,
@@ -338,15 +682,30 @@ class RobotController:
         if not self.is_connected or not self.controller:
             return
 
+        # Nothing should keep moving once Doda goes limp
+        self.motion.cancel_all(restore=False)
+
         try:
-            # Disable torque for all motors (1-9)
-            for motor_id in range(1, 10):
-                try:
-                    self.controller.disable_torque(motor_id)
-                except:
-                    pass
+            # Disable torque for all motors (1-9) in one sync write
+            with self._bus_lock:
+                self.bus.set_torque(ALL_MOTOR_IDS, False)
 
             print("All torques disabled - Doda is now limp")
 
         except Exception as e:
             print(f"Error disabling torques: {e}")
+
+    def enable_all_torques(self):
+        """
+        Re-enable all motor torques after disable_all_torques().
+        Doda holds her pose again.
+        """
+        if not self.is_connected or not self.controller:
+            return
+
+        try:
+            with self._bus_lock:
+                self.bus.set_torque(ALL_MOTOR_IDS, True)
+
+        except Exception as e:
+            print(f"Error enabling torques: {e}")
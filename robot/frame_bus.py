@@ -0,0 +1,391 @@
+"""
+Shared-memory frame bus for Doda Terminal
+One publisher (the process that owns the camera) writes the newest frame into
+a multiprocessing.shared_memory ring; any number of readers, in this process
+or others, get NumPy views of it without touching the camera.
+
+Each slot is guarded by a sequence counter (odd while being written), so
+readers never block the publisher - a slow reader just sees newer frames or
+finds its view has been overwritten.
+
+Closing the publisher clears the magic number first. Readers check it and
+re-attach by name, so a publisher recreated with a new frame shape under
+the same name is picked up instead of leaving readers on the dead segment.
+A segment that already exists when a publisher starts is treated as stale
+(left by a crashed publisher, or on Windows kept alive by a reader's
+mapping): it is reused in place with a new generation number if it is big
+enough, and replaced otherwise.
+"""
+
+import sys
+import time
+from multiprocessing import shared_memory
+from typing import Optional, Tuple
+
+import numpy as np
+
+BUS_MAGIC = 0x444F4441  # "DODA"
+BUS_VERSION = 1
+
+# Bus header, followed by one header per slot and then the frame slots
+_BUS_HEADER = np.dtype([
+    ("magic", np.int64),
+    ("version", np.int64),
+    ("height", np.int64),
+    ("width", np.int64),
+    ("channels", np.int64),
+    ("slots", np.int64),
+    ("latest_seq", np.int64),
+    ("generation", np.int64),  # Bumped when a stale segment is reused in place
+])
+
+_SLOT_HEADER = np.dtype([
+    ("seq", np.int64),        # 2*seq-1 while frame seq is being written, 2*seq once committed
+    ("timestamp", np.float64),
+])
+
+
+def _layout(shape: tuple, slots: int) -> Tuple[int, int, int]:
+    """Byte offsets of the slot headers and frame slots, plus total size"""
+    frame_bytes = int(np.prod(shape))
+    slot_headers = _BUS_HEADER.itemsize
+    frames = slot_headers + _SLOT_HEADER.itemsize * slots
+    # Align frame data to 64 bytes so views start on a cache line
+    frames = (frames + 63) // 64 * 64
+    return slot_headers, frames, frames + frame_bytes * slots
+
+
+# Segments published by this process (the resource tracker already knows them)
+_published_names = set()
+
+
+def _create(name: str, size: int) -> shared_memory.SharedMemory:
+    """Create a publisher segment, taking over a stale one left under the same name"""
+    try:
+        return shared_memory.SharedMemory(name=name, create=True, size=size)
+    except FileExistsError:
+        if name in _published_names:
+            raise  # A live publisher in this process owns it
+
+    stale = shared_memory.SharedMemory(name=name)
+    if stale.size >= size:
+        return stale
+
+    # Too small to reuse: tell readers still mapped to it to re-attach, then replace it
+    header = np.ndarray((), dtype=_BUS_HEADER, buffer=stale.buf)
+    header["magic"] = 0
+    del header
+    stale.close()
+    stale.unlink()
+    return shared_memory.SharedMemory(name=name, create=True, size=size)
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    """Attach to an existing segment without letting this process unlink it on exit"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Python < 3.13: the resource tracker would destroy the segment when a reader exits
+        shm = shared_memory.SharedMemory(name=name)
+        if name not in _published_names:
+            from multiprocessing import resource_tracker
+            resource_tracker.unregister(shm._name, "shared_memory")
+        return shm
+
+
+class FrameBusPublisher:
+    """Writes frames into a named shared-memory ring"""
+
+    def __init__(self, name: str, shape: tuple, slots: int = 3):
+        """
+        Create the shared-memory segment
+
+        Args:
+            name: Segment name readers attach to (e.g. "doda_camera")
+            shape: Frame shape (height, width, channels), uint8
+            slots: Number of frames kept; readers have slots-1 publishes
+                before a zero-copy view gets overwritten
+        """
+        if len(shape) == 2:
+            shape = (shape[0], shape[1], 1)
+
+        self.name = name
+        self.shape = tuple(int(d) for d in shape)
+        self.slots = max(2, slots)
+
+        slot_offset, frame_offset, size = _layout(self.shape, self.slots)
+        self._shm = _create(name, size)
+        _published_names.add(name)
+
+        buf = self._shm.buf
+        self._header = np.ndarray((), dtype=_BUS_HEADER, buffer=buf)
+        # A reused segment may still carry the old magic; readers on it re-attach
+        # once they see it cleared, and the new generation tells them apart
+        reused = int(self._header["magic"]) == BUS_MAGIC
+        self._header["magic"] = 0
+        self.generation = int(self._header["generation"]) + 1 if reused else 1
+        self._slot_headers = np.ndarray((self.slots,), dtype=_SLOT_HEADER, buffer=buf,
+                                        offset=slot_offset)
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=buf,
+                                  offset=frame_offset)
+
+        self._slot_headers["seq"] = 0
+        self._header["height"], self._header["width"], self._header["channels"] = self.shape
+        self._header["slots"] = self.slots
+        self._header["latest_seq"] = 0
+        self._header["generation"] = self.generation
+        self._header["version"] = BUS_VERSION
+        # Magic last - readers treat the segment as ready once it is set
+        self._header["magic"] = BUS_MAGIC
+
+        self.frames_published = 0
+        self.frames_rejected = 0
+
+    def publish(self, frame: np.ndarray, timestamp: Optional[float] = None) -> bool:
+        """
+        Copy a frame into the next slot
+
+        Args:
+            frame: Frame matching the bus shape
+            timestamp: Capture time (defaults to now)
+
+        Returns:
+            True if published, False if the frame shape doesn't match
+        """
+        if frame.size != self._frames[0].size:
+            self.frames_rejected += 1
+            return False
+
+        seq = int(self._header["latest_seq"]) + 1
+        slot = seq % self.slots
+        slot_header = self._slot_headers[slot]
+
+        slot_header["seq"] = 2 * seq - 1
+        self._frames[slot].reshape(frame.shape)[...] = frame
+        slot_header["timestamp"] = timestamp if timestamp is not None else time.time()
+        slot_header["seq"] = 2 * seq
+        self._header["latest_seq"] = seq
+
+        self.frames_published += 1
+        return True
+
+    def close(self):
+        """Release and remove the shared-memory segment"""
+        if self._shm is None:
+            return
+
+        # Tell readers still mapped to this segment that it is gone
+        self._header["magic"] = 0
+
+        # Drop our views before closing the mapping
+        self._header = self._slot_headers = self._frames = None
+        self._shm.close()
+        try:
+            self._shm.unlink()
+        except FileNotFoundError:
+            pass
+        _published_names.discard(self.name)
+        self._shm = None
+
+    def get_stats(self) -> dict:
+        """Get publisher statistics"""
+        return {
+            "name": self.name,
+            "shape": self.shape,
+            "slots": self.slots,
+            "generation": self.generation,
+            "frames_published": self.frames_published,
+            "frames_rejected": self.frames_rejected
+        }
+
+
+class FrameBusReader:
+    """Reads the newest frame from a frame bus without copying"""
+
+    def __init__(self, name: str, timeout: float = 5.0):
+        """
+        Attach to a publisher's segment
+
+        Args:
+            name: Segment name used by the publisher
+            timeout: Seconds to wait for the publisher to create the segment
+        """
+        self.name = name
+        self._shm = None
+        self._header = self._slot_headers = self._frames = None
+        self._retired = []   # (segment, frames) replaced but kept mapped for views still in use
+        self.reattaches = 0
+        self._open(timeout)
+
+    def _open(self, timeout: float):
+        """Attach to the segment and map its header, slot headers and frames"""
+        deadline = time.time() + timeout
+        while True:
+            try:
+                self._shm = _attach(self.name)
+                break
+            except FileNotFoundError:
+                if time.time() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+        buf = self._shm.buf
+        self._header = np.ndarray((), dtype=_BUS_HEADER, buffer=buf)
+        while int(self._header["magic"]) != BUS_MAGIC:
+            if time.time() >= deadline:
+                self._detach()
+                raise RuntimeError(f"Frame bus '{self.name}' was never initialized")
+            time.sleep(0.01)
+
+        if int(self._header["version"]) != BUS_VERSION:
+            version = int(self._header["version"])
+            self._detach()
+            raise RuntimeError(f"Frame bus '{self.name}' has unsupported version {version}")
+
+        self.shape = (int(self._header["height"]), int(self._header["width"]),
+                      int(self._header["channels"]))
+        self.slots = int(self._header["slots"])
+        self.generation = int(self._header["generation"])
+
+        slot_offset, frame_offset, _ = _layout(self.shape, self.slots)
+        self._slot_headers = np.ndarray((self.slots,), dtype=_SLOT_HEADER, buffer=buf,
+                                        offset=slot_offset)
+        self._frames = np.ndarray((self.slots,) + self.shape, dtype=np.uint8, buffer=buf,
+                                  offset=frame_offset)
+        self._frames.flags.writeable = False
+
+    def _detach(self, keep_mapped: bool = False):
+        """
+        Drop the current mapping
+
+        Args:
+            keep_mapped: Keep the memory mapped until close() (callers may
+                still hold zero-copy views into it)
+        """
+        if self._shm is None:
+            return
+
+        frames = self._frames
+        self._header = self._slot_headers = self._frames = None
+        if keep_mapped and frames is not None:
+            self._retired.append((self._shm, frames))
+            del frames
+        else:
+            del frames
+            self._shm.close()
+        self._shm = None
+        self._release_retired()
+
+    def _release_retired(self):
+        """Close replaced segments once no view into them is left"""
+        in_use = []
+        for shm, frames in self._retired:
+            # References: the tuple, the loop variable and getrefcount's argument.
+            # Every view handed out by read() adds one (views keep frames as their base)
+            if sys.getrefcount(frames) > 3:
+                in_use.append((shm, frames))
+            else:
+                del frames
+                shm.close()
+        self._retired = in_use
+
+    def _ensure_attached(self) -> bool:
+        """
+        Re-attach if the publisher closed (or replaced) the segment
+
+        Returns:
+            True if attached to a live segment
+        """
+        if (self._shm is not None and int(self._header["magic"]) == BUS_MAGIC
+                and int(self._header["generation"]) == self.generation):
+            return True
+
+        self._detach(keep_mapped=True)
+        try:
+            self._open(timeout=0)
+        except (FileNotFoundError, RuntimeError):
+            return False  # Publisher not back (yet)
+        self.reattaches += 1
+        return True
+
+    def latest_seq(self) -> int:
+        """Sequence number of the newest committed frame (0 if none yet)"""
+        if not self._ensure_attached():
+            return 0
+        return int(self._header["latest_seq"])
+
+    def read(self, copy: bool = False) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Get the newest frame
+
+        Args:
+            copy: Return a private copy instead of a view into shared memory
+
+        Returns:
+            Tuple of (frame, timestamp, seq), or None if nothing published yet.
+            A view stays valid until the publisher wraps around; check with
+            is_current(seq) after using it. Sequence numbers restart when
+            the reader re-attaches to a new segment (see reattaches).
+        """
+        if not self._ensure_attached():
+            return None
+
+        for _ in range(self.slots):
+            seq = self.latest_seq()
+            if seq == 0:
+                return None
+
+            slot = seq % self.slots
+            if int(self._slot_headers[slot]["seq"]) != 2 * seq:
+                continue  # Publisher moved on while we looked; try again
+
+            frame = self._frames[slot]
+            timestamp = float(self._slot_headers[slot]["timestamp"])
+            if copy:
+                frame = frame.copy()
+
+            # Make sure the slot wasn't overwritten while we were reading it
+            if int(self._slot_headers[slot]["seq"]) == 2 * seq:
+                return frame, timestamp, seq
+
+        return None
+
+    def is_current(self, seq: int) -> bool:
+        """Check that the frame with this sequence number hasn't been overwritten"""
+        if (self._shm is None or int(self._header["magic"]) != BUS_MAGIC
+                or int(self._header["generation"]) != self.generation):
+            return False
+        return int(self._slot_headers[seq % self.slots]["seq"]) == 2 * seq
+
+    def wait_for_frame(self, after_seq: int = 0, timeout: float = 1.0,
+                       copy: bool = False) -> Optional[Tuple[np.ndarray, float, int]]:
+        """
+        Wait for a frame newer than after_seq
+
+        Args:
+            after_seq: Last sequence number the caller has seen
+            timeout: Maximum seconds to wait
+            copy: Return a private copy instead of a view
+
+        Returns:
+            Tuple of (frame, timestamp, seq), or None on timeout
+        """
+        deadline = time.time() + timeout
+        reattaches = self.reattaches
+        while self.latest_seq() <= after_seq:
+            if self.reattaches != reattaches:
+                # New segment, new sequence numbers: anything on it is newer
+                after_seq, reattaches = 0, self.reattaches
+                continue
+            if time.time() >= deadline:
+                return None
+            time.sleep(0.002)
+
+        return self.read(copy=copy)
+
+    def close(self):
+        """Detach from the segment (the publisher owns its lifetime)"""
+        self._detach()
+        for shm, _ in self._retired:
+            shm.close()
+        self._retired = []
@@ -0,0 +1,213 @@
+"""
+Background frame grabber for Doda Terminal
+Keeps decoding camera frames on a worker thread so callers always get the
+newest frame from memory instead of blocking on the sensor.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class FrameGrabber:
+    """Continuously reads frames into a small ring buffer on a daemon thread"""
+
+    def __init__(self, cap, buffer_size: int = 3, fps_window: int = 30):
+        """
+        Initialize frame grabber
+
+        Args:
+            cap: Opened cv2.VideoCapture (or anything with read()/isOpened())
+            buffer_size: Number of recent frames kept in the ring buffer
+            fps_window: Number of recent frame timestamps used for the fps estimate
+        """
+        self.cap = cap
+        self.buffer_size = max(1, buffer_size)
+
+        # Ring buffer of (frame, timestamp, sequence, served) entries
+        self._buffer: deque = deque(maxlen=self.buffer_size)
+        self._timestamps: deque = deque(maxlen=max(2, fps_window))
+        self._lock = threading.Lock()
+        self._new_frame = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._running = threading.Event()
+        self._exited = False        # Capture loop finished (guarded by _lock)
+        self._release_cap = False   # Capture loop releases cap on its way out
+        self._listeners: List[Callable[[np.ndarray, float], None]] = []
+
+        # Statistics
+        self.frames_captured = 0
+        self.frames_dropped = 0
+        self.read_failures = 0
+
+    def start(self):
+        """Start the capture thread (no-op if already running)"""
+        if self.is_running():
+            return
+
+        self._running.set()
+        self._exited = False
+        self._thread = threading.Thread(target=self._run, name="FrameGrabber", daemon=True)
+        self._thread.start()
+
+    def stop(self, release: bool = False, timeout: Optional[float] = None) -> bool:
+        """
+        Stop the capture thread
+
+        The thread may be inside cap.read(), so cap can't be touched until it
+        has exited. Without release this waits for that; with release the
+        thread releases cap itself after its last read, and the caller never
+        touches cap again.
+
+        Args:
+            release: Hand the release of cap to the capture thread
+            timeout: Seconds to wait for the thread (None waits until it exits);
+                only use one with release, or the caller may race a read
+
+        Returns:
+            True if the thread has exited
+        """
+        self._running.clear()
+
+        # Wake up any waiters so they don't hang on a stopped grabber
+        with self._new_frame:
+            self._new_frame.notify_all()
+            self._release_cap = release
+            release_here = release and (self._thread is None or self._exited)
+
+        if release_here:
+            self.cap.release()  # Loop already gone (or never started)
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                return False
+            self._thread = None
+        return True
+
+    def add_listener(self, callback: Callable[[np.ndarray, float], None]):
+        """
+        Call callback(frame, timestamp) on the capture thread for every frame
+
+        Listeners must be quick (e.g. a shared-memory copy); anything slow
+        lowers the capture rate for everyone.
+        """
+        self._listeners.append(callback)
+
+    def remove_listener(self, callback: Callable[[np.ndarray, float], None]):
+        """Stop calling a listener"""
+        if callback in self._listeners:
+            self._listeners.remove(callback)
+
+    def is_running(self) -> bool:
+        """Check if the capture thread is alive"""
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Capture loop - decode frames as fast as the camera delivers them"""
+        try:
+            self._capture_loop()
+        finally:
+            with self._lock:
+                self._exited = True
+                release = self._release_cap
+            if release:
+                self.cap.release()
+
+    def _capture_loop(self):
+        while self._running.is_set():
+            ret, frame = self.cap.read()
+            timestamp = time.time()
+
+            if not ret or frame is None:
+                self.read_failures += 1
+                # Back off briefly so a dead camera doesn't spin the CPU
+                time.sleep(0.01)
+                continue
+
+            with self._new_frame:
+                # Count the oldest frame as dropped if nobody ever looked at it
+                if len(self._buffer) == self._buffer.maxlen and not self._buffer[0][3]:
+                    self.frames_dropped += 1
+
+                self.frames_captured += 1
+                self._buffer.append([frame, timestamp, self.frames_captured, False])
+                self._timestamps.append(timestamp)
+                self._new_frame.notify_all()
+
+            for listener in list(self._listeners):
+                try:
+                    listener(frame, timestamp)
+                except Exception as e:
+                    print(f"Warning: Frame listener failed: {e}")
+                    self.remove_listener(listener)
+
+    def latest(self, copy: bool = True) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Get the newest frame without blocking
+
+        Args:
+            copy: Return a copy so the caller can modify it safely
+
+        Returns:
+            Tuple of (frame, timestamp), or None if no frame captured yet
+        """
+        with self._lock:
+            if not self._buffer:
+                return None
+
+            entry = self._buffer[-1]
+            entry[3] = True
+            frame, timestamp = entry[0], entry[1]
+
+        return (frame.copy() if copy else frame), timestamp
+
+    def wait_for_frame(self, newer_than: float = 0.0, timeout: float = 1.0,
+                       copy: bool = True) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Wait for a frame captured after a given time
+
+        Args:
+            newer_than: Only accept frames with a timestamp after this (time.time())
+            timeout: Maximum seconds to wait
+            copy: Return a copy so the caller can modify it safely
+
+        Returns:
+            Tuple of (frame, timestamp), or None on timeout
+        """
+        deadline = time.time() + timeout
+
+        with self._new_frame:
+            while not self._buffer or self._buffer[-1][1] <= newer_than:
+                remaining = deadline - time.time()
+                if remaining <= 0 or not self._running.is_set():
+                    return None
+                self._new_frame.wait(remaining)
+
+        return self.latest(copy=copy)
+
+    def get_fps(self) -> float:
+        """Effective capture rate over the recent frame window"""
+        with self._lock:
+            if len(self._timestamps) < 2:
+                return 0.0
+            elapsed = self._timestamps[-1] - self._timestamps[0]
+            count = len(self._timestamps) - 1
+
+        return count / elapsed if elapsed > 0 else 0.0
+
+    def get_stats(self) -> dict:
+        """Get capture statistics"""
+        latest = self._buffer[-1][1] if self._buffer else None
+
+        return {
+            "running": self.is_running(),
+            "frames_captured": self.frames_captured,
+            "frames_dropped": self.frames_dropped,
+            "read_failures": self.read_failures,
+            "effective_fps": round(self.get_fps(), 1),
+            "latest_frame_age": round(time.time() - latest, 3) if latest else None
+        }
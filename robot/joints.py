@@ -0,0 +1,32 @@
+"""
+Joint and motor layout of the LeKiwi / SO-101 Doda body
+
+Body mapping:
+- shoulder_lift = knees
+- elbow_flex = waist/butt
+- wrist_flex = neck
+- wrist_roll = head rotation
+- gripper = beak
+"""
+
+# Arm motors 1-6, in motor ID order
+ARM_JOINTS = [
+    "shoulder_pan",
+    "shoulder_lift",
+    "elbow_flex",
+    "wrist_flex",
+    "wrist_roll",
+    "gripper"
+]
+
+# Base wheel motors 7-9
+WHEEL_JOINTS = ["wheel_left", "wheel_back", "wheel_right"]
+
+ALL_JOINTS = ARM_JOINTS + WHEEL_JOINTS
+
+# Joint name -> Feetech motor ID
+MOTOR_IDS = {name: motor_id for motor_id, name in enumerate(ALL_JOINTS, start=1)}
+
+ARM_MOTOR_IDS = [MOTOR_IDS[name] for name in ARM_JOINTS]
+WHEEL_MOTOR_IDS = [MOTOR_IDS[name] for name in WHEEL_JOINTS]
+ALL_MOTOR_IDS = ARM_MOTOR_IDS + WHEEL_MOTOR_IDS
@@ -0,0 +1,464 @@
+"""
+Motion executor for Doda Terminal
+Runs behaviors on a dedicated motion thread so the agent loop keeps going while
+Doda moves. Each submitted behavior gets a BehaviorHandle (a Future) that can
+be awaited, ignored, or cancelled; cancellation takes effect at the next
+keyframe or sleep inside the preset.
+
+Queued behaviors are blended: a behavior that finishes while another is
+waiting skips its return to the start pose, and the next one starts from
+there, treating the chain's rest pose as its start. The return to rest
+happens once, when the queue runs dry.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import CancelledError, Future
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from .clock import RealClock
+
+
+class BehaviorCancelled(Exception):
+    """Raised inside a running preset when its behavior is cancelled"""
+
+
+class CancellableClock(RealClock):
+    """
+    Real-time clock whose sleeps end early (and raise) on cancellation
+
+    Also scales the preset's sleeps for faster or slower playback. A sleep
+    compressed by the scale is never shorter than the joints need to reach
+    the last command at their velocity limits (see require_until), or longer
+    than the preset asked for.
+    """
+
+    def __init__(self, cancel_event: threading.Event, time_scale: float = 1.0, base=None):
+        self.cancel_event = cancel_event
+        self.time_scale = time_scale
+        self.base = base  # Underlying clock (e.g. a VirtualClock); None waits in real time
+        self.nominal = 0.0     # Sleep time the preset asked for
+        self.effective = 0.0   # Sleep time after scaling and velocity limits
+        self.stretched = 0     # Compressed sleeps lengthened by a velocity limit
+        self._skip_next = False
+        self._earliest_next = 0.0
+
+    def skip_next_sleep(self):
+        """Make the next sleep() return at once (the wait it covers was skipped)"""
+        self._skip_next = True
+
+    def require_until(self, deadline: float):
+        """The joints can't arrive before this monotonic time at their velocity limits"""
+        self._earliest_next = max(self._earliest_next, deadline)
+
+    def sleep(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.nominal += seconds
+
+        if self._skip_next:
+            self._skip_next = False
+            seconds = 0.0
+        elif self.time_scale != 1.0:
+            scaled = seconds * self.time_scale
+            floor = min(seconds, self._earliest_next - self.monotonic())
+            if floor > scaled:
+                scaled = floor
+                self.stretched += 1
+            seconds = scaled
+
+        self.effective += seconds
+        if self.base is None:
+            if self.cancel_event.wait(seconds):
+                raise BehaviorCancelled()
+            return
+
+        if self.cancel_event.is_set():
+            raise BehaviorCancelled()
+        self.base.sleep(seconds)
+
+    def time(self) -> float:
+        return self.base.time() if self.base is not None else super().time()
+
+    def monotonic(self) -> float:
+        return self.base.monotonic() if self.base is not None else super().monotonic()
+
+
+@dataclass
+class BlendState:
+    """Where a behavior left off after skipping its return to rest"""
+    rest_pose: dict   # Pose the chain started from; the next behavior's start pose
+    commanded: dict   # Last pose commanded
+
+
+class BehaviorHandle(Future):
+    """Future for a queued or running behavior; result() is the behavior result dict"""
+
+    def __init__(self, behavior_name: str, kwargs: dict, restore: bool = True,
+                 speed_factor: float = 1.0):
+        super().__init__()
+        self.behavior_name = behavior_name
+        self.kwargs = kwargs
+        self.restore = restore
+        self.speed_factor = speed_factor
+        self.cancel_event = threading.Event()
+        self.submitted_at = time.time()
+        self.blend_in: Optional[BlendState] = None   # Set if the previous behavior handed over to this one
+        self.blend_out: Optional[BlendState] = None  # Set if this behavior skipped its return to rest
+        self.previous_commanded: Optional[dict] = None  # Last pose the previous behavior commanded
+        self.end_commanded: Optional[dict] = None       # Last pose this behavior commanded
+
+    def cancel(self, restore: Optional[bool] = None) -> bool:
+        """
+        Cancel the behavior
+
+        A queued behavior never starts. A running one stops at its next
+        keyframe and (if restore) moves back to the pose it started from.
+
+        Args:
+            restore: Return to the start pose after stopping (default: as submitted)
+
+        Returns:
+            True unless the behavior had already finished
+        """
+        if restore is not None:
+            self.restore = restore
+        if super().cancel():
+            return True
+        if self.done():
+            return False
+
+        self.cancel_event.set()
+        return True
+
+    def cancelled_result(self) -> dict:
+        return {
+            "success": False,
+            "duration": 0.0,
+            "error": "Cancelled",
+            "cancelled": True
+        }
+
+    def result(self, timeout: Optional[float] = None) -> dict:
+        """Wait for the behavior and return its result dict"""
+        try:
+            return super().result(timeout)
+        except CancelledError:
+            return self.cancelled_result()
+
+
+class MotionProxy:
+    """
+    Controller wrapper handed to presets on the motion thread
+
+    Checks for cancellation before every command, serializes bus access with
+    the rest of RobotController, and remembers the first pose the preset read
+    so a cancelled behavior can go back to it. Position reads come from the
+    telemetry snapshot when one is fresh.
+    """
+
+    COMMANDS = ("set_positions", "set_single_joint", "set_gripper", "set_goal_velocity")
+
+    # A command within this distance of the pose already commanded doesn't need its wait
+    BLEND_TOLERANCE = 2.0
+
+    def __init__(self, controller, handle: BehaviorHandle, bus_lock: threading.RLock,
+                 read_snapshot: Optional[Callable] = None, clock: Optional[CancellableClock] = None,
+                 next_queued: Optional[Callable[[], bool]] = None, detect_return: bool = True,
+                 velocity_limits: Optional[dict] = None, on_step: Optional[Callable[[], None]] = None):
+        """
+        Initialize motion proxy
+
+        Args:
+            controller: Real controller
+            handle: Handle of the behavior being run
+            bus_lock: Lock shared with everything else that talks to the bus
+            read_snapshot: Returns the latest telemetry snapshot (or None)
+            clock: The behavior's clock, for skipping waits when blending
+            next_queued: Returns True if another behavior is waiting to run
+            detect_return: Treat set_positions(start pose) as the return to rest
+                (off for trajectories, which ask try_blend() themselves)
+            velocity_limits: Joint -> normalized units per second, for keeping
+                time-scaled sleeps long enough for each move
+            on_step: Called before the first command after each sleep (the
+                preset's next keyframe), e.g. TelemetryRecorder.mark_step
+        """
+        self._controller = controller
+        self._handle = handle
+        self._bus_lock = bus_lock
+        self._read_snapshot = read_snapshot
+        self._clock = clock
+        self._next_queued = next_queued
+        self._detect_return = detect_return
+        self._velocity_limits = velocity_limits or {}
+        self._on_step = on_step
+        self._step_slept: Optional[float] = None  # clock.nominal at the last step mark
+        self._blend_pending = handle.blend_in is not None
+        self.start_pose: Optional[dict] = None
+        self.commanded: dict = {}
+
+    def get_positions(self) -> dict:
+        # Blended in: start from the chain's rest pose, not the mid-chain stance
+        if self.start_pose is None and self._handle.blend_in is not None:
+            self.start_pose = dict(self._handle.blend_in.rest_pose)
+            self.commanded = dict(self._handle.blend_in.commanded)
+            return dict(self.start_pose)
+
+        snapshot = self._read_snapshot() if self._read_snapshot else None
+        positions = snapshot.arm_positions() if snapshot is not None else None
+        if positions is None:
+            with self._bus_lock:
+                positions = self._controller.get_positions()
+        if self.start_pose is None:
+            # Still settling onto where the last behavior left it: use that exact pose,
+            # so small arrival errors don't add up over a run of behaviors
+            previous = self._handle.previous_commanded
+            if previous and set(previous) >= set(positions) and \
+                    all(abs(positions[j] - previous[j]) <= self.BLEND_TOLERANCE for j in positions):
+                positions = {j: previous[j] for j in positions}
+            self.start_pose = dict(positions)
+            self.commanded = dict(positions)
+        return positions
+
+    def try_blend(self) -> bool:
+        """
+        Skip the return to rest if another behavior is queued
+
+        Returns:
+            True if the return should be skipped (the hand-over is recorded
+            on the handle for the next behavior)
+        """
+        if self.start_pose is None or self._next_queued is None or not self._next_queued():
+            return False
+
+        self._handle.blend_out = BlendState(rest_pose=dict(self.start_pose), commanded=dict(self.commanded))
+        return True
+
+    def _is_return_to_start(self, positions: dict) -> bool:
+        if not self._detect_return or self.start_pose is None or set(positions) != set(self.start_pose):
+            return False
+        return all(abs(positions[j] - self.start_pose[j]) < 1e-6 for j in positions)
+
+    def _command(self, name: str, *args, **kwargs):
+        if self._handle.cancel_event.is_set():
+            raise BehaviorCancelled()
+        with self._bus_lock:
+            return getattr(self._controller, name)(*args, **kwargs)
+
+    def _move(self, name: str, targets: dict, *args):
+        """Send a position command, tracking the commanded pose for blending"""
+        if self._on_step is not None:
+            # Commands sent back to back form one step; a sleep starts the next
+            slept = self._clock.nominal if self._clock is not None else 0.0
+            if self._step_slept is None or slept != self._step_slept:
+                self._on_step()
+                self._step_slept = slept
+
+        if self._blend_pending:
+            # First keyframe after a hand-over: if we're already there, don't wait for it
+            self._blend_pending = False
+            already_there = all(abs(v - self.commanded.get(j, float("inf"))) <= self.BLEND_TOLERANCE
+                                for j, v in targets.items())
+            if already_there and self._clock is not None:
+                self._clock.skip_next_sleep()
+
+        result = self._command(name, *args)
+
+        if self._clock is not None and self._velocity_limits:
+            needed = max((abs(v - self.commanded[j]) / self._velocity_limits[j]
+                          for j, v in targets.items()
+                          if j in self._velocity_limits and j in self.commanded), default=0.0)
+            self._clock.require_until(self._clock.monotonic() + needed)
+
+        self.commanded.update(targets)
+        return result
+
+    def set_positions(self, positions: dict, *args, **kwargs):
+        if self._is_return_to_start(positions) and self.try_blend():
+            # Next behavior takes over from here; skip the move and its settle wait
+            if self._clock is not None:
+                self._clock.skip_next_sleep()
+            return None
+        return self._move("set_positions", dict(positions), positions, *args)
+
+    def set_single_joint(self, joint: str, value: float):
+        return self._move("set_single_joint", {joint: value}, joint, value)
+
+    def set_gripper(self, value: float):
+        return self._move("set_gripper", {"gripper": value}, value)
+
+    def set_goal_velocity(self, *args, **kwargs):
+        return self._command("set_goal_velocity", *args, **kwargs)
+
+    def __getattr__(self, name):
+        # Anything else (reads, config) goes straight to the real controller
+        return getattr(self._controller, name)
+
+
+class MotionExecutor:
+    """Single motion thread working through a queue of behaviors"""
+
+    def __init__(self, run_behavior: Callable[[BehaviorHandle], dict],
+                 return_to_rest: Optional[Callable[[BlendState], None]] = None):
+        """
+        Initialize motion executor
+
+        Args:
+            run_behavior: Called on the motion thread with each handle; returns
+                the result dict (BehaviorCancelled propagates as a cancellation)
+            return_to_rest: Called on the motion thread when the queue runs dry
+                after a behavior that skipped its return to rest
+        """
+        self._run_behavior = run_behavior
+        self._return_to_rest = return_to_rest
+        self._queue: deque = deque()
+        self._condition = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+        self._stopping = False
+        self._blend: Optional[BlendState] = None
+        self._last_commanded: Optional[dict] = None
+        self._settling = False
+        self.current: Optional[BehaviorHandle] = None
+
+    def submit(self, behavior_name: str, kwargs: Optional[dict] = None,
+               preempt: bool = False, restore: bool = True,
+               speed_factor: float = 1.0) -> BehaviorHandle:
+        """
+        Queue a behavior
+
+        Args:
+            behavior_name: Behavior to run
+            kwargs: Behavior parameters
+            preempt: Cancel everything queued or running and run this next
+            restore: On cancellation, return to the pose the behavior started from
+            speed_factor: Playback speed (2.0 = twice as fast)
+
+        Returns:
+            BehaviorHandle for the queued behavior
+        """
+        handle = BehaviorHandle(behavior_name, kwargs or {}, restore=restore, speed_factor=speed_factor)
+
+        with self._condition:
+            if preempt:
+                self._cancel_locked()
+            self._queue.append(handle)
+            self._ensure_thread()
+            self._condition.notify()
+
+        return handle
+
+    def cancel_current(self, restore: bool = True) -> bool:
+        """Cancel the running behavior (queued ones still run)"""
+        current = self.current
+        return current.cancel(restore=restore) if current else False
+
+    def cancel_all(self, restore: bool = True):
+        """Cancel the running behavior and everything queued"""
+        with self._condition:
+            self._cancel_locked(restore)
+
+    def _cancel_locked(self, restore: bool = True):
+        while self._queue:
+            self._queue.popleft().cancel()
+        if self.current is not None:
+            self.current.cancel(restore=restore)
+        if not restore:
+            # Staying where we are: forget any pending return to rest
+            self._blend = None
+            self._last_commanded = None
+
+    def next_queued(self) -> bool:
+        """True if a behavior is waiting behind the current one"""
+        with self._condition:
+            return any(not handle.cancelled() for handle in self._queue)
+
+    def pending(self) -> int:
+        """Number of queued (not yet running) behaviors"""
+        with self._condition:
+            return len(self._queue)
+
+    def is_busy(self) -> bool:
+        """True while a behavior is running or queued"""
+        return self.current is not None or self._settling or self.pending() > 0
+
+    def wait_idle(self, timeout: Optional[float] = None) -> bool:
+        """Block until the queue is empty and nothing is running"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while self._queue or self.current is not None or self._settling or self._blend is not None:
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def _ensure_thread(self):
+        if self._thread is None or not self._thread.is_alive():
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="MotionExecutor", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        """Motion thread - run queued behaviors one at a time"""
+        while True:
+            with self._condition:
+                while not self._queue and self._blend is None and not self._stopping:
+                    self._condition.wait()
+                if self._stopping:
+                    return
+
+                if not self._queue:
+                    # Queue ran dry after a blended behavior: go back to rest
+                    blend, self._blend = self._blend, None
+                    self._settling = True
+                    handle = None
+                else:
+                    handle = self._queue.popleft()
+                    if not handle.set_running_or_notify_cancel():
+                        continue
+                    handle.blend_in, self._blend = self._blend, None
+                    handle.previous_commanded = self._last_commanded
+                    self.current = handle
+
+            if handle is None:
+                try:
+                    if self._return_to_rest is not None:
+                        self._return_to_rest(blend)
+                        self._last_commanded = dict(blend.rest_pose)
+                except Exception as e:
+                    print(f"Warning: return to rest failed: {e}")
+                with self._condition:
+                    self._settling = False
+                    self._condition.notify_all()
+                continue
+
+            try:
+                result = self._run_behavior(handle)
+            except BehaviorCancelled:
+                result = handle.cancelled_result()
+            except Exception as e:
+                result = {"success": False, "duration": 0.0, "error": str(e)}
+
+            with self._condition:
+                self.current = None
+                self._last_commanded = handle.end_commanded
+                if result.get("success"):
+                    self._blend = handle.blend_out
+                    result["blended"] = handle.blend_out is not None
+                elif handle.blend_in is not None and not result.get("cancelled"):
+                    # Failed mid-chain; still owe the return to the chain's rest pose
+                    self._blend = handle.blend_in
+                handle.set_result(result)
+                self._condition.notify_all()
+
+    def stop(self, timeout: float = 5.0):
+        """Cancel everything and stop the motion thread"""
+        with self._condition:
+            self._cancel_locked()
+            self._stopping = True
+            self._condition.notify_all()
+
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
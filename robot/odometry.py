@@ -0,0 +1,127 @@
+"""
+Base odometry for the LeKiwi three-wheel omni base
+Integrates wheel encoder ticks from telemetry snapshots into a base heading,
+and shapes wheel speed commands into acceleration-limited (trapezoidal)
+rotation profiles.
+"""
+
+import math
+from typing import Optional
+
+from .joints import WHEEL_JOINTS
+from .telemetry import JointSnapshot
+
+# LeKiwi geometry
+WHEEL_RADIUS = 0.05     # m
+BASE_RADIUS = 0.125     # m, base center to wheel contact
+TICKS_PER_REV = 4096
+
+# Measured on the robot: a 90 degree turn takes about 1.5 s at wheel speed 400
+CALIBRATION_SPEED = 400             # raw steps/s
+CALIBRATION_SECONDS_PER_90 = 1.5
+
+# Wheel encoder ticks per radian of base rotation (pure rotation, all wheels
+# equal), from the measurement above. The nominal geometry,
+# (BASE_RADIUS / WHEEL_RADIUS) * TICKS_PER_REV / 2pi, predicts about 4x as
+# many; until it is re-measured, this one rate drives odometry, braking and
+# open-loop timing alike so the three can't disagree.
+TICKS_PER_BASE_RADIAN = CALIBRATION_SPEED * CALIBRATION_SECONDS_PER_90 / (math.pi / 2)
+
+
+def rotation_seconds(radians: float, speed: float) -> float:
+    """Time to turn the base by radians at a constant wheel speed (raw steps/s)"""
+    return abs(radians) * TICKS_PER_BASE_RADIAN / abs(speed)
+
+
+def _tick_delta(now: int, previous: int) -> int:
+    """Encoder change with wrap-around at TICKS_PER_REV"""
+    half = TICKS_PER_REV // 2
+    return (now - previous + half) % TICKS_PER_REV - half
+
+
+class BaseOdometry:
+    """
+    Base heading from wheel encoders
+
+    For the three wheels at 120 degrees, the base yaw rate is
+    -(r / 3R) * (w1 + w2 + w3); negative wheel speeds turn the base left, so
+    a left (counter-clockwise) turn is a positive heading.
+    """
+
+    def __init__(self):
+        self.heading = 0.0  # radians, left positive
+        self._last_ticks: Optional[dict] = None
+
+    def reset(self, snapshot: JointSnapshot):
+        """Start integrating from this snapshot"""
+        self.heading = 0.0
+        self._last_ticks = {name: snapshot.raw_positions.get(name) for name in WHEEL_JOINTS}
+
+    def update(self, snapshot: JointSnapshot) -> float:
+        """
+        Integrate a new snapshot
+
+        Returns:
+            Heading in radians since reset()
+        """
+        if self._last_ticks is None:
+            self.reset(snapshot)
+            return self.heading
+
+        total = 0
+        counted = 0
+        for name in WHEEL_JOINTS:
+            now = snapshot.raw_positions.get(name)
+            previous = self._last_ticks.get(name)
+            if now is None or previous is None:
+                continue
+            total += _tick_delta(now, previous)
+            counted += 1
+            self._last_ticks[name] = now
+
+        if counted:
+            # -(r / 3R) * sum == -(r / R) * mean; the mean also covers a wheel that missed a read
+            mean_ticks = total / counted
+            self.heading -= mean_ticks / TICKS_PER_BASE_RADIAN
+
+        return self.heading
+
+
+class RotationProfile:
+    """Trapezoidal speed profile toward a heading target"""
+
+    def __init__(self, max_speed: float = 400.0, acceleration: float = 800.0,
+                 min_speed: float = 60.0):
+        """
+        Initialize rotation profile
+
+        Args:
+            max_speed: Cruise wheel speed (goal speed units)
+            acceleration: Wheel speed change per second
+            min_speed: Smallest speed that still moves the base
+        """
+        self.max_speed = max_speed
+        self.acceleration = acceleration
+        self.min_speed = min_speed
+
+    def next_speed(self, current: float, remaining: float, dt: float) -> float:
+        """
+        Wheel speed for the next control step
+
+        Args:
+            current: Speed commanded last step (positive turns left)
+            remaining: Heading still to go in radians (positive = left)
+            dt: Seconds since the last step
+
+        Returns:
+            Signed wheel speed (positive turns left)
+        """
+        remaining_ticks = abs(remaining) * TICKS_PER_BASE_RADIAN
+        direction = 1.0 if remaining > 0 else -1.0
+
+        # Fastest speed that can still stop within the remaining distance
+        stopping_speed = math.sqrt(2.0 * self.acceleration * remaining_ticks)
+        target = direction * max(self.min_speed, min(self.max_speed, stopping_speed))
+
+        step = self.acceleration * max(dt, 0.0)
+        return current + max(-step, min(step, target - current))
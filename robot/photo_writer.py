@@ -0,0 +1,159 @@
+"""
+Background photo and sidecar writer for Doda Terminal
+Gift photos and their JSON descriptions are queued here and written by a
+worker thread, so tool handlers return as soon as the work is queued.
+Every file is written atomically (temp file + rename) and the queue is
+flushed on interpreter exit.
+"""
+
+import atexit
+import json
+import queue
+import threading
+from pathlib import Path
+from typing import Optional
+
+import cv2
+import numpy as np
+
+from fileio import atomic_write
+
+# Optional faster JPEG encoders (libjpeg-turbo bindings)
+try:
+    import simplejpeg
+except ImportError:
+    simplejpeg = None
+
+try:
+    from turbojpeg import TurboJPEG
+    _turbojpeg = TurboJPEG()
+except Exception:
+    _turbojpeg = None
+
+
+# cv2.imwrite's default quality, so gift photos look the same whichever encoder is used
+JPEG_QUALITY = 95
+
+
+def encode_jpeg(frame: np.ndarray, quality: int = JPEG_QUALITY) -> bytes:
+    """
+    Encode a BGR frame to JPEG, using libjpeg-turbo bindings if installed
+
+    Args:
+        frame: OpenCV image (numpy array)
+        quality: JPEG quality (1-100)
+
+    Returns:
+        JPEG bytes
+    """
+    if simplejpeg is not None and frame.ndim == 3 and frame.shape[2] == 3:
+        return simplejpeg.encode_jpeg(np.ascontiguousarray(frame), quality=quality,
+                                      colorspace="BGR")
+
+    if _turbojpeg is not None:
+        return _turbojpeg.encode(frame, quality=quality)
+
+    success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
+    if not success:
+        raise ValueError("Failed to encode image to JPEG")
+    return buffer.tobytes()
+
+
+class PhotoWriter:
+    """Writes encoded photos and JSON sidecars on a background thread"""
+
+    def __init__(self, max_pending: int = 64, fsync: bool = False):
+        """
+        Initialize photo writer
+
+        Args:
+            max_pending: Queue size; submit() blocks only if the disk falls this far behind
+            fsync: fsync each file before renaming it into place
+        """
+        self.fsync = fsync
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._thread = threading.Thread(target=self._run, name="PhotoWriter", daemon=True)
+        self._closed = False
+
+        # Statistics
+        self.files_written = 0
+        self.bytes_written = 0
+        self.failures = 0
+
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit_bytes(self, path, data: bytes):
+        """Queue already-encoded file contents (e.g. JPEG bytes)"""
+        self._submit(Path(path), data)
+
+    def submit_json(self, path, data: dict, indent: Optional[int] = 2):
+        """Queue a JSON document (serialized on the worker thread)"""
+        self._submit(Path(path), (data, indent))
+
+    def _submit(self, path: Path, payload):
+        if self._closed:
+            raise RuntimeError("PhotoWriter is closed")
+        self._queue.put((path, payload))
+
+    def _run(self):
+        """Worker loop - write queued files until a None sentinel arrives"""
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+
+                path, payload = item
+                if isinstance(payload, tuple):
+                    data, indent = payload
+                    payload = json.dumps(data, indent=indent).encode('utf-8')
+
+                atomic_write(path, payload, fsync=self.fsync)
+                self.files_written += 1
+                self.bytes_written += len(payload)
+
+            except Exception as e:
+                self.failures += 1
+                print(f"Error: Failed to write {item[0] if item else '?'}: {e}")
+
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until everything queued so far is on disk"""
+        if self._thread.is_alive():
+            self._queue.join()
+
+    def close(self):
+        """Flush pending writes and stop the worker"""
+        if self._closed:
+            return
+
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def get_stats(self) -> dict:
+        """Get writer statistics"""
+        return {
+            "pending": self._queue.qsize(),
+            "files_written": self.files_written,
+            "bytes_written": self.bytes_written,
+            "failures": self.failures,
+            "encoder": "simplejpeg" if simplejpeg else "turbojpeg" if _turbojpeg else "opencv"
+        }
+
+
+_default_writer: Optional[PhotoWriter] = None
+_default_writer_lock = threading.Lock()
+
+
+def get_photo_writer() -> PhotoWriter:
+    """Get the process-wide photo writer (created on first use)"""
+    global _default_writer
+    with _default_writer_lock:
+        if _default_writer is None or _default_writer._closed:
+            _default_writer = PhotoWriter()
+        return _default_writer
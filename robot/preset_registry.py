@@ -0,0 +1,238 @@
+"""
+Preset registry for Doda Terminal
+Discovers robot/presets/*.py once, keeps the loaded modules, and only
+re-executes a preset file when its mtime changes.
+"""
+
+import importlib.util
+import inspect
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, List, Optional
+
+from .clock import preset_print, preset_time
+from .trajectory import Trajectory, UnsupportedPreset, record_preset
+
+
+class PresetError(Exception):
+    """Raised when a preset can't be found, loaded or called"""
+
+
+@dataclass
+class PresetEntry:
+    """A loaded preset module plus load/exec statistics"""
+    name: str
+    path: Path
+    module: ModuleType
+    mtime: float
+    signature: inspect.Signature
+    load_time: float
+    loads: int = 1
+    exec_count: int = 0
+    exec_total: float = 0.0
+    exec_last: Optional[float] = None
+    trajectories: Dict[str, Optional[Trajectory]] = field(default_factory=dict)  # kwargs key -> converted preset (None: imperative only)
+
+
+class PresetRegistry:
+    """Caches compiled preset modules and hot-reloads them on change"""
+
+    # Behavior names used by the agent -> preset module names
+    BEHAVIOR_ALIASES = {
+        "greeting": "dodo_greeting",
+        "head_bob": "dodo_head_bob",
+        "curious": "dodo_head_bob",  # Alias
+        "pleased": "dodo_pleased",  # Legacy - not used in game
+        "woo": "dodo_woo",  # Win condition only
+        "dismay": "dodo_dismay",
+        "dies": "dodo_dies",  # Lose condition
+        "idle": "dodo_idle"
+    }
+
+    def __init__(self, presets_dir: Optional[Path] = None):
+        """
+        Initialize preset registry
+
+        Args:
+            presets_dir: Directory of preset modules (defaults to robot/presets)
+        """
+        self.presets_dir = Path(presets_dir) if presets_dir else Path(__file__).parent / "presets"
+        self._entries: Dict[str, PresetEntry] = {}
+        self._errors: Dict[str, str] = {}
+        self._lock = threading.RLock()
+        self.discover()
+
+    def discover(self) -> List[str]:
+        """
+        Load every preset in the presets directory
+
+        Invalid presets are recorded in get_errors() instead of raising, so
+        one broken file doesn't take down the others.
+
+        Returns:
+            Names of the presets that loaded successfully
+        """
+        with self._lock:
+            for path in sorted(self.presets_dir.glob("*.py")):
+                if path.name.startswith("_"):
+                    continue
+                try:
+                    self._load(path.stem, path)
+                except PresetError as e:
+                    self._errors[path.stem] = str(e)
+
+            return sorted(self._entries)
+
+    def resolve(self, behavior_name: str) -> str:
+        """Map a behavior name (or alias) to its preset module name"""
+        return self.BEHAVIOR_ALIASES.get(behavior_name, behavior_name)
+
+    def get(self, behavior_name: str) -> PresetEntry:
+        """
+        Get a preset, reloading it if the file changed since it was loaded
+
+        Args:
+            behavior_name: Behavior name or preset module name
+
+        Returns:
+            PresetEntry with the loaded module
+
+        Raises:
+            PresetError: If the preset doesn't exist or fails to load
+        """
+        preset_name = self.resolve(behavior_name)
+        path = self.presets_dir / f"{preset_name}.py"
+
+        with self._lock:
+            entry = self._entries.get(preset_name)
+
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                self._entries.pop(preset_name, None)
+                raise PresetError(f"Preset '{preset_name}' not found in {self.presets_dir}")
+
+            if entry is None or entry.mtime != mtime:
+                entry = self._load(preset_name, path)
+
+            return entry
+
+    def _load(self, preset_name: str, path: Path) -> PresetEntry:
+        """Compile and execute a preset module, validating its execute() signature"""
+        start = time.perf_counter()
+        mtime = os.stat(path).st_mtime
+
+        spec = importlib.util.spec_from_file_location(f"preset_{preset_name}", path)
+        if spec is None or spec.loader is None:
+            raise PresetError(f"Failed to load preset '{preset_name}'")
+
+        module = importlib.util.module_from_spec(spec)
+        try:
+            spec.loader.exec_module(module)
+        except Exception as e:
+            raise PresetError(f"Failed to load preset '{preset_name}': {e}")
+
+        execute = getattr(module, 'execute', None)
+        if not callable(execute):
+            raise PresetError(f"Preset '{preset_name}' does not have an execute() function")
+
+        signature = inspect.signature(execute)
+        params = list(signature.parameters.values())
+        positional = (inspect.Parameter.POSITIONAL_ONLY, inspect.Parameter.POSITIONAL_OR_KEYWORD)
+        if not params or params[0].kind not in positional:
+            raise PresetError(f"Preset '{preset_name}' execute() must take the controller as its first argument")
+        for param in params[1:]:
+            if param.default is inspect.Parameter.empty and param.kind in positional:
+                raise PresetError(f"Preset '{preset_name}' execute() parameter '{param.name}' needs a default")
+
+        # Route the preset's time.sleep() through the thread's clock (see robot.clock)
+        if getattr(module, "time", None) is time:
+            module.time = preset_time
+        # ...and its print() through one that dry runs can mute per thread
+        module.print = preset_print
+
+        previous = self._entries.get(preset_name)
+        entry = PresetEntry(
+            name=preset_name,
+            path=path,
+            module=module,
+            mtime=mtime,
+            signature=signature,
+            load_time=time.perf_counter() - start,
+            loads=previous.loads + 1 if previous else 1
+        )
+        self._entries[preset_name] = entry
+        self._errors.pop(preset_name, None)
+        return entry
+
+    def bind(self, entry: PresetEntry, controller, kwargs: dict):
+        """
+        Check behavior kwargs against the preset's signature before moving
+
+        Raises:
+            PresetError: If the arguments don't fit execute()
+        """
+        try:
+            entry.signature.bind(controller, **kwargs)
+        except TypeError as e:
+            raise PresetError(f"Invalid arguments for preset '{entry.name}': {e}")
+
+    def trajectory(self, entry: PresetEntry, kwargs: dict) -> Optional[Trajectory]:
+        """
+        Keyframe form of a preset for the given parameters
+
+        Converted once per kwargs and cached on the entry, so a reload of
+        the file drops the stale conversions with it.
+
+        Returns:
+            Trajectory, or None if the preset can only play imperatively
+
+        Raises:
+            PresetError: If the preset fails during conversion
+        """
+        key = repr(sorted(kwargs.items()))
+        with self._lock:
+            if key not in entry.trajectories:
+                try:
+                    entry.trajectories[key] = record_preset(entry.name, entry.module.execute, **kwargs)
+                except UnsupportedPreset as e:
+                    print(f"Note: {e}; playing it imperatively")
+                    entry.trajectories[key] = None
+                except Exception as e:
+                    raise PresetError(f"Failed to convert preset '{entry.name}' to keyframes: {e}")
+            return entry.trajectories[key]
+
+    def record_execution(self, entry: PresetEntry, duration: float):
+        """Record how long a preset's execute() took"""
+        with self._lock:
+            entry.exec_count += 1
+            entry.exec_total += duration
+            entry.exec_last = duration
+
+    def names(self) -> List[str]:
+        """Names of the loaded presets"""
+        with self._lock:
+            return sorted(self._entries)
+
+    def get_errors(self) -> Dict[str, str]:
+        """Presets that failed to load, with the reason"""
+        with self._lock:
+            return dict(self._errors)
+
+    def get_timings(self) -> dict:
+        """Load and execution timings per preset (seconds)"""
+        with self._lock:
+            return {
+                name: {
+                    "load_time": round(entry.load_time, 6),
+                    "loads": entry.loads,
+                    "exec_count": entry.exec_count,
+                    "exec_last": round(entry.exec_last, 3) if entry.exec_last is not None else None,
+                    "exec_mean": round(entry.exec_total / entry.exec_count, 3) if entry.exec_count else None
+                }
+                for name, entry in self._entries.items()
+            }
@@ -1,6 +1,8 @@
 """
-Dodo Pleased - "Woo!" Celebration
-Doda expresses joy and approval by stretching toward the sky with beak open.
+Dodo Dies - Last Desperate Reach
+Doda reaches out one last time, gasping with her beak, and collapses.
+Used for the lose condition; the terminal disables torque afterwards so she
+goes limp where she fell.
 
 Body mapping:
 - shoulder_lift = knees
@@ -11,25 +13,26 @@ Body mapping:
 To run it:
 # Interactive mode
 python so101_control.py --port COM7 --calibration zetta-zero.json --interactive
-SO101> preset creative-movements/dodo_pleased
+SO101> preset creative-movements/dodo_dies
 
 # Command line
-python so101_control.py --port COM7 --calibration zetta-zero.json --preset creative-movements/dodo_pleased
+python so101_control.py --port COM7 --calibration zetta-zero.json --preset creative-movements/dodo_dies
 """
 import time
 
 
 def execute(controller):
     """
-    Perform a dodo bird "woo!" celebration.
+    Perform a dodo bird death sequence.
 
-    Doda stretches her body upward toward the sky, points her beak straight up,
-    and opens wide to say "woo!" - expressing approval and joy.
+    Doda stretches forward toward the human, gasps with weakening beak
+    movements while each reach falls shorter, then slumps down with her
+    head drooping. She does NOT return to the starting position.
 
     Args:
         controller: SO101Controller instance
     """
-    print("Dodo pleased - Woo!")
+    print("Dodo dies - Reaching out one last time...")
 
     # Capture starting position
     start_pos = controller.get_positions()
@@ -40,11 +43,15 @@ def execute(controller):
     idle_waist_flex = -25.0     # elbow_flex: body upright
     idle_head_forward = -40.0   # wrist_flex: beak points straight forward
 
-    # Motion parameters
-    stretch_height = 65.0       # shoulder_lift: reach maximum height (knees extend)
-    arm_vertical = -60.0        # elbow_flex: flex more to keep arm straight up
-    head_up = -65.0             # wrist_flex: point beak straight up to sky
-    head_roll_amount = 25.0     # wrist_roll: head shake left/right
+    # Behavior parameters
+    reach_knee_lift = 55.0      # shoulder_lift: stretch up and out toward the human
+    reach_waist_lean = -45.0    # elbow_flex: lean the body forward
+    reach_head_forward = -60.0  # wrist_flex: neck stretched out
+    gasp_open = 60.0            # gripper: beak open for a gasp
+    reach_fade = 0.6            # Each reach only gets this far compared to the last
+    collapse_head_down = 50.0   # wrist_flex: head hangs down
+    collapse_head_tilt = 20.0   # wrist_roll: head lolls to the side
+    collapse_beak = 25.0        # gripper: beak left slightly open
 
     # Step 1: Move to idle/alert stance
     print("  1. Moving to idle stance...")
@@ -53,43 +60,43 @@ def execute(controller):
         "elbow_flex": start_pos["elbow_flex"] + idle_waist_flex,
         "wrist_flex": start_pos["wrist_flex"] + idle_head_forward,
     })
-    time.sleep(2.0)
+    time.sleep(1.5)
 
-    # Step 2: Stretch upward to the sky
-    print("  2. Stretching toward the sky...")
+    # Step 2: Desperate reaches, each weaker than the last
+    print("  2. Reaching out desperately...")
+    strength = 1.0
+    for i in range(3):
+        controller.set_positions({
+            "shoulder_lift": start_pos["shoulder_lift"] + idle_knee_lift
+                + (reach_knee_lift - idle_knee_lift) * strength,
+            "elbow_flex": start_pos["elbow_flex"] + idle_waist_flex
+                + (reach_waist_lean - idle_waist_flex) * strength,
+            "wrist_flex": start_pos["wrist_flex"] + idle_head_forward
+                + (reach_head_forward - idle_head_forward) * strength,
+        })
+        controller.set_gripper(gasp_open * strength)  # Gasp
+        time.sleep(0.9)
+
+        # Sag back toward the stance, beak closing
+        controller.set_positions({
+            "shoulder_lift": start_pos["shoulder_lift"] + idle_knee_lift * strength,
+            "elbow_flex": start_pos["elbow_flex"] + idle_waist_flex,
+            "wrist_flex": start_pos["wrist_flex"] + idle_head_forward * strength,
+        })
+        controller.set_gripper(0.0)
+        time.sleep(0.7)
+
+        strength *= reach_fade
+
+    # Step 3: Collapse - knees give out, head droops and lolls
+    print("  3. Collapsing...")
     controller.set_positions({
-        "shoulder_lift": start_pos["shoulder_lift"] + stretch_height,
-        "elbow_flex": start_pos["elbow_flex"] + arm_vertical,
-        "wrist_flex": start_pos["wrist_flex"] + head_up,
+        "shoulder_lift": start_pos["shoulder_lift"],
+        "elbow_flex": start_pos["elbow_flex"],
+        "wrist_flex": start_pos["wrist_flex"] + collapse_head_down,
+        "wrist_roll": start_pos["wrist_roll"] + collapse_head_tilt,
     })
-    time.sleep(2.0)
+    controller.set_gripper(collapse_beak)
+    time.sleep(2.5)
 
-    # Step 3: Rapid beak opening/closing - "Woo! Woo! Woo!"
-    print("  3. Woo! Woo! Woo!")
-    for i in range(3):
-        # Open beak
-        controller.set_gripper(100.0)
-        time.sleep(0.3)
-        # Close beak
-        controller.set_gripper(0.0)
-        time.sleep(0.3)
-
-    # Step 4: Head roll left and right (excited celebration)
-    print("  4. Excited head rolls...")
-    for i in range(2):
-        # Roll left
-        controller.set_single_joint("wrist_roll", start_pos["wrist_roll"] - head_roll_amount)
-        time.sleep(0.4)
-        # Roll right
-        controller.set_single_joint("wrist_roll", start_pos["wrist_roll"] + head_roll_amount)
-        time.sleep(0.4)
-    # Return head roll to center
-    controller.set_single_joint("wrist_roll", start_pos["wrist_roll"])
-    time.sleep(0.3)
-
-    # Step 5: Return to starting position
-    print("  5. Returning to start position...")
-    controller.set_positions(start_pos)
-    time.sleep(2.0)
-
-    print("✓ Dodo pleased complete!\n")
+    print("✓ Dodo dies complete.\n")
@@ -0,0 +1,429 @@
+"""
+Joint telemetry recorder for Doda Terminal
+Logs every telemetry snapshot - measured and commanded positions of all nine
+motors, plus the behavior and step that was running - into a fixed-size
+NumPy memmap used as a ring buffer. Rows are preallocated on disk, so
+recording costs no per-sample allocations and the log never grows past its
+capacity; the oldest rows are overwritten.
+
+Commands reach the recorder through CommandTap (arm positions and per-motor
+wheel velocities) and FeetechBus.command_listener (bulk wheel velocities).
+Steps are marked explicitly with mark_step(): once per keyframe of a
+trajectory, or per group of commands between two sleeps of a preset.
+
+Rows come from the TelemetryLoop when it runs. Without sync reads (or in the
+simulator) a PositionSampler polls the arm pose at a fixed rate instead.
+
+Usage:
+    python -m robot.recorder [recording.ring] [--csv out.csv] [--npz out.npz]
+"""
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .clock import DEFAULT_CLOCK
+from .joints import ALL_JOINTS, ARM_JOINTS, MOTOR_IDS
+
+DEFAULT_RECORDING_PATH = Path(__file__).parent / "recordings" / "telemetry.ring"
+DEFAULT_CAPACITY = 65536      # ~36 minutes at 30 Hz, ~9 MB on disk
+FLUSH_EVERY = 256             # Rows between memmap flushes
+
+_JOINT_COUNT = len(ALL_JOINTS)
+_INDEX = {name: i for i, name in enumerate(ALL_JOINTS)}
+_MOTOR_INDEX = {MOTOR_IDS[name]: i for i, name in enumerate(ALL_JOINTS)}
+
+# One row per telemetry snapshot. Arm joints: normalized positions; wheels:
+# commanded goal velocity and measured encoder ticks. NaN = unknown.
+RECORD_DTYPE = np.dtype([
+    ("seq", "<i8"),                       # 0 = empty slot
+    ("t", "<f8"),                         # Monotonic time of the read
+    ("command_t", "<f8"),                 # Monotonic time of the step's first command
+    ("behavior", "<i2"),                  # Index into the behavior name table, -1 = none
+    ("step", "<i4"),                      # Command step within the behavior
+    ("commanded", "<f4", (_JOINT_COUNT,)),
+    ("measured", "<f4", (_JOINT_COUNT,)),
+    ("velocity", "<f4", (_JOINT_COUNT,))  # Steps per second
+])
+
+
+def _meta_path(path: Path) -> Path:
+    return path.with_suffix(path.suffix + ".json")
+
+
+class TelemetryRecorder:
+    """Fixed-size on-disk ring buffer of commanded vs. measured joint positions"""
+
+    def __init__(self, path=None, capacity: int = DEFAULT_CAPACITY, clock=None):
+        """
+        Initialize recorder (reopens an existing recording of the same capacity)
+
+        Args:
+            path: Ring buffer file (defaults to robot/recordings/telemetry.ring)
+            capacity: Rows kept before the oldest are overwritten
+            clock: Time source for step times (the robot's clock; VirtualClock in simulation)
+        """
+        self.path = Path(path) if path else DEFAULT_RECORDING_PATH
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = capacity
+        self.clock = clock or DEFAULT_CLOCK
+
+        meta = self._load_meta()
+        size = capacity * RECORD_DTYPE.itemsize
+        reuse = self.path.exists() and self.path.stat().st_size == size and meta.get("capacity") == capacity
+        self._buffer = np.memmap(self.path, dtype=RECORD_DTYPE, mode="r+" if reuse else "w+", shape=(capacity,))
+
+        self.behaviors: List[str] = meta.get("behaviors", []) if reuse else []
+        self._seq = int(self._buffer["seq"].max()) if reuse else 0
+        self._save_meta()
+
+        self._commanded = np.full(_JOINT_COUNT, np.nan, dtype=np.float32)
+        self._behavior = -1
+        self._step = 0
+        self._command_t = 0.0
+        self._lock = threading.Lock()
+
+    def _load_meta(self) -> dict:
+        try:
+            with open(_meta_path(self.path), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_meta(self):
+        with open(_meta_path(self.path), 'w') as f:
+            json.dump({"capacity": self.capacity, "joints": ALL_JOINTS, "behaviors": self.behaviors}, f)
+
+    # Command side
+
+    def begin_behavior(self, name: str):
+        """Mark the start of a behavior; its steps are numbered from 1"""
+        with self._lock:
+            if name not in self.behaviors:
+                self.behaviors.append(name)
+                self._save_meta()
+            self._behavior = self.behaviors.index(name)
+            self._step = 0
+
+    def end_behavior(self):
+        with self._lock:
+            self._behavior = -1
+            self._step = 0
+
+    def mark_step(self):
+        """Start the next step of the running behavior (a keyframe is about to be commanded)"""
+        with self._lock:
+            self._step += 1
+            self._command_t = self.clock.monotonic()
+
+    def note_positions(self, positions: Dict[str, float]):
+        """Record normalized arm targets that were just commanded"""
+        with self._lock:
+            for joint, value in positions.items():
+                index = _INDEX.get(joint)
+                if index is not None:
+                    self._commanded[index] = value
+
+    def note_velocities(self, velocities: Dict[int, float]):
+        """Record wheel goal velocities (motor ID -> steps per second)"""
+        with self._lock:
+            for motor_id, velocity in velocities.items():
+                index = _MOTOR_INDEX.get(motor_id)
+                if index is not None:
+                    self._commanded[index] = velocity
+
+    # Measurement side
+
+    def _next_row(self, t: float):
+        """Claim the next ring slot and fill in the command side; caller holds the lock"""
+        self._seq += 1
+        row = self._buffer[(self._seq - 1) % self.capacity]
+        row["seq"] = self._seq
+        row["t"] = t
+        row["command_t"] = self._command_t
+        row["behavior"] = self._behavior
+        row["step"] = self._step
+        row["commanded"] = self._commanded
+        return row
+
+    def _row_written(self):
+        if self._seq % FLUSH_EVERY == 0:
+            self._buffer.flush()
+
+    def record(self, snapshot):
+        """Write one row from a JointSnapshot (TelemetryLoop listener)"""
+        with self._lock:
+            row = self._next_row(snapshot.monotonic)
+            measured = row["measured"]
+            velocity = row["velocity"]
+            for index, name in enumerate(ALL_JOINTS):
+                value = snapshot.positions.get(name) if name in ARM_JOINTS else snapshot.raw_positions.get(name)
+                measured[index] = np.nan if value is None else value
+                speed = snapshot.velocities.get(name)
+                velocity[index] = np.nan if speed is None else speed
+            self._row_written()
+
+    def record_positions(self, positions: Dict[str, float], t: Optional[float] = None):
+        """
+        Write one row from a plain arm pose (PositionSampler)
+
+        Args:
+            positions: Normalized arm positions
+            t: Monotonic time of the read (defaults to now on the recorder's clock)
+        """
+        with self._lock:
+            row = self._next_row(self.clock.monotonic() if t is None else t)
+            measured = row["measured"]
+            measured[:] = np.nan
+            row["velocity"] = np.nan
+            for joint, value in positions.items():
+                index = _INDEX.get(joint)
+                if index is not None and value is not None:
+                    measured[index] = value
+            self._row_written()
+
+    def flush(self):
+        with self._lock:
+            self._buffer.flush()
+
+    # Reading back
+
+    def records(self) -> np.ndarray:
+        """Copy of the recorded rows, oldest first"""
+        with self._lock:
+            return _ordered(np.array(self._buffer))
+
+    def export_csv(self, path) -> int:
+        """Write the recording as CSV; returns the number of rows"""
+        return export_csv(self.records(), self.behaviors, path)
+
+    def export_npz(self, path) -> int:
+        """Write the recording as a compressed NPZ; returns the number of rows"""
+        return export_npz(self.records(), self.behaviors, path)
+
+    def get_stats(self) -> dict:
+        return {
+            "path": str(self.path),
+            "capacity": self.capacity,
+            "rows": min(self._seq, self.capacity),
+            "total_recorded": self._seq,
+            "behaviors": len(self.behaviors)
+        }
+
+
+class PositionSampler:
+    """Polls the arm pose into a recorder at a fixed rate (when telemetry isn't running)"""
+
+    def __init__(self, recorder: TelemetryRecorder, read_positions: Callable[[], Dict[str, float]],
+                 rate_hz: float = 30.0, clock=None):
+        """
+        Initialize sampler
+
+        Args:
+            recorder: Recorder to write rows to
+            read_positions: Returns the normalized arm pose
+            rate_hz: Samples per second
+            clock: Time source; a VirtualClock is sampled in simulated time
+                (via its tickers), anything else by a background thread
+        """
+        self.recorder = recorder
+        self.read_positions = read_positions
+        self.rate_hz = rate_hz
+        self.clock = clock or DEFAULT_CLOCK
+        self.failures = 0
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        if hasattr(self.clock, "add_ticker"):
+            self.clock.add_ticker(1.0 / self.rate_hz, self.sample)
+        else:
+            self._thread = threading.Thread(target=self._run, name="PositionSampler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._running = False
+        if hasattr(self.clock, "remove_ticker"):
+            self.clock.remove_ticker(self.sample)
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def sample(self):
+        """Read the pose once and record it"""
+        t = self.clock.monotonic()
+        try:
+            positions = self.read_positions()
+        except Exception:
+            self.failures += 1
+            return
+        if positions:
+            self.recorder.record_positions(positions, t)
+
+    def _run(self):
+        period = 1.0 / self.rate_hz
+        next_sample = time.monotonic()
+        while self._running:
+            self.sample()
+            next_sample += period
+            delay = next_sample - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                next_sample = time.monotonic()  # Fell behind (slow bus); don't burst
+
+
+class CommandTap:
+    """Forwards to a controller, telling the recorder about every command"""
+
+    def __init__(self, controller, recorder: TelemetryRecorder):
+        self._controller = controller
+        self._recorder = recorder
+
+    def set_positions(self, positions: Dict[str, float]):
+        result = self._controller.set_positions(positions)
+        self._recorder.note_positions(positions)
+        return result
+
+    def set_single_joint(self, joint: str, value: float):
+        result = self._controller.set_single_joint(joint, value)
+        self._recorder.note_positions({joint: value})
+        return result
+
+    def set_gripper(self, value: float):
+        result = self._controller.set_gripper(value)
+        self._recorder.note_positions({"gripper": value})
+        return result
+
+    def set_goal_velocity(self, motor_id: int, velocity: float):
+        result = self._controller.set_goal_velocity(motor_id, velocity)
+        self._recorder.note_velocities({motor_id: velocity})
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._controller, name)
+
+
+def _ordered(rows: np.ndarray) -> np.ndarray:
+    rows = rows[rows["seq"] > 0]
+    return rows[np.argsort(rows["seq"], kind="stable")]
+
+
+def load_recording(path=None):
+    """
+    Read a recording from disk without attaching to it
+
+    Returns:
+        (rows oldest first, behavior name table)
+    """
+    path = Path(path) if path else DEFAULT_RECORDING_PATH
+    with open(_meta_path(path), 'r') as f:
+        meta = json.load(f)
+    rows = np.fromfile(path, dtype=RECORD_DTYPE, count=meta["capacity"])
+    return _ordered(rows), meta.get("behaviors", [])
+
+
+def export_csv(rows: np.ndarray, behaviors: List[str], path) -> int:
+    """One line per row: seq, t, behavior, step, then commanded/measured/velocity per joint"""
+    header = ["seq", "t", "command_t", "behavior", "step"]
+    for prefix in ("commanded", "measured", "velocity"):
+        header += [f"{prefix}_{name}" for name in ALL_JOINTS]
+
+    with open(path, 'w') as f:
+        f.write(",".join(header) + "\n")
+        for row in rows:
+            name = behaviors[row["behavior"]] if 0 <= row["behavior"] < len(behaviors) else ""
+            values = [str(int(row["seq"])), f"{row['t']:.4f}", f"{row['command_t']:.4f}", name, str(int(row["step"]))]
+            for prefix in ("commanded", "measured", "velocity"):
+                values += ["" if np.isnan(v) else f"{v:.3f}" for v in row[prefix]]
+            f.write(",".join(values) + "\n")
+    return len(rows)
+
+
+def export_npz(rows: np.ndarray, behaviors: List[str], path) -> int:
+    """Column arrays plus the joint and behavior name tables"""
+    np.savez_compressed(
+        path,
+        joints=np.array(ALL_JOINTS),
+        behaviors=np.array(behaviors),
+        **{field: rows[field] for field in RECORD_DTYPE.names}
+    )
+    return len(rows)
+
+
+def analyze_steps(rows: np.ndarray, behaviors: List[str], tolerance: float = 2.0) -> List[dict]:
+    """
+    Tracking error and settle time for each behavior step in a recording
+
+    Args:
+        rows: Recorded rows, oldest first
+        behaviors: Behavior name table
+        tolerance: Arm error (normalized units) that counts as settled
+
+    Returns:
+        One dict per step: behavior, step, samples, mean_error, max_error,
+        final_error (largest arm error per sample, averaged/maxed/last) and
+        settle_time (seconds from the command until every arm joint stays
+        within tolerance, None if it never did)
+    """
+    arm = [_INDEX[name] for name in ARM_JOINTS]
+    rows = rows[(rows["behavior"] >= 0) & (rows["step"] > 0)]
+    if len(rows) == 0:
+        return []
+
+    # Largest arm joint error per sample (joints never commanded don't count)
+    error = np.abs(rows["commanded"][:, arm] - rows["measured"][:, arm])
+    error = np.where(np.isnan(error), 0.0, error).max(axis=1)
+
+    # A step is a run of rows with the same behavior, step and command time
+    keys = np.stack([rows["behavior"], rows["step"], rows["command_t"]], axis=1)
+    boundaries = np.flatnonzero(np.any(keys[1:] != keys[:-1], axis=1)) + 1
+
+    steps = []
+    for group in np.split(np.arange(len(rows)), boundaries):
+        first = rows[group[0]]
+        step_error = error[group]
+        outside = np.flatnonzero(step_error > tolerance)
+        if len(outside) == 0:
+            settle = max(0.0, float(rows["t"][group[0]] - first["command_t"]))
+        elif outside[-1] == len(group) - 1:
+            settle = None
+        else:
+            settle = float(rows["t"][group[outside[-1] + 1]] - first["command_t"])
+
+        index = int(first["behavior"])
+        steps.append({
+            "behavior": behaviors[index] if index < len(behaviors) else str(index),
+            "step": int(first["step"]),
+            "samples": len(group),
+            "mean_error": round(float(step_error.mean()), 3),
+            "max_error": round(float(step_error.max()), 3),
+            "final_error": round(float(step_error[-1]), 3),
+            "settle_time": round(settle, 3) if settle is not None else None
+        })
+    return steps
+
+
+if __name__ == "__main__":
+    args = sys.argv[1:]
+    recording = args.pop(0) if args and not args[0].startswith("--") else None
+    data, names = load_recording(recording)
+
+    for flag, exporter in (("--csv", export_csv), ("--npz", export_npz)):
+        if flag in args:
+            out = args[args.index(flag) + 1]
+            print(f"Wrote {exporter(data, names, out)} rows to {out}")
+
+    for step in analyze_steps(data, names):
+        settle = f"{step['settle_time']:.2f}s" if step["settle_time"] is not None else "never"
+        print(f"{step['behavior']:12s} step {step['step']:3d}  {step['samples']:4d} samples  "
+              f"error mean {step['mean_error']:6.2f} max {step['max_error']:6.2f} "
+              f"final {step['final_error']:6.2f}  settled {settle}")
@@ -0,0 +1,207 @@
+"""
+Simulated SO-101 / LeKiwi for Doda Terminal
+SimulatedSO101Controller has the same surface as so101_control.SO101Controller
+and models each joint as a first-order lag toward its goal with a velocity
+cap. It runs on a VirtualClock: sleeps advance simulated time instantly, so a
+preset that takes seconds on the robot finishes in milliseconds.
+
+Use RobotController(simulated=True) for tests and benchmarks.
+"""
+
+import math
+import threading
+from typing import Callable, Dict, List, Optional
+
+from .calibration import CalibrationTable, MotorCalibration, velocity_limits
+from .joints import ARM_JOINTS, MOTOR_IDS, WHEEL_JOINTS
+
+
+class VirtualClock:
+    """Clock where sleep() advances simulated time instead of waiting"""
+
+    def __init__(self, start: float = 0.0):
+        self._now = start
+        self._lock = threading.Lock()
+        self._tickers: List[list] = []   # [period, next tick, callback]
+
+    def add_ticker(self, period: float, callback: Callable[[], None]):
+        """
+        Call callback every period seconds of simulated time
+
+        Runs on whichever thread's sleep() passes the tick, with the clock
+        stopped at the tick time (what a fixed-rate sampler would see).
+        """
+        with self._lock:
+            self._tickers.append([period, self._now + period, callback])
+
+    def remove_ticker(self, callback: Callable[[], None]):
+        with self._lock:
+            self._tickers = [ticker for ticker in self._tickers if ticker[2] is not callback]
+
+    def sleep(self, seconds: float):
+        if seconds <= 0:
+            return
+        with self._lock:
+            if not self._tickers:
+                self._now += float(seconds)
+                return
+            target = self._now + float(seconds)
+
+        while True:
+            with self._lock:
+                due = [ticker for ticker in self._tickers if ticker[1] <= target]
+                if not due:
+                    self._now = max(self._now, target)
+                    return
+                ticker = min(due, key=lambda t: t[1])
+                self._now = max(self._now, ticker[1])
+                ticker[1] += ticker[0]
+            ticker[2]()
+
+    def time(self) -> float:
+        return self._now
+
+    def monotonic(self) -> float:
+        return self._now
+
+
+class SimulatedSO101Controller:
+    """Drop-in stand-in for SO101Controller with first-order joint dynamics"""
+
+    TIME_CONSTANT = 0.12        # Seconds for a joint to cover 63% of a step
+    DEFAULT_MAX_VELOCITY = 150.0  # Normalized units per second without calibration
+    WHEEL_TIME_CONSTANT = 0.2   # Wheel speed response
+    STEP = 0.005                # Integration step in seconds
+
+    def __init__(self, clock: Optional[VirtualClock] = None,
+                 calibration: Optional[Dict[int, MotorCalibration]] = None,
+                 start_pose: Optional[Dict[str, float]] = None):
+        """
+        Initialize simulated controller
+
+        Args:
+            clock: Simulation time source (a new VirtualClock by default)
+            calibration: Motor ID -> calibration, for per-joint velocity caps and
+                clamping goals to the calibrated range like the servos do
+            start_pose: Initial normalized arm pose (all zeros by default)
+        """
+        self.clock = clock or VirtualClock()
+        self.max_velocity = velocity_limits(calibration) if calibration else {}
+        self.table = CalibrationTable(calibration) if calibration else None
+
+        self.positions = {name: 0.0 for name in ARM_JOINTS}
+        if start_pose:
+            self.positions.update(start_pose)
+        self.goals = dict(self.positions)
+        self.torque = {motor_id: False for motor_id in MOTOR_IDS.values()}
+
+        self.wheel_velocity = {name: 0.0 for name in WHEEL_JOINTS}   # steps per second
+        self.wheel_goal = dict(self.wheel_velocity)
+        self.wheel_ticks = {name: 0.0 for name in WHEEL_JOINTS}
+
+        self.connected = False
+        self.commands = 0
+        self._last_update = self.clock.monotonic()
+        self._lock = threading.RLock()
+
+    # Connection
+
+    def connect(self, enable_torque: bool = True, load_calibration: bool = True) -> bool:
+        with self._lock:
+            self.connected = True
+            self._last_update = self.clock.monotonic()
+            if enable_torque:
+                self.torque = {motor_id: True for motor_id in self.torque}
+        return True
+
+    def disconnect(self):
+        with self._lock:
+            self.connected = False
+            self.torque = {motor_id: False for motor_id in self.torque}
+
+    # Dynamics
+
+    def _advance(self):
+        """Integrate the joints up to the clock's current time"""
+        now = self.clock.monotonic()
+        elapsed = now - self._last_update
+        self._last_update = now
+
+        while elapsed > 1e-9:
+            dt = min(self.STEP, elapsed)
+            elapsed -= dt
+            self._step(dt)
+
+    def _step(self, dt: float):
+        blend = 1.0 - math.exp(-dt / self.TIME_CONSTANT)
+        for name in ARM_JOINTS:
+            if not self.torque[MOTOR_IDS[name]]:
+                continue
+            error = self.goals[name] - self.positions[name]
+            cap = self.max_velocity.get(name, self.DEFAULT_MAX_VELOCITY) * dt
+            self.positions[name] += max(-cap, min(cap, error * blend))
+
+        wheel_blend = 1.0 - math.exp(-dt / self.WHEEL_TIME_CONSTANT)
+        for name in WHEEL_JOINTS:
+            goal = self.wheel_goal[name] if self.torque[MOTOR_IDS[name]] else 0.0
+            self.wheel_velocity[name] += (goal - self.wheel_velocity[name]) * wheel_blend
+            self.wheel_ticks[name] += self.wheel_velocity[name] * dt
+
+    # SO101Controller surface
+
+    def get_positions(self) -> Dict[str, float]:
+        with self._lock:
+            self._advance()
+            return dict(self.positions)
+
+    def set_positions(self, positions: Dict[str, float]):
+        with self._lock:
+            self._advance()
+            for name, value in positions.items():
+                if name not in self.goals:
+                    raise ValueError(f"Unknown joint: {name}")
+                self.goals[name] = float(value)
+
+            if self.table is not None:
+                joints = [name for name in positions if name in self.table.index]
+                clamped = self.table.clamp([self.goals[name] for name in joints], self.table.rows(joints))
+                self.goals.update(zip(joints, clamped.tolist()))
+            self.commands += 1
+
+    def set_single_joint(self, joint: str, value: float):
+        self.set_positions({joint: value})
+
+    def set_gripper(self, value: float):
+        self.set_positions({"gripper": value})
+
+    def set_goal_velocity(self, motor_id: int, velocity: float):
+        with self._lock:
+            self._advance()
+            self.wheel_goal[WHEEL_JOINTS[motor_id - MOTOR_IDS[WHEEL_JOINTS[0]]]] = float(velocity)
+            self.commands += 1
+
+    def enable_torque(self, motor_id: int):
+        with self._lock:
+            self._advance()
+            self.torque[motor_id] = True
+
+    def disable_torque(self, motor_id: int):
+        with self._lock:
+            self._advance()
+            self.torque[motor_id] = False
+            # A limp joint stops chasing its goal
+            if motor_id <= len(ARM_JOINTS):
+                name = ARM_JOINTS[motor_id - 1]
+                self.goals[name] = self.positions[name]
+
+    def get_normalized_position(self, motor_id: int) -> float:
+        """Position of an arm motor as -1.0..1.0 (0..1 for the beak)"""
+        with self._lock:
+            self._advance()
+            return self.positions[ARM_JOINTS[motor_id - 1]] / 100.0
+
+    def get_wheel_ticks(self) -> Dict[str, int]:
+        """Wrapped wheel encoder readings (0-4095)"""
+        with self._lock:
+            self._advance()
+            return {name: int(ticks) % 4096 for name, ticks in self.wheel_ticks.items()}
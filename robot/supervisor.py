@@ -0,0 +1,238 @@
+"""
+Connection supervisor for Doda Terminal
+Owns the robot link state. A background thread opens the link, pings it
+periodically, marks it degraded after a failed ping and disconnected after
+several in a row, and reconnects with exponential backoff. Callers only
+look at the state, so they never wait for a reconnect on the hot path.
+"""
+
+import threading
+import time
+from enum import Enum
+from typing import Callable, Optional
+
+
+class ConnectionState(Enum):
+    CONNECTED = "connected"        # Link up, last ping fine
+    DEGRADED = "degraded"          # Link up, recent pings failing
+    DISCONNECTED = "disconnected"  # No link; reconnecting in the background
+
+
+class ConnectionSupervisor:
+    """Keeps the robot link alive with pings and background reconnects"""
+
+    def __init__(self, open_link: Callable[[], bool], ping: Callable[[], bool],
+                 close_link: Callable[[], None], ping_interval: float = 1.0,
+                 max_ping_failures: int = 3, backoff_initial: float = 0.5,
+                 backoff_max: float = 10.0):
+        """
+        Initialize connection supervisor
+
+        Args:
+            open_link: Opens the link; returns True on success
+            ping: Cheap health check; returns True if the link answers
+            close_link: Tears down a dead link (must not raise)
+            ping_interval: Seconds between pings while connected
+            max_ping_failures: Consecutive failed pings before the link counts as lost
+            backoff_initial: First reconnect delay in seconds
+            backoff_max: Longest reconnect delay in seconds
+        """
+        self.open_link = open_link
+        self.ping = ping
+        self.close_link = close_link
+        self.ping_interval = ping_interval
+        self.max_ping_failures = max_ping_failures
+        self.backoff_initial = backoff_initial
+        self.backoff_max = backoff_max
+
+        self.state = ConnectionState.DISCONNECTED
+        self.last_error: Optional[str] = None
+        self.connect_attempts = 0
+        self.reconnects = 0
+        self.ping_failures = 0
+        self.last_ping_latency: Optional[float] = None
+        self.attempting = False
+
+        self._backoff = backoff_initial
+        self._next_attempt = 0.0
+        self._ever_connected = False
+        self._attempts_since_start = 0
+        self._failing = False   # Connect attempts failing since the last success (reported once)
+        self._condition = threading.Condition()
+        self._wake = threading.Event()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def is_up(self) -> bool:
+        """True while the link is usable (connected or degraded)"""
+        return self.state != ConnectionState.DISCONNECTED
+
+    @property
+    def running(self) -> bool:
+        return self._running
+
+    def start(self):
+        """Start supervising (first connect happens in the background)"""
+        if self._running:
+            return
+        self._running = True
+        self._attempts_since_start = 0
+        self._next_attempt = 0.0
+        self._backoff = self.backoff_initial
+        self._thread = threading.Thread(target=self._run, name="ConnectionSupervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Stop supervising and mark the link disconnected; the caller closes the link"""
+        self._running = False
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+        self._thread = None
+
+        with self._condition:
+            self._set_state(ConnectionState.DISCONNECTED)
+
+    def report_failure(self, error: str):
+        """
+        Called by users of the link when a command fails
+
+        Counts like a failed ping and checks the link right away, instead of
+        waiting for the next scheduled ping to notice.
+        """
+        with self._condition:
+            if self.state == ConnectionState.DISCONNECTED:
+                return
+            self.ping_failures += 1
+            self.last_error = error
+            self._set_state(ConnectionState.DEGRADED)
+        self._wake.set()
+
+    def wait_first_attempt(self, timeout: float) -> bool:
+        """
+        Wait for the outcome of the first connect attempt since start()
+
+        Returns immediately once that attempt has finished, so later calls
+        on a lost link fail fast instead of waiting for the reconnect.
+
+        Returns:
+            True if the link is up
+        """
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while not self.is_up and self._attempts_since_start == 0:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._condition.wait(remaining)
+            return self.is_up
+
+    def _set_state(self, state: ConnectionState):
+        """Change state (caller holds _condition)"""
+        if state != self.state:
+            self.state = state
+            self._condition.notify_all()
+
+    def _run(self):
+        """Supervisor thread"""
+        while self._running:
+            if self.state == ConnectionState.DISCONNECTED:
+                delay = self._next_attempt - time.monotonic()
+                if delay <= 0:
+                    self._attempt_connect()
+                    continue
+            else:
+                self._check_link()
+                delay = self.ping_interval
+
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _attempt_connect(self):
+        """One connect attempt; schedules the next one with backoff on failure"""
+        self.attempting = True
+        self.connect_attempts += 1
+        try:
+            ok = self.open_link()
+            error = None if ok else "Failed to connect to robot"
+        except Exception as e:
+            ok, error = False, str(e)
+        finally:
+            self.attempting = False
+
+        # Report changes only; the backoff retries forever and the error is in last_error
+        if not ok and not self._failing:
+            print(f"Robot connection failed ({error}); retrying in the background")
+        elif ok and self._failing:
+            print("Robot connected")
+        self._failing = not ok
+
+        with self._condition:
+            self._attempts_since_start += 1
+            if ok:
+                if self._ever_connected:
+                    self.reconnects += 1
+                self._ever_connected = True
+                self._backoff = self.backoff_initial
+                self.ping_failures = 0
+                self.last_error = None
+                self._set_state(ConnectionState.CONNECTED)
+            else:
+                self.last_error = error
+                self._next_attempt = time.monotonic() + self._backoff
+                self._backoff = min(self._backoff * 2, self.backoff_max)
+            # Wake anyone waiting for the first attempt
+            self._condition.notify_all()
+
+    def _check_link(self):
+        """Ping the link and move between connected/degraded/disconnected"""
+        start = time.monotonic()
+        try:
+            ok = self.ping()
+            error = None if ok else "Robot did not answer ping"
+        except Exception as e:
+            ok, error = False, str(e)
+        self.last_ping_latency = time.monotonic() - start
+
+        lost = False
+        with self._condition:
+            if ok:
+                self.ping_failures = 0
+                self._set_state(ConnectionState.CONNECTED)
+                return
+
+            self.ping_failures += 1
+            self.last_error = error
+            if self.ping_failures >= self.max_ping_failures:
+                lost = True
+                self._set_state(ConnectionState.DISCONNECTED)
+                self._next_attempt = time.monotonic() + self._backoff
+            else:
+                self._set_state(ConnectionState.DEGRADED)
+
+        if lost:
+            print(f"Robot link lost ({error}); reconnecting in the background")
+            self.close_link()
+
+    def describe(self) -> str:
+        """One-line explanation of the current state, for error messages"""
+        if self.state == ConnectionState.CONNECTED:
+            return "Robot connected"
+        if self.state == ConnectionState.DEGRADED:
+            return f"Robot link degraded: {self.last_error}"
+        if self.attempting:
+            return "Robot disconnected (connecting now)"
+        retry = max(0.0, self._next_attempt - time.monotonic())
+        reason = f": {self.last_error}" if self.last_error else ""
+        return f"Robot disconnected (next reconnect attempt in {retry:.1f}s){reason}"
+
+    def get_status(self) -> dict:
+        return {
+            "state": self.state.value,
+            "last_error": self.last_error,
+            "connect_attempts": self.connect_attempts,
+            "reconnects": self.reconnects,
+            "ping_failures": self.ping_failures,
+            "last_ping_latency": round(self.last_ping_latency, 4) if self.last_ping_latency is not None else None
+        }
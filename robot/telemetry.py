@@ -0,0 +1,227 @@
+"""
+Joint telemetry loop for Doda Terminal
+A background thread reads position, speed, load, voltage and temperature of
+all nine motors with one sync read per cycle and publishes the result as an
+immutable JointSnapshot. Readers (capture_joint_positions, presets) take the
+latest snapshot instead of going to the bus.
+"""
+
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from .bus import (ADDR_PRESENT_LOAD, ADDR_PRESENT_POSITION, ADDR_PRESENT_SPEED,
+                  ADDR_PRESENT_TEMPERATURE, ADDR_PRESENT_VOLTAGE, FeetechBus, decode_signed)
+from .calibration import CalibrationTable, MotorCalibration
+from .joints import ALL_JOINTS, ARM_JOINTS, MOTOR_IDS
+
+# Present position .. present temperature, read as one block
+_BLOCK_START = ADDR_PRESENT_POSITION
+_BLOCK_LENGTH = ADDR_PRESENT_TEMPERATURE + 1 - ADDR_PRESENT_POSITION
+_FIELDS = [
+    (ADDR_PRESENT_POSITION, 2),
+    (ADDR_PRESENT_SPEED, 2),
+    (ADDR_PRESENT_LOAD, 2),
+    (ADDR_PRESENT_VOLTAGE, 1),
+    (ADDR_PRESENT_TEMPERATURE, 1)
+]
+
+
+@dataclass(frozen=True)
+class JointSnapshot:
+    """State of every motor from one telemetry cycle (None = motor didn't answer)"""
+    seq: int
+    timestamp: float          # time.time() of the read
+    monotonic: float          # time.monotonic() of the read
+    positions: Dict[str, Optional[float]]      # Normalized arm positions
+    raw_positions: Dict[str, Optional[int]]    # Encoder ticks, all motors
+    velocities: Dict[str, Optional[int]]       # Steps per second (signed)
+    loads: Dict[str, Optional[int]]            # Signed, 0.1% of max torque
+    voltages: Dict[str, Optional[float]]       # Volts
+    temperatures: Dict[str, Optional[int]]     # Degrees C
+    read_time: float          # Seconds spent on the bus
+
+    def age(self) -> float:
+        """Seconds since this snapshot was read"""
+        return time.monotonic() - self.monotonic
+
+    def arm_positions(self) -> Optional[Dict[str, float]]:
+        """Normalized arm pose, or None if any arm joint is missing"""
+        if any(self.positions.get(name) is None for name in ARM_JOINTS):
+            return None
+        return {name: self.positions[name] for name in ARM_JOINTS}
+
+
+class TelemetryLoop:
+    """Reads all motors at a fixed rate and publishes the latest JointSnapshot"""
+
+    def __init__(self, bus: FeetechBus, calibration: Dict[int, MotorCalibration],
+                 bus_lock: threading.RLock, rate_hz: float = 30.0):
+        """
+        Initialize telemetry loop
+
+        Args:
+            bus: Bus used for the sync reads
+            calibration: Motor ID -> calibration, for normalizing arm positions
+            bus_lock: Lock shared with everything else that talks to the bus
+            rate_hz: Read cycles per second
+        """
+        self.bus = bus
+        self.calibration = calibration
+        self.table = CalibrationTable(calibration)  # Normalizes the arm pose in one array op
+        self.bus_lock = bus_lock
+        self.rate_hz = rate_hz
+
+        self._snapshot: Optional[JointSnapshot] = None
+        self.listeners: List[Callable[[JointSnapshot], None]] = []  # Called with every snapshot
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread: Optional[threading.Thread] = None
+
+        self.cycles = 0
+        self.failures = 0
+
+    def start(self) -> bool:
+        """Start the telemetry thread (needs sync reads on the bus)"""
+        if self._running:
+            return True
+        if not self.bus.has_sync:
+            return False
+
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="Telemetry", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        """Stop the telemetry thread"""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+
+    def is_running(self) -> bool:
+        return self._running and self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        """Telemetry thread - one sync read per cycle"""
+        period = 1.0 / self.rate_hz
+        next_cycle = time.monotonic()
+
+        while self._running:
+            try:
+                self.read_once()
+            except Exception as e:
+                self.failures += 1
+                print(f"Warning: telemetry read failed: {e}")
+
+            next_cycle += period
+            delay = next_cycle - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            else:
+                # Fell behind (bus busy); don't try to catch up
+                next_cycle = time.monotonic()
+
+    def read_once(self) -> Optional[JointSnapshot]:
+        """Read all motors once and publish the snapshot"""
+        motor_ids = [MOTOR_IDS[name] for name in ALL_JOINTS]
+
+        start = time.monotonic()
+        with self.bus_lock:
+            values = self.bus.sync_read(_BLOCK_START, _BLOCK_LENGTH, motor_ids, _FIELDS)
+        read_time = time.monotonic() - start
+
+        if values is None:
+            self.failures += 1
+            return None
+
+        raw_positions, velocities, loads, voltages, temperatures = {}, {}, {}, {}, {}
+        for name in ALL_JOINTS:
+            fields = values.get(MOTOR_IDS[name])
+            if fields is None:
+                raw_positions[name] = velocities[name] = loads[name] = None
+                voltages[name] = temperatures[name] = None
+                continue
+
+            raw_position, raw_speed, raw_load, raw_voltage, temperature = fields
+            raw_positions[name] = raw_position
+            velocities[name] = decode_signed(raw_speed)
+            loads[name] = decode_signed(raw_load, sign_bit=10)
+            voltages[name] = raw_voltage / 10.0
+            temperatures[name] = temperature
+
+        # Uncalibrated arm joints have no normalized position
+        positions = {name: None for name in ARM_JOINTS}
+        positions.update(self.table.normalize_pose(raw_positions))
+
+        with self._condition:
+            snapshot = JointSnapshot(
+                seq=self.cycles + 1,
+                timestamp=time.time(),
+                monotonic=start + read_time,
+                positions=positions,
+                raw_positions=raw_positions,
+                velocities=velocities,
+                loads=loads,
+                voltages=voltages,
+                temperatures=temperatures,
+                read_time=read_time
+            )
+            # Publishing is a single reference swap; readers never see a partial snapshot
+            self._snapshot = snapshot
+            self.cycles += 1
+            self._condition.notify_all()
+
+        for listener in self.listeners:
+            try:
+                listener(snapshot)
+            except Exception as e:
+                print(f"Warning: telemetry listener failed: {e}")
+
+        return snapshot
+
+    @property
+    def snapshot(self) -> Optional[JointSnapshot]:
+        """Latest snapshot (may be stale if the loop stopped)"""
+        return self._snapshot
+
+    def fresh_snapshot(self, max_age: Optional[float] = None) -> Optional[JointSnapshot]:
+        """
+        Latest snapshot if it is recent enough
+
+        Args:
+            max_age: Oldest acceptable snapshot in seconds (default: three cycles)
+
+        Returns:
+            JointSnapshot or None
+        """
+        snapshot = self._snapshot
+        if snapshot is None or not self.is_running():
+            return None
+        if max_age is None:
+            max_age = 3.0 / self.rate_hz
+        return snapshot if snapshot.age() <= max_age else None
+
+    def wait_for_update(self, after_seq: int = 0, timeout: float = 1.0) -> Optional[JointSnapshot]:
+        """Block until a snapshot newer than after_seq is published"""
+        deadline = time.monotonic() + timeout
+        with self._condition:
+            while self._snapshot is None or self._snapshot.seq <= after_seq:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self._running:
+                    return None
+                self._condition.wait(remaining)
+            return self._snapshot
+
+    def get_stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "running": self.is_running(),
+            "rate_hz": self.rate_hz,
+            "cycles": self.cycles,
+            "failures": self.failures,
+            "last_read_time": round(snapshot.read_time, 4) if snapshot else None,
+            "snapshot_age": round(snapshot.age(), 3) if snapshot else None
+        }
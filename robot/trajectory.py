@@ -0,0 +1,362 @@
+"""
+Keyframe trajectory engine for Doda behaviors
+A behavior is data: a list of keyframes with joint targets relative to the
+start pose. The engine interpolates between them at a fixed control rate and
+moves on as soon as the joints actually arrive, instead of sleeping for the
+worst case like the imperative presets do.
+
+Existing presets convert to this format with record_preset(), which dry-runs
+a preset's execute() against a recording controller. Presets that do more
+than position the arm (wheel velocities, torque changes) can't be expressed
+as keyframes and are refused, so they keep playing imperatively.
+"""
+
+import math
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from .clock import current_clock, use_clock
+from .joints import ARM_JOINTS
+
+
+class UnsupportedPreset(Exception):
+    """Raised when a preset sends commands keyframes can't replay"""
+
+
+@dataclass
+class Keyframe:
+    """One segment of a trajectory"""
+    deltas: Dict[str, float] = field(default_factory=dict)     # joint -> offset from start pose
+    absolute: Dict[str, float] = field(default_factory=dict)   # joint -> absolute target (e.g. beak)
+    move_time: Optional[float] = None     # Interpolation time (None: as fast as max_velocity allows)
+    timeout: float = 2.0                  # Give up waiting for arrival after this long
+    hold: float = 0.0                     # Pause after arrival
+    max_velocity: Optional[float] = None  # Normalized units per second (None: engine default)
+    label: str = ""
+
+    def resolve(self, start_pose: Dict[str, float]) -> Dict[str, float]:
+        """Absolute joint targets for a given start pose"""
+        targets = {joint: start_pose[joint] + delta for joint, delta in self.deltas.items()}
+        targets.update(self.absolute)
+        return targets
+
+
+@dataclass
+class Trajectory:
+    """A behavior as keyframe data"""
+    name: str
+    keyframes: List[Keyframe]
+    return_to_start: bool = True
+    return_timeout: float = 2.0
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Trajectory":
+        data = dict(data)
+        data["keyframes"] = [Keyframe(**kf) for kf in data.get("keyframes", [])]
+        return cls(**data)
+
+
+def _minimum_jerk(tau: np.ndarray) -> np.ndarray:
+    """Smooth 0..1 progress profile with zero velocity and acceleration at both ends"""
+    return tau ** 3 * (10 - 15 * tau + 6 * tau ** 2)
+
+
+class TrajectoryEngine:
+    """Plays trajectories on a controller at a fixed control rate"""
+
+    def __init__(self, controller, rate_hz: float = 50.0, tolerance: float = 2.0,
+                 max_velocity: float = 150.0,
+                 read_positions: Optional[Callable[[], Dict[str, float]]] = None,
+                 time_scale: float = 1.0, velocity_limits: Optional[Dict[str, float]] = None,
+                 on_segment: Optional[Callable[[Keyframe], None]] = None):
+        """
+        Initialize trajectory engine
+
+        Args:
+            controller: Anything with get_positions()/set_positions()
+            rate_hz: Control rate for interpolated commands
+            tolerance: A joint has arrived within this many normalized units
+            max_velocity: Default velocity limit (normalized units per second)
+            read_positions: Measured-position source (defaults to controller.get_positions)
+            time_scale: Multiplies every keyframe's timing (0.5 = twice as fast)
+            velocity_limits: Joint -> hard limit in normalized units per second;
+                segments are stretched so no joint exceeds it
+            on_segment: Called as each segment starts (e.g. to mark recorder steps)
+        """
+        self.controller = controller
+        self.rate_hz = rate_hz
+        self.tolerance = tolerance
+        self.max_velocity = max_velocity
+        self.read_positions = read_positions or controller.get_positions
+        self.time_scale = time_scale
+        self.velocity_limits = velocity_limits or {}
+        self.on_segment = on_segment
+
+    def run(self, trajectory: Trajectory, start_pose: Optional[Dict[str, float]] = None,
+            skip_return: Optional[Callable[[], bool]] = None,
+            commanded_pose: Optional[Dict[str, float]] = None) -> dict:
+        """
+        Play a trajectory
+
+        Args:
+            trajectory: Keyframes to play
+            start_pose: Pose the deltas are relative to (defaults to current positions)
+            skip_return: Asked just before the return to start; True skips it
+                (the next behavior blends in from here)
+            commanded_pose: Pose the arm was last commanded to, where the first
+                segment starts (defaults to start_pose; differs when blending
+                in mid-chain)
+
+        Returns:
+            dict with per-segment timings and total duration
+        """
+        clock = current_clock()
+        started = clock.monotonic()
+
+        if start_pose is None:
+            start_pose = self.controller.get_positions()
+        commanded = dict(start_pose)
+        if commanded_pose:
+            commanded.update(commanded_pose)
+
+        segments = []
+        for keyframe in trajectory.keyframes:
+            target = keyframe.resolve(start_pose)
+            segments.append(self.run_segment(commanded, target, keyframe))
+            commanded.update(target)
+
+        returned = False
+        if trajectory.return_to_start and not (skip_return and skip_return()):
+            keyframe = Keyframe(absolute=dict(start_pose), timeout=trajectory.return_timeout,
+                                label="return to start")
+            segments.append(self.run_segment(commanded, dict(start_pose), keyframe))
+            returned = True
+
+        return {
+            "segments": segments,
+            "returned": returned,
+            "duration": clock.monotonic() - started
+        }
+
+    def run_segment(self, commanded: Dict[str, float], target: Dict[str, float],
+                    keyframe: Keyframe) -> dict:
+        """Interpolate from the commanded pose to target, then wait for arrival"""
+        clock = current_clock()
+        started = clock.monotonic()
+        if self.on_segment is not None:
+            self.on_segment(keyframe)
+
+        joints = list(target)
+        p0 = np.array([commanded.get(joint, target[joint]) for joint in joints], dtype=float)
+        p1 = np.array([target[joint] for joint in joints], dtype=float)
+        distance = float(np.abs(p1 - p0).max()) if joints else 0.0
+
+        move_time = keyframe.move_time
+        if move_time is None:
+            move_time = distance / (keyframe.max_velocity or self.max_velocity)
+        timeout = keyframe.timeout * self.time_scale
+        move_time = min(move_time * self.time_scale, timeout)
+
+        # No joint may move faster than its limit, whatever the timing says
+        limited = [float(abs(p1[i] - p0[i])) / self.velocity_limits[joint]
+                   for i, joint in enumerate(joints) if joint in self.velocity_limits]
+        move_time = max([move_time] + limited)
+
+        # Interpolated setpoints, one per control tick
+        steps = max(1, math.ceil(move_time * self.rate_hz))
+        progress = _minimum_jerk(np.arange(1, steps + 1) / steps)
+        setpoints = p0 + np.outer(progress, p1 - p0)
+
+        period = move_time / steps
+        for k, point in enumerate(setpoints):
+            self.controller.set_positions(dict(zip(joints, point.tolist())))
+            if k < steps - 1:
+                clock.sleep(started + (k + 1) * period - clock.monotonic())
+
+        arrived = self.wait_for_arrival(target, started + max(timeout, move_time))
+
+        if keyframe.hold > 0:
+            clock.sleep(keyframe.hold * self.time_scale)
+
+        return {
+            "label": keyframe.label,
+            "move_time": round(move_time, 3),
+            "budget": keyframe.timeout + keyframe.hold,
+            "actual": round(clock.monotonic() - started, 3),
+            "arrived": arrived
+        }
+
+    def wait_for_arrival(self, target: Dict[str, float], deadline: float) -> bool:
+        """Poll measured positions until every joint is within tolerance or the deadline passes"""
+        clock = current_clock()
+        joints = list(target)
+        goal = np.array([target[joint] for joint in joints], dtype=float)
+        period = 1.0 / self.rate_hz
+
+        while True:
+            measured = self.read_positions()
+            actual = np.array([measured.get(joint, goal[i]) for i, joint in enumerate(joints)],
+                              dtype=float)
+            if np.all(np.abs(actual - goal) <= self.tolerance):
+                return True
+
+            remaining = deadline - clock.monotonic()
+            if remaining <= 0:
+                return False
+            clock.sleep(min(period, remaining))
+
+
+class RecordingClock:
+    """Virtual clock that records sleeps instead of waiting"""
+
+    def __init__(self, events: list):
+        self.events = events
+        self.now = 0.0
+
+    def sleep(self, seconds: float):
+        seconds = max(0.0, seconds)
+        self.events.append(("sleep", seconds))
+        self.now += seconds
+
+    def time(self) -> float:
+        return self.now
+
+    def monotonic(self) -> float:
+        return self.now
+
+
+class RecordingController:
+    """Stand-in controller that records every command a preset sends"""
+
+    def __init__(self, start_pose: Dict[str, float], events: list):
+        self.positions = dict(start_pose)
+        self.events = events
+
+    def get_positions(self) -> Dict[str, float]:
+        return dict(self.positions)
+
+    def get_normalized_position(self, motor_id: int) -> float:
+        return self.positions[ARM_JOINTS[motor_id - 1]]
+
+    def set_positions(self, positions: Dict[str, float]):
+        self.positions.update(positions)
+        self.events.append(("command", dict(positions)))
+
+    def set_single_joint(self, joint: str, value: float):
+        self.set_positions({joint: value})
+
+    def set_gripper(self, value: float):
+        self.set_positions({"gripper": value})
+
+    def set_goal_velocity(self, motor_id: int, velocity: float):
+        self.events.append(("velocity", {motor_id: velocity}))
+
+    def disable_torque(self, motor_id: int):
+        self.events.append(("torque_off", motor_id))
+
+    def __getattr__(self, name):
+        # Tolerate anything else a preset might call on the real controller,
+        # but keep a record so record_preset() can tell it was called
+        def call(*args, **kwargs):
+            self.events.append(("call", name))
+        return call
+
+
+# Recording start pose: far outside the normalized range, so a recorded target
+# near it is a delta and anything else is an absolute value (like set_gripper(100))
+_RECORDING_OFFSET = 1000.0
+_RELATIVE_WINDOW = 500.0
+
+
+def record_events(execute: Callable, start_pose: Optional[Dict[str, float]] = None,
+                  **kwargs) -> tuple:
+    """
+    Dry-run a preset's execute() on a recording controller and virtual clock
+
+    Args:
+        execute: Preset execute(controller, **kwargs)
+        start_pose: Pose reported by get_positions() (defaults to the recording pose)
+        **kwargs: Behavior parameters
+
+    Returns:
+        Tuple of (events, start_pose) where events is a list of
+        ("command", {joint: value}), ("sleep", seconds), ... in call order
+    """
+    if start_pose is None:
+        start_pose = {joint: _RECORDING_OFFSET + 100.0 * i for i, joint in enumerate(ARM_JOINTS)}
+
+    events: list = []
+    with use_clock(RecordingClock(events)):
+        execute(RecordingController(start_pose, events), **kwargs)
+
+    return events, start_pose
+
+
+def record_preset(name: str, execute: Callable, **kwargs) -> Trajectory:
+    """
+    Convert an imperative preset into a Trajectory
+
+    Commands issued back to back become one keyframe; the sleep that follows
+    becomes that keyframe's timeout (the preset's worst-case wait). A final
+    command back to the start pose becomes return_to_start.
+
+    Args:
+        name: Trajectory name
+        execute: Preset execute(controller, **kwargs)
+        **kwargs: Behavior parameters
+
+    Returns:
+        Trajectory equivalent to the preset
+
+    Raises:
+        UnsupportedPreset: If the preset sets wheel velocities, turns torque
+            off or calls anything else that isn't a joint position command
+    """
+    events, start_pose = record_events(execute, **kwargs)
+
+    keyframes: List[Keyframe] = []
+    pending: Optional[Keyframe] = None
+
+    for kind, payload in events:
+        if kind == "command":
+            if pending is None:
+                pending = Keyframe(timeout=0.0)
+                keyframes.append(pending)
+            for joint, value in payload.items():
+                delta = value - start_pose[joint]
+                if abs(delta) < _RELATIVE_WINDOW:
+                    pending.deltas[joint] = round(delta, 4)
+                    pending.absolute.pop(joint, None)
+                else:
+                    pending.absolute[joint] = value
+                    pending.deltas.pop(joint, None)
+        elif kind == "sleep":
+            if keyframes:
+                keyframes[-1].timeout += payload
+            pending = None
+        else:
+            # Dropping these would change what the behavior does
+            raise UnsupportedPreset(f"Preset '{name}' uses {kind} ({payload!r}), which keyframes can't replay")
+
+    # Presets normally end with set_positions(start_pos) + sleep (dodo_dies stays collapsed)
+    return_to_start = False
+    return_timeout = 2.0
+    if keyframes:
+        last = keyframes[-1]
+        if not last.absolute and set(last.deltas) == set(start_pose) and \
+                all(abs(d) < 1e-6 for d in last.deltas.values()):
+            keyframes.pop()
+            return_to_start = True
+            return_timeout = last.timeout
+
+    for i, keyframe in enumerate(keyframes, start=1):
+        keyframe.label = f"step {i}"
+
+    return Trajectory(name=name, keyframes=keyframes, return_to_start=return_to_start,
+                      return_timeout=return_timeout)
+
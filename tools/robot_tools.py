@@ -3,13 +3,20 @@ Robot tools for Doda Agent - Phase 2
 Provides tools for behavior execution, vision, preferences, base rotation, and position capture
 """
 
-import json
 from typing import Any, Callable
 from pathlib import Path
 from anthropic.types import ToolParam
 
+from robot.photo_writer import encode_jpeg, get_photo_writer
 
-def create_robot_tools(robot_controller, camera_manager, preferences_system) -> tuple[list[ToolParam], dict[str, Callable]]:
+# Upper bound on idle cycles while waiting for the vision calls (~7 s per cycle);
+# the idle behavior is cancelled as soon as the evaluation is back
+THINKING_IDLE_MAX_CYCLES = 50
+
+
+def create_robot_tools(robot_controller, camera_manager, preferences_system,
+                       photo_writer=None, photo_dir: str = "game/gift_photos"
+                       ) -> tuple[list[ToolParam], dict[str, Callable]]:
     """
     Create tool definitions and handlers for Doda agent
 
@@ -17,10 +24,15 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
         robot_controller: RobotController instance
         camera_manager: CameraManager instance
         preferences_system: PreferencesSystem instance
+        photo_writer: PhotoWriter for gift photos and descriptions
+            (defaults to the shared process-wide writer)
+        photo_dir: Where gift photos (and image_descriptions/) are saved
 
     Returns:
         Tuple of (tool_definitions, tool_handlers)
     """
+    if photo_writer is None:
+        photo_writer = get_photo_writer()
 
     # Tool 1: Execute Dodo Behavior
     execute_behavior_def = {
@@ -37,15 +49,36 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
                 "reason": {
                     "type": "string",
                     "description": "Why you're executing this behavior (for logging)"
+                },
+                "wait_for_completion": {
+                    "type": "boolean",
+                    "description": "Wait until the movement finishes before continuing. Default false: keep talking while you move.",
+                    "default": False
                 }
             },
             "required": ["behavior_name", "reason"]
         }
     }
 
-    def handle_execute_behavior(behavior_name: str, reason: str) -> dict:
-        """Execute a dodo behavior"""
-        result = robot_controller.execute_behavior(behavior_name)
+    def handle_execute_behavior(behavior_name: str, reason: str, wait_for_completion: bool = False) -> dict:
+        """Execute a dodo behavior (fire-and-forget unless asked to wait)"""
+        if wait_for_completion:
+            result = robot_controller.execute_behavior(behavior_name)
+        else:
+            handle = robot_controller.execute_behavior(behavior_name, wait=False)
+            # Failures to start (robot offline, unknown preset) resolve immediately
+            result = handle.result() if handle.done() else None
+
+        if result is None:
+            return {
+                "success": True,
+                "behavior": behavior_name,
+                "reason": reason,
+                "status": "started",
+                "duration": 0.0,
+                "expected_duration": robot_controller.expected_duration(behavior_name),
+                "error": None
+            }
 
         return {
             "success": result["success"],
@@ -74,8 +107,8 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
 
     def handle_capture_gift(save_photo: bool = True) -> dict:
         """Capture and analyze gift using two-step vision process"""
-        # Capture frame
-        frame = camera_manager.capture_frame()
+        # Capture frame (still profile if the camera has one)
+        frame = camera_manager.capture_still()
 
         if frame is None:
             return {
@@ -86,47 +119,51 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
                 "affinity_reason": ""
             }
 
-        # Save photo if requested
+        # Encode once - the same JPEG goes to disk and to the Vision API
+        jpeg_bytes = encode_jpeg(frame)
+
+        # Save photo if requested (written in the background)
         photo_path = None
         timestamp = None
         if save_photo:
-            photo_dir = Path("game/gift_photos")
-            photo_dir.mkdir(parents=True, exist_ok=True)
-
             from datetime import datetime
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            photo_path = photo_dir / f"gift_{timestamp}.jpg"
+            photo_path = Path(photo_dir) / f"gift_{timestamp}.jpg"
 
-            camera_manager.save_frame(str(photo_path))
+            photo_writer.submit_bytes(photo_path, jpeg_bytes)
 
         # TWO-STEP VISION PROCESS
         from tools.vision_helper import analyze_image, evaluate_preferences
 
-        # Run idle behavior while thinking (in background if possible)
+        # Run idle behavior in the background while thinking - it loops until the
+        # evaluation is back, then gets cancelled and returns to its start pose
         print("  Give me a moment to think...")
+        idle = None
         try:
-            robot_controller.execute_behavior("idle", cycles=1)
-        except:
+            idle = robot_controller.submit_behavior("idle", cycles=THINKING_IDLE_MAX_CYCLES)
+        except Exception:
             pass  # Don't fail if robot not connected
 
-        # STEP 1: Analyze image with Vision API
-        print("  [Step 1/2] Analyzing image...")
-        gift_analysis = analyze_image(frame)
+        try:
+            # STEP 1: Analyze image with Vision API
+            print("  [Step 1/2] Analyzing image...")
+            gift_analysis = analyze_image(frame, jpeg_bytes)
+
+            # STEP 2: Evaluate based on preferences
+            print("  [Step 2/2] Evaluating preferences...")
+            preferences = preferences_system.get_all_preferences()
+            evaluation = evaluate_preferences(gift_analysis, preferences)
 
-        # STEP 2: Evaluate based on preferences
-        print("  [Step 2/2] Evaluating preferences...")
-        preferences = preferences_system.get_all_preferences()
-        evaluation = evaluate_preferences(gift_analysis, preferences)
+        finally:
+            if idle is not None:
+                idle.cancel()
 
         affinity_score = evaluation["affinity_score"]
         affinity_reason = evaluation["explanation"]
 
-        # Save image description to file
+        # Save image description to file (written in the background)
         if timestamp:
-            import json
-            desc_dir = Path("game/gift_photos/image_descriptions")
-            desc_dir.mkdir(parents=True, exist_ok=True)
-            desc_path = desc_dir / f"gift_{timestamp}.json"
+            desc_path = Path(photo_dir) / "image_descriptions" / f"gift_{timestamp}.json"
 
             description_data = {
                 "timestamp": timestamp,
@@ -137,8 +174,7 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
                 "photo_path": str(photo_path) if photo_path else None
             }
 
-            with open(desc_path, 'w') as f:
-                json.dump(description_data, f, indent=2)
+            photo_writer.submit_json(desc_path, description_data)
 
         return {
             "success": True,
@@ -184,7 +220,7 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
     # Tool 4: Rotate Base
     rotate_base_def = {
         "name": "rotate_base",
-        "description": "Rotate your wheeled base left or right by specified degrees to look around. Automatically returns to starting orientation after rotation.",
+        "description": "Rotate your wheeled base left or right by specified degrees to look around. Returns to starting orientation afterwards unless return_to_start is false.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -200,6 +236,11 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
                     "description": "Direction to rotate (auto chooses shortest path)",
                     "default": "auto"
                 },
+                "return_to_start": {
+                    "type": "boolean",
+                    "description": "Rotate back to the starting orientation afterwards",
+                    "default": True
+                },
                 "reason": {
                     "type": "string",
                     "description": "Why you're rotating (for logging)"
@@ -209,16 +250,17 @@ def create_robot_tools(robot_controller, camera_manager, preferences_system) ->
         }
     }
 
-    def handle_rotate_base(degrees: float, direction: str = "auto", reason: str = "") -> dict:
+    def handle_rotate_base(degrees: float, direction: str = "auto", reason: str = "",
+                           return_to_start: bool = True) -> dict:
         """Rotate the base"""
-        result = robot_controller.rotate_base(degrees, direction)
+        result = robot_controller.rotate_base(degrees, direction, return_to_start=return_to_start)
 
         return {
             "success": result["success"],
             "degrees_rotated": result.get("actual_degrees", 0.0),
             "direction": direction,
             "reason": reason,
-            "returned_to_start": result["success"],  # Always returns to start if successful
+            "returned_to_start": result.get("returned_to_start", False),
             "error": result.get("error")
         }
 
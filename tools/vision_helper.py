@@ -8,18 +8,40 @@ import base64
 import cv2
 import json
 import os
+import threading
 from anthropic import Anthropic
 
+from robot.photo_writer import encode_jpeg
 
-def analyze_image(image_frame) -> dict:
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> Anthropic:
     """
-    Step 1: Analyze gift image using Claude Vision API
+    Process-wide Anthropic client
+
+    The client keeps an HTTP connection pool, so every vision call (and every
+    agent that is handed this client) reuses warm connections instead of
+    opening new ones.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+        return _client
+
+
+def prepare_image(image_frame, jpeg_bytes: bytes = None) -> str:
+    """
+    Downscale and JPEG-encode a frame for the Vision API
 
     Args:
         image_frame: OpenCV image (numpy array)
+        jpeg_bytes: Already-encoded JPEG of image_frame, reused if no resize is needed
 
     Returns:
-        dict with object_type, description, special_features
+        Base64-encoded JPEG
     """
     # Resize image if too large (max 1.15 megapixels for optimal performance)
     height, width = image_frame.shape[:2]
@@ -32,13 +54,27 @@ def analyze_image(image_frame) -> dict:
         new_height = int(height * scale)
         image_frame = cv2.resize(image_frame, (new_width, new_height))
         print(f"  Resized image from {width}x{height} to {new_width}x{new_height}")
+        jpeg_bytes = None
 
     # Encode image to base64
-    success, buffer = cv2.imencode('.jpg', image_frame)
-    if not success:
-        raise ValueError("Failed to encode image to JPEG")
+    if jpeg_bytes is None:
+        jpeg_bytes = encode_jpeg(image_frame)
+
+    return base64.b64encode(jpeg_bytes).decode('utf-8')
 
-    image_base64 = base64.b64encode(buffer).decode('utf-8')
+
+def analyze_image(image_frame, jpeg_bytes: bytes = None) -> dict:
+    """
+    Step 1: Analyze gift image using Claude Vision API
+
+    Args:
+        image_frame: OpenCV image (numpy array)
+        jpeg_bytes: Already-encoded JPEG of image_frame (skips re-encoding)
+
+    Returns:
+        dict with object_type, description, special_features
+    """
+    image_base64 = prepare_image(image_frame, jpeg_bytes)
 
     vision_prompt = """Analyze this object and describe what you see.
 
@@ -64,7 +100,7 @@ Guidelines:
 
 Return ONLY the JSON."""
 
-    client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    client = get_client()
 
     try:
         response = client.messages.create(
@@ -163,7 +199,7 @@ EXPLANATION GUIDELINES:
 
 Return ONLY the JSON."""
 
-    client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+    client = get_client()
 
     try:
         response = client.messages.create(